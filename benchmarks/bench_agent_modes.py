@@ -0,0 +1,89 @@
+"""
+Compares the two screening modes on a job's real candidates:
+
+    direct  one chat completion per resume, resume text inlined in the prompt
+    tool    CrewAI agent that calls ResumeReadTool (thought -> tool -> answer)
+
+    python benchmarks/bench_agent_modes.py --job-id 3 --limit 10
+
+Reports LLM calls, prompt/completion tokens and latency per resume. Nothing
+is written to the candidates table (needs OPENAI_API_KEY and a populated
+data/hire_os.db, run from the project root).
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from src.database_manager import get_db_connection
+from src.llm_clients import get_chat_llm, get_usage, reset_usage
+from src.agents import (
+    DEFAULT_CONTEXT_TOKENS,
+    create_screener_agent,
+    parse_llm_json,
+    screen_direct,
+    screen_with_tools
+)
+
+
+def run_mode(mode, job, candidates):
+    job_context = f"Job Title: {job['title']}\nDescription: {job['description']}\nRequirements: {job['requirements']}"
+    max_tokens = job['context_token_budget'] or DEFAULT_CONTEXT_TOKENS
+    agent = create_screener_agent() if mode == "tool" else get_chat_llm("gpt-4o", temperature=0, traffic="batch")
+
+    reset_usage()
+    timings, scores = [], {}
+    for cand in candidates:
+        start = time.perf_counter()
+        if mode == "tool":
+            output_str = screen_with_tools(agent, job_context, cand['resume_path'])
+        else:
+            output_str = screen_direct(agent, job_context, cand['id'], cand['resume_path'], max_tokens)
+        timings.append(time.perf_counter() - start)
+        data = parse_llm_json(output_str) or {}
+        scores[cand['id']] = data.get('score')
+    return get_usage(), timings, scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--job-id", type=int, required=True)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["tool", "direct"], choices=["tool", "direct"])
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    job = conn.execute(
+        "SELECT title, description, requirements, context_token_budget FROM jobs WHERE id=?", (args.job_id,)
+    ).fetchone()
+    candidates = conn.execute(
+        "SELECT id, resume_path FROM candidates WHERE job_id=? AND resume_path IS NOT NULL LIMIT ?",
+        (args.job_id, args.limit)
+    ).fetchall()
+    conn.close()
+    if not job or not candidates:
+        sys.exit("Job not found or it has no resumes.")
+
+    results = {mode: run_mode(mode, job, candidates) for mode in args.modes}
+
+    n = len(candidates)
+    print(f"\n{n} resumes, job #{args.job_id} ({job['title']})")
+    print(f"{'mode':8} {'calls/resume':>13} {'prompt tok':>11} {'compl tok':>10} {'p50 s':>7} {'max s':>7}")
+    for mode, (usage, timings, _) in results.items():
+        timings = sorted(timings)
+        print(f"{mode:8} {usage['calls'] / n:13.2f} {usage['prompt_tokens'] / n:11.0f} "
+              f"{usage['completion_tokens'] / n:10.0f} {timings[len(timings) // 2]:7.2f} {timings[-1]:7.2f}")
+
+    if len(results) == 2:
+        tool_scores, direct_scores = results["tool"][2], results["direct"][2]
+        diffs = [abs(tool_scores[c] - direct_scores[c]) for c in tool_scores
+                 if isinstance(tool_scores[c], (int, float)) and isinstance(direct_scores.get(c), (int, float))]
+        if diffs:
+            print(f"\nScore agreement: mean |tool - direct| = {sum(diffs) / len(diffs):.1f} points over {len(diffs)} resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Cold-start budget for the Streamlit entry points.
+
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --runs 5 --skip-render
+    python benchmarks/bench_cold_start.py --allow-missing-deps   # partial installs
+
+Every measurement runs in a fresh interpreter (run from the project root):
+
+    import   wall time of `import <module>` for the modules the pages load
+    render   time to first render of each page script (streamlit AppTest,
+             headless), plus a check that heavy packages were not loaded
+
+Exits non-zero if a median goes over its budget, a module or page fails to
+import or render, or a page imported a package it must not load at startup.
+With --allow-missing-deps, measurements that fail only because a package
+is not installed are reported as skipped instead.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+HEAVY = ["crewai", "langchain", "langchain_openai", "openai", "pypdf", "plotly"]
+
+# module -> budget in seconds
+IMPORT_BUDGETS = {
+    "src.database_manager": 0.05,
+    "src.task_queue": 0.1,
+    "src.transcripts": 0.1,
+    "src.interview_bot": 0.5,
+    "src.candidate_profiles": 0.3,
+    "src.decision_policy": 0.1,
+}
+
+# page -> (budget in seconds, packages that must not be imported by the first render)
+RENDER_BUDGETS = {
+    "ui/apply_portal.py": (1.5, HEAVY + ["pandas"]),
+    "ui/interview_portal.py": (1.5, HEAVY),
+    "ui/admin_dashboard.py": (2.5, HEAVY),
+}
+
+IMPORT_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+RENDER_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file({path!r}, default_timeout=60).run()
+seconds = time.perf_counter() - start
+loaded = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"seconds": seconds, "loaded": loaded, "errors": [str(e.value) for e in app.exception]}}))
+"""
+
+
+def run_snippet(code):
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(code, runs):
+    results = [run_snippet(code) for _ in range(runs)]
+    failed = next((r for r in results if "error" in r), None)
+    if failed:
+        return failed
+    summary = dict(results[-1])
+    summary['seconds'] = statistics.median(r['seconds'] for r in results)
+    return summary
+
+
+def _skippable(result, allow_missing_deps):
+    return allow_missing_deps and result['error'].startswith("ModuleNotFoundError")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement (median is used)")
+    parser.add_argument("--skip-render", action="store_true", help="Only measure module imports")
+    parser.add_argument("--allow-missing-deps", action="store_true",
+                        help="Skip measurements that fail because a package is not installed")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'import':<28} {'median':>8} {'budget':>8}")
+    for module, budget in IMPORT_BUDGETS.items():
+        result = measure(IMPORT_SNIPPET.format(root=ROOT, module=module), args.runs)
+        if "error" in result:
+            skipped = _skippable(result, args.allow_missing_deps)
+            failures += [] if skipped else [f"import {module}: {result['error']}"]
+            print(f"{module:<28} {'skipped' if skipped else 'FAILED':>8}  ({result['error']})")
+            continue
+        over = result['seconds'] > budget
+        failures += [f"import {module}"] if over else []
+        print(f"{module:<28} {result['seconds']:8.3f} {budget:8.2f}{'  OVER' if over else ''}")
+
+    if not args.skip_render:
+        print(f"\n{'first render':<28} {'median':>8} {'budget':>8}")
+        for page, (budget, forbidden) in RENDER_BUDGETS.items():
+            result = measure(RENDER_SNIPPET.format(root=ROOT, path=os.path.join(ROOT, page), heavy=forbidden), args.runs)
+            if "error" in result:
+                skipped = _skippable(result, args.allow_missing_deps)
+                failures += [] if skipped else [f"render {page}: {result['error']}"]
+                print(f"{page:<28} {'skipped' if skipped else 'FAILED':>8}  ({result['error']})")
+                continue
+            over = result['seconds'] > budget
+            failures += [f"render {page}"] if over else []
+            line = f"{page:<28} {result['seconds']:8.3f} {budget:8.2f}{'  OVER' if over else ''}"
+            if result['errors']:
+                failures.append(f"render {page}: {result['errors'][0]}")
+                line += "  ERROR"
+            if result['loaded']:
+                failures.append(f"{page} loaded {', '.join(result['loaded'])}")
+                line += f"  loaded: {', '.join(result['loaded'])}"
+            print(line)
+
+    if failures:
+        print(f"\n❌ Cold start failed: {'; '.join(failures)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
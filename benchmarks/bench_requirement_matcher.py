@@ -0,0 +1,52 @@
+"""
+Throughput of the deterministic requirement matcher on one core.
+
+    python benchmarks/bench_requirement_matcher.py --resumes 20000
+
+Matches synthetic ~3KB resumes (tokenize + one automaton pass each) and
+exits non-zero if throughput is below 100k resumes per minute.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+SKILLS = ("Python Java JavaScript TypeScript AWS GCP Azure Docker Kubernetes k8s React Angular Node.js C++ SQL "
+          "PostgreSQL MongoDB Redis Spark Kafka Airflow Terraform Go Rust Django Flask FastAPI PyTorch CrewAI "
+          "LangChain pandas Linux Git CI/CD GraphQL").split()
+FILLER = ("built designed led team services platform customers reduced latency improved pipeline scalable "
+          "production data engineering worked across stakeholders delivered features migrated owned").split()
+REQUIREMENTS = "Python, CrewAI, Cloud, Kubernetes\nNice to have: Kafka, Terraform, [LangChain], Node.js (optional)"
+TARGET_PER_MINUTE = 100000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=20000)
+    args = parser.parse_args()
+
+    from src.requirement_matcher import compile_requirements
+
+    resumes = [
+        " ".join(random.choices(FILLER, k=380) + random.choices(SKILLS, k=20)) for _ in range(min(args.resumes, 2000))
+    ]
+    matcher = compile_requirements(REQUIREMENTS)
+
+    start = time.perf_counter()
+    rejected = 0
+    for i in range(args.resumes):
+        rejected += matcher.match(resumes[i % len(resumes)])['rejected']
+    elapsed = time.perf_counter() - start
+
+    per_minute = args.resumes / elapsed * 60
+    print(f"{args.resumes:,} resumes in {elapsed:.2f}s -> {per_minute:,.0f}/min "
+          f"({rejected:,} hard-rejected, target {TARGET_PER_MINUTE:,}/min)")
+    sys.exit(0 if per_minute >= TARGET_PER_MINUTE else 1)
+
+
+if __name__ == "__main__":
+    main()
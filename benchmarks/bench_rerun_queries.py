@@ -0,0 +1,89 @@
+"""
+Checks that steady-state reruns of the Streamlit pages make no DB query
+(src/app_cache.py):
+
+    python benchmarks/bench_rerun_queries.py --reruns 50
+    python benchmarks/bench_rerun_queries.py --allow-missing-deps   # without streamlit
+
+Counts every SQL statement executed in this process while
+
+    cache   get_open_jobs() / get_job() are called again with unchanged jobs
+    page    ui/apply_portal.py is re-run (streamlit AppTest, headless)
+
+and checks that add_job() invalidates the cached job list. Runs against a
+scratch database in a temp directory. Exits non-zero if a rerun queried
+the database or the page failed to run.
+"""
+import os
+import sys
+import sqlite3
+import argparse
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+_statements = []
+_connect = sqlite3.connect
+
+
+def _counting_connect(*args, **kwargs):
+    conn = _connect(*args, **kwargs)
+    conn.set_trace_callback(_statements.append)
+    return conn
+
+
+def count_queries(fn, repeat):
+    """Statements executed by `repeat` calls of fn() after one warm-up call."""
+    fn()
+    _statements.clear()
+    for _ in range(repeat):
+        fn()
+    return len(_statements)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--allow-missing-deps", action="store_true",
+                        help="Skip the page check when streamlit is not installed")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="hireos_bench_"))
+    sqlite3.connect = _counting_connect
+    from src.database_manager import add_job
+    from src.app_cache import get_open_jobs, get_job
+
+    failures = []
+    job_id = add_job("Bench job", "Benchmark", "Python", minutes_open=60)
+
+    for name, fn in (("get_open_jobs()", get_open_jobs), ("get_job()", lambda: get_job(job_id))):
+        queries = count_queries(fn, args.reruns)
+        failures += [f"{name}: {queries} queries"] if queries else []
+        print(f"{'cache':<6} {name:<28} {queries:>4} queries in {args.reruns} calls")
+
+    add_job("Second bench job", "Benchmark", "SQL", minutes_open=60)
+    if len(get_open_jobs()) != 2:
+        failures.append("add_job() did not invalidate the open-job list")
+
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError as e:
+        print(f"{'page':<6} {'ui/apply_portal.py':<28} skipped ({e})")
+        if not args.allow_missing_deps:
+            failures.append(f"page check: {e}")
+    else:
+        app = AppTest.from_file(os.path.join(ROOT, "ui", "apply_portal.py"), default_timeout=60)
+        queries = count_queries(app.run, args.reruns)
+        if app.exception:
+            failures.append(f"ui/apply_portal.py: {app.exception[0].value}")
+        failures += [f"ui/apply_portal.py: {queries} queries"] if queries else []
+        print(f"{'page':<6} {'ui/apply_portal.py':<28} {queries:>4} queries in {args.reruns} reruns")
+
+    if failures:
+        print(f"\n❌ Rerun check failed: {'; '.join(failures)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
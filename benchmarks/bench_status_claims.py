@@ -0,0 +1,105 @@
+"""
+Throughput benchmark for concurrent workers pulling candidates through the
+status state machine (src/candidate_status.py).
+
+    python benchmarks/bench_status_claims.py --candidates 20000 --workers 1,2,4,8 --batch 1,10,50
+
+Every worker is a separate process that claims APPLIED candidates in batches
+and moves each one to SHORTLISTED/REJECTED with a compare-and-set
+transition, after --work-ms of simulated screening. Reports candidates/s per
+(workers, batch) and fails if any candidate was decided twice or left behind.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+
+def _seed(candidates):
+    from src.database_manager import get_db_connection
+
+    conn = get_db_connection()
+    conn.execute("DELETE FROM candidates")
+    conn.execute("DELETE FROM jobs")
+    conn.execute("INSERT INTO jobs (id, title) VALUES (1, 'Bench job')")
+    conn.executemany(
+        "INSERT INTO candidates (id, job_id, name, email, status) VALUES (?, 1, ?, ?, 'APPLIED')",
+        [(i, f"cand{i}", f"cand{i}@example.com") for i in range(1, candidates + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _worker(index, batch, work_ms, results):
+    from src.database_manager import get_db_connection
+    from src.candidate_status import claim_candidates, transition
+
+    owner = f"bench-{index}"
+    decided, lost = [], 0
+    conn = get_db_connection()
+    while True:
+        claimed = claim_candidates(1, "APPLIED", owner, limit=batch)
+        if not claimed:
+            break
+        for cand in claimed:
+            if work_ms:
+                time.sleep(work_ms / 1000)
+            new_status = random.choice(("SHORTLISTED", "REJECTED"))
+            if transition(conn, cand['id'], "APPLIED", new_status, owner=owner, resume_score=random.randint(0, 100)):
+                decided.append(cand['id'])
+            else:
+                lost += 1
+            conn.commit()
+    conn.close()
+    results.put((decided, lost))
+
+
+def run(candidates, workers, batch, work_ms):
+    _seed(candidates)
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_worker, args=(i, batch, work_ms, results)) for i in range(workers)]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    outcomes = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - start
+
+    decided = [cid for ids, _ in outcomes for cid in ids]
+    from src.database_manager import get_db_connection
+    conn = get_db_connection()
+    left = conn.execute("SELECT COUNT(*) FROM candidates WHERE status='APPLIED' OR claimed_by IS NOT NULL").fetchone()[0]
+    conn.close()
+    ok = len(decided) == len(set(decided)) == candidates and left == 0
+    return candidates / elapsed, sum(lost for _, lost in outcomes), ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--batch", default="1,10,50", help="Comma-separated claim batch sizes")
+    parser.add_argument("--work-ms", type=float, default=0, help="Simulated screening time per candidate")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="hireos_bench_"))
+    print(f"{args.candidates:,} candidates, {args.work_ms}ms of work each\n")
+    print(f"{'workers':>8} {'batch':>6} {'cand/s':>10} {'lost CAS':>9}  check")
+    all_ok = True
+    for workers in [int(w) for w in args.workers.split(",")]:
+        for batch in [int(b) for b in args.batch.split(",")]:
+            rate, lost, ok = run(args.candidates, workers, batch, args.work_ms)
+            all_ok &= ok
+            print(f"{workers:>8} {batch:>6} {rate:>10,.0f} {lost:>9}  {'ok' if ok else 'DOUBLE-PROCESSED OR MISSING'}")
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
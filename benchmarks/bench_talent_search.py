@@ -0,0 +1,70 @@
+"""
+Latency benchmark for talent rediscovery over a synthetic applicant pool.
+
+    python benchmarks/bench_talent_search.py --candidates 1000000
+
+Builds a throw-away database in a temp directory (resume tokens follow a
+Zipf-like distribution, so common skills have very long posting lists) and
+reports p50/p95 search latency against the 100ms budget.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+SKILLS = ("python java javascript typescript aws gcp azure docker kubernetes react angular node.js c++ c# sql "
+          "postgresql mongodb redis spark kafka airflow terraform go rust django flask fastapi pytorch tensorflow "
+          "pandas linux git ci/cd graphql").split()
+BUDGET_MS = 100
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="hireos_bench_"))
+    from src.database_manager import get_db_connection
+    from src.talent_search import index_tokens, search_past_applicants
+
+    vocab = SKILLS + [f"term{i}" for i in range(30000)]
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(vocab))]
+
+    conn = get_db_connection()
+    conn.execute("INSERT INTO jobs (title) VALUES ('Past job')")
+    start = time.perf_counter()
+    batch = 10000
+    for offset in range(0, args.candidates, batch):
+        n = min(batch, args.candidates - offset)
+        for i in range(offset + 1, offset + n + 1):
+            conn.execute(
+                "INSERT INTO candidates (id, job_id, name, email, status) VALUES (?, 1, ?, ?, 'APPLIED')",
+                (i, f"cand{i}", f"cand{i}@example.com")
+            )
+            # Same incremental path add_candidate uses
+            index_tokens(conn, i, random.choices(vocab, weights=weights, k=120), random.choices(SKILLS, k=8))
+        conn.commit()
+        print(f"  indexed {offset + n:,} candidates ({time.perf_counter() - start:.0f}s)")
+    conn.close()
+
+    timings = []
+    for _ in range(args.queries):
+        query = "Engineer: " + ", ".join(random.sample(SKILLS, 6)) + " " + " ".join(random.sample(vocab, 4))
+        t = time.perf_counter()
+        search_past_applicants(query, top_k=10)
+        timings.append((time.perf_counter() - t) * 1000)
+
+    timings.sort()
+    p50, p95 = timings[len(timings) // 2], timings[int(len(timings) * 0.95) - 1]
+    print(f"\n{args.candidates:,} candidates: p50={p50:.1f}ms p95={p95:.1f}ms (budget {BUDGET_MS}ms)")
+    sys.exit(0 if p95 <= BUDGET_MS else 1)
+
+
+if __name__ == "__main__":
+    main()
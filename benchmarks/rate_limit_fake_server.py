@@ -0,0 +1,182 @@
+"""
+Checks the OpenAI rate limiter end to end against a local fake server: the
+real clients (get_chat_llm -> RateLimitedTransport -> limiter) are pointed
+at it, so every construction site's path is exercised without touching the
+real API.
+
+    python benchmarks/rate_limit_fake_server.py --storm-seconds 5 --interactive-p95 2
+
+Three phases, with batch and interactive traffic on different models (OpenAI
+rate limits are per model, so only the batch model is throttled):
+
+    storm     batch model answers 429 at --throttle-ratio; interactive turns
+              must stay under --interactive-p95 and all succeed
+    outage    batch model answers 503; the batch breaker must open while the
+              interactive breaker stays closed and interactive calls succeed
+    recovery  server healthy again; after the cooldown the batch breaker must
+              close on the next call
+
+Exits 1 if a check fails. Needs langchain-openai (no API key or network).
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src import rate_limiter
+from src.rate_limiter import get_limiter, is_circuit_open
+
+BATCH_MODEL = "gpt-4o-mini"
+INTERACTIVE_MODEL = "gpt-4o"
+
+
+def make_handler(server_state):
+    class FakeOpenAI(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = request.get("model")
+            mode = server_state["mode"]
+            if model == BATCH_MODEL and mode == "storm" and random.random() < server_state["throttle_ratio"]:
+                self.send_response(429)
+                self.send_header("retry-after", str(server_state["retry_after"]))
+                self.send_header("x-ratelimit-remaining-requests", "0")
+                self.send_header("x-ratelimit-reset-requests", f"{int(server_state['retry_after'] * 1000)}ms")
+                body = {"error": {"message": "Rate limit reached", "type": "requests"}}
+            elif model == BATCH_MODEL and mode == "outage":
+                self.send_response(503)
+                body = {"error": {"message": "Service unavailable", "type": "server_error"}}
+            else:
+                self.send_response(200)
+                self.send_header("x-ratelimit-limit-requests", "600")
+                body = {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "{\"score\": 80}"}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+                }
+            payload = json.dumps(body).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeOpenAI
+
+
+def timed_invoke(llm):
+    """(seconds, error or None) of one chat completion."""
+    start = time.perf_counter()
+    try:
+        llm.invoke("ping")
+        return time.perf_counter() - start, None
+    except Exception as e:
+        return time.perf_counter() - start, e
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storm-seconds", type=float, default=5)
+    parser.add_argument("--throttle-ratio", type=float, default=0.8)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--batch-threads", type=int, default=4)
+    parser.add_argument("--interactive-p95", type=float, default=2.0, help="Latency bound (s) during the storm")
+    parser.add_argument("--cooldown", type=float, default=1.0, help="Breaker cooldown used for the run (s)")
+    args = parser.parse_args()
+
+    server_state = {"mode": "storm", "throttle_ratio": args.throttle_ratio, "retry_after": args.retry_after}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(server_state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_BASE_URL"] = os.environ["OPENAI_API_BASE"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+    print(f"Fake OpenAI listening on {base_url}")
+
+    from src.llm_clients import get_chat_llm
+    rate_limiter.BACKOFF_BASE = 0.05
+    limiter = get_limiter()
+    for breaker in limiter.breakers.values():
+        breaker.cooldown = args.cooldown
+    batch_llm = get_chat_llm(BATCH_MODEL, temperature=0, traffic="batch")
+    interactive_llm = get_chat_llm(INTERACTIVE_MODEL, temperature=0, traffic="interactive")
+    failures = []
+
+    # 1. STORM: batch threads hammer the throttled model while a candidate takes turns
+    stop = threading.Event()
+    batch_results = []
+
+    def batch_worker():
+        while not stop.is_set():
+            batch_results.append(timed_invoke(batch_llm))
+
+    threads = [threading.Thread(target=batch_worker, daemon=True) for _ in range(args.batch_threads)]
+    for t in threads:
+        t.start()
+    interactive = []
+    storm_end = time.monotonic() + args.storm_seconds
+    while time.monotonic() < storm_end:
+        interactive.append(timed_invoke(interactive_llm))
+        time.sleep(0.1)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies = [seconds for seconds, _ in interactive]
+    errors = [e for _, e in interactive if e]
+    p50, p95 = percentile(latencies, 0.5), percentile(latencies, 0.95)
+    batch_errors = sum(1 for _, e in batch_results if e)
+    print(f"storm     interactive n={len(latencies)} p50={p50 * 1000:.0f}ms p95={p95 * 1000:.0f}ms "
+          f"errors={len(errors)} | batch n={len(batch_results)} errors={batch_errors} | "
+          f"throttled={limiter.stats['throttled']}")
+    if p95 > args.interactive_p95:
+        failures.append(f"interactive p95 {p95:.2f}s over {args.interactive_p95}s during the storm")
+    if errors:
+        failures.append(f"{len(errors)} interactive turns failed during the storm ({errors[0]!r})")
+    if not limiter.stats['throttled']:
+        failures.append("the fake server never throttled (storm not exercised)")
+
+    # 2. OUTAGE: the batch breaker opens, interactive keeps working
+    server_state["mode"] = "outage"
+    rejected = False
+    outage_end = time.monotonic() + 30
+    while not rejected and time.monotonic() < outage_end:
+        _, error = timed_invoke(batch_llm)
+        rejected = error is not None and is_circuit_open(error)
+    _, interactive_error = timed_invoke(interactive_llm)
+    states = {t: b.state for t, b in limiter.breakers.items()}
+    print(f"outage    batch breaker rejected calls: {rejected}, breakers: {states}")
+    if not rejected or states["batch"] != "open":
+        failures.append(f"batch breaker did not open during the outage (state {states['batch']})")
+    if states["interactive"] != "closed" or interactive_error:
+        failures.append(f"interactive traffic affected by the batch outage ({states['interactive']}, {interactive_error!r})")
+
+    # 3. RECOVERY: after the cooldown one probe closes the breaker again
+    server_state["mode"] = "healthy"
+    time.sleep(args.cooldown)
+    _, error = timed_invoke(batch_llm)
+    state = limiter.breakers["batch"].state
+    print(f"recovery  batch call error: {error!r}, batch breaker: {state}")
+    if error or state != "closed":
+        failures.append(f"batch breaker did not recover (state {state}, error {error!r})")
+
+    server.shutdown()
+    print(f"limiter stats: {limiter.stats}")
+    if failures:
+        print(f"\n❌ Rate limiter check failed: {'; '.join(failures)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
-import sqlite3
-import pandas as pd
+import sys
+from src.database_manager import get_db_connection
+from src.export import export_candidates
 
-# Connect to the database
-conn = sqlite3.connect("data/hire_os.db")
+# Streams rows instead of loading whole tables; for filtered / Parquet exports
+# use `python -m src.export --help`
+
+conn = get_db_connection()
 
 print("--- 1. ALL JOBS ---")
-jobs = pd.read_sql("SELECT * FROM jobs", conn)
-print(jobs)
+for row in conn.execute("SELECT * FROM jobs"):
+    print(dict(row))
 
-print("\n--- 2. ALL CANDIDATES ---")
-candidates = pd.read_sql("SELECT * FROM candidates", conn)
-print(candidates)
+conn.close()
 
-conn.close()
\ No newline at end of file
+print("\n--- 2. ALL CANDIDATES ---")
+sys.stdout.flush()
+export_candidates(sys.stdout.buffer, "csv")
@@ -1,22 +1,22 @@
 import streamlit as st
-import pandas as pd
 import sys
 import os
 import re
+import sqlite3
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.database_manager import add_candidate, get_db_connection
+from src.app_cache import get_open_jobs
+from services.storage_service import put_bytes
 
 st.set_page_config(page_title="HIRE_OS Careers", page_icon="🚀", layout="centered")
 
 st.title("🚀 Join the HIRE_OS Team")
 st.caption("Browse our open positions and apply instantly with our AI-powered portal.")
 
-# 1. Fetch Open Jobs
-conn = get_db_connection()
-jobs = conn.execute("SELECT id, title, description FROM jobs WHERE status='OPEN'").fetchall()
-conn.close()
+# 1. Fetch Open Jobs (process-wide cache, invalidated when a job is added or deleted)
+jobs = get_open_jobs()
 
 if not jobs:
     st.warning("⚠️ No positions are currently open. Please check back later.")
@@ -52,6 +52,8 @@ else:
                 st.error("⚠️ Please enter a valid email address.")
 
             else:
+                email = email.strip().lower()  # Same normalization as the bulk import and the interview login
+
                 # 3. DUPLICATE CHECK: Has this email already applied?
                 conn = get_db_connection()
                 existing_app = conn.execute(
@@ -64,18 +66,15 @@ else:
                     st.warning("🚫 You have already applied for this position! Please check your email for updates.")
                 
                 else:
-                    # 4. SAVE FILE
-                    os.makedirs("data/resumes", exist_ok=True)
-                    clean_name = name.replace(" ", "_")
-                    file_path = os.path.join("data/resumes", f"{job_id}_{clean_name}.pdf")
-                    
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+                    # 4. SAVE FILE (content-addressed: same-name applicants never overwrite each other)
+                    file_path = put_bytes(uploaded_file.getbuffer(), "resumes", ".pdf")
                     
                     # 5. SAVE TO DB
                     try:
                         add_candidate(job_id, name, email, file_path)
                         st.success(f"✅ Application Submitted! Good luck, {name}.")
                         st.balloons()
+                    except sqlite3.IntegrityError:  # Submitted twice at the same moment
+                        st.warning("🚫 You have already applied for this position! Please check your email for updates.")
                     except Exception as e:
                         st.error(f"An error occurred: {e}")
\ No newline at end of file
@@ -1,11 +1,25 @@
 import sqlite3
 import os
 import glob
+import shutil
 
 # Configuration
 DB_PATH = "data/hire_os.db"
 RESUME_DIR = "data/resumes"
 TRANSCRIPT_DIR = "data/transcripts"
+STORE_DIR = "data/store"  # Content-addressed resumes/transcripts (services/storage_service.py)
+
+# Everything keyed by candidate id. Candidate ids restart at 1 after a reset,
+# so any row left here would be attached to the next applicant with that id.
+# Jobs, policies, openers, the question bank and the resume corpus (keyed by
+# file hash) are kept.
+CANDIDATE_TABLES = (
+    "candidates", "interview_turns", "stored_objects",
+    "screening_items", "screening_runs", "email_log", "tasks", "pipeline_events", "routing_log",
+    "candidate_scores", "candidate_profiles", "candidate_skills", "candidate_resume_docs",
+    "talent_postings", "talent_terms", "talent_docs",
+    "candidate_events", "metric_cursors", "stage_open", "stage_durations", "stage_daily",
+)
 
 def clean_folder(folder_path, extension="*"):
     """Deletes all files in a folder matching the extension."""
@@ -31,10 +45,13 @@ def reset_database():
         count = cursor.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
         print(f"📊 Found {count} candidates to remove.")
 
-        # 2. Delete all candidates
-        cursor.execute("DELETE FROM candidates")
+        # 2. Delete all candidates and everything that refers to them
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for table in CANDIDATE_TABLES:
+            if table in existing:  # Older databases may not have every table yet
+                cursor.execute(f"DELETE FROM {table}")
         
-        # 3. Reset the auto-increment counter for candidates (Optional, for clean IDs)
+        # 3. Reset the auto-increment counter for candidates (safe: nothing above still refers to old ids)
         cursor.execute("DELETE FROM sqlite_sequence WHERE name='candidates'")
 
         conn.commit()
@@ -58,6 +75,10 @@ def main():
         
         print("\n3. Cleaning Interview Transcripts...")
         clean_folder(TRANSCRIPT_DIR, "*.txt")
+        clean_folder(TRANSCRIPT_DIR, "*.jsonl.gz")
+        if os.path.isdir(STORE_DIR):
+            shutil.rmtree(STORE_DIR)
+            print(f"   Deleted: {STORE_DIR}")
         
         print("\n✨ SYSTEM READY FOR DEMO! ✨")
         print("---------------------------------")
@@ -0,0 +1,450 @@
+"""
+Content-addressed file store for resumes and transcripts.
+
+Files are stored under their SHA-256 and referenced from the DB as
+`store://<kind>/<h[0:2]>/<h[2:4]>/<hash><ext>`, so directories fan out into
+65,536 shards, identical uploads are stored once and two candidates can
+never overwrite each other's file:
+
+    ref = put_bytes(uploaded.getbuffer(), "resumes", ".pdf")
+    text = read_bytes(ref)
+    path = local_path(ref)          # for code that needs a real file (PDF workers)
+
+Backends (HIRE_OS_STORAGE):
+    local      sharded directory tree under data/store (default)
+    s3         any S3-compatible object store (boto3; HIRE_OS_S3_BUCKET, HIRE_OS_S3_ENDPOINT)
+    s3-local   the same S3 code path against a directory stand-in (tests, demos)
+
+Writes are atomic (temp file + rename, or a single PUT). Each DB reference
+holds one count in `stored_objects`: retain() in the transaction that saves
+the reference, release() when it goes away; an object is deleted when its
+count reaches zero. Plain paths from before the store are still accepted by
+every read function.
+
+    python -m services.storage_service --migrate   # move legacy flat files into the store
+"""
+import io
+import os
+import sys
+import time
+import uuid
+import shutil
+import hashlib
+import argparse
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+REF_PREFIX = "store://"
+STORE_DIR = "data/store"
+OBJECT_CACHE_DIR = "data/store_cache"      # Local copies of object-store files (content-addressed, never stale)
+LOCAL_OBJECT_DIR = "data/object_store"     # Directory used by the s3-local stand-in
+DELETE_GRACE_SECONDS = 3600                # Objects written this recently are left to the GC
+CHUNK = 1024 * 1024
+
+
+def is_ref(ref):
+    return isinstance(ref, str) and ref.startswith(REF_PREFIX)
+
+
+def _key(ref):
+    return ref[len(REF_PREFIX):]
+
+
+def content_hash(ref):
+    """SHA-256 of a stored file, read from its ref (no I/O). None for legacy paths."""
+    if not is_ref(ref):
+        return None
+    name = os.path.basename(_key(ref))
+    return name.split(".", 1)[0]
+
+
+def _make_key(kind, digest, ext):
+    return f"{kind}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def _hash_to_temp(fileobj, directory):
+    """Copies a stream to a temp file while hashing it. Returns (temp path, sha256, size)."""
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+    digest, size = hashlib.sha256(), 0
+    with open(tmp_path, "wb") as out:
+        for chunk in iter(lambda: fileobj.read(CHUNK), b""):
+            digest.update(chunk)
+            size += len(chunk)
+            out.write(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+    return tmp_path, digest.hexdigest(), size
+
+
+# --- 1. BACKENDS ---
+
+class LocalBackend:
+    """Sharded directory tree; writes are temp file + fsync + rename."""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def put_stream(self, fileobj, kind, ext):
+        tmp_path, digest, _ = _hash_to_temp(fileobj, os.path.join(self.root, "tmp"))
+        key = _make_key(kind, digest, ext)
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            os.utime(path)  # Keeps a re-uploaded object out of the GC grace window
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return key
+
+    def open(self, key):
+        return open(self._path(key), "rb")
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def local_path(self, key):
+        return self._path(key)
+
+    def mtime(self, key):
+        return os.path.getmtime(self._path(key))
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_keys(self):
+        """Yields (key, mtime, size) of every stored object."""
+        for dirpath, _, filenames in os.walk(self.root):
+            rel = os.path.relpath(dirpath, self.root)
+            if rel.split(os.sep)[0] == "tmp":
+                continue
+            for name in filenames:
+                stat = os.stat(os.path.join(dirpath, name))
+                yield "/".join(rel.split(os.sep) + [name]), stat.st_mtime, stat.st_size
+
+
+def _not_found(error):
+    if isinstance(error, FileNotFoundError):
+        return True
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class ObjectStoreBackend:
+    """
+    S3 API backend (put_object / get_object / head_object / delete_object /
+    list_objects_v2). Files needed as real paths are cached locally by key.
+    """
+
+    def __init__(self, client, bucket, cache_dir=OBJECT_CACHE_DIR):
+        self.client = client
+        self.bucket = bucket
+        self.cache_dir = cache_dir
+
+    def put_stream(self, fileobj, kind, ext):
+        # The key is the content hash, so the upload is spooled to disk first
+        tmp_path, digest, size = _hash_to_temp(fileobj, os.path.join(self.cache_dir, "tmp"))
+        key = _make_key(kind, digest, ext)
+        try:
+            with open(tmp_path, "rb") as body:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=body, ContentLength=size)
+            cached = os.path.join(self.cache_dir, *key.split("/"))
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            os.replace(tmp_path, cached)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return key
+
+    def open(self, key):
+        cached = os.path.join(self.cache_dir, *key.split("/"))
+        if os.path.exists(cached):
+            return open(cached, "rb")
+        return io.BytesIO(self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception as e:
+            if _not_found(e):
+                return False
+            raise
+
+    def local_path(self, key):
+        cached = os.path.join(self.cache_dir, *key.split("/"))
+        if not os.path.exists(cached):
+            body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+            tmp_path, _, _ = _hash_to_temp(body, os.path.join(self.cache_dir, "tmp"))
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            os.replace(tmp_path, cached)
+        return cached
+
+    def mtime(self, key):
+        return self.client.head_object(Bucket=self.bucket, Key=key)["LastModified"].timestamp()
+
+    def size(self, key):
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        cached = os.path.join(self.cache_dir, *key.split("/"))
+        if os.path.exists(cached):
+            os.remove(cached)
+
+    def iter_keys(self):
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            for obj in page.get("Contents", []):
+                yield obj["Key"], obj["LastModified"].timestamp(), obj["Size"]
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
+
+
+class LocalObjectClient:
+    """
+    Directory stand-in for the subset of the S3 client API the backend uses,
+    so the object-store code path runs without a server.
+    """
+
+    def __init__(self, root=LOCAL_OBJECT_DIR):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def put_object(self, Bucket, Key, Body, **_):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(Body, out, CHUNK)
+        os.replace(tmp_path, path)
+        return {}
+
+    def get_object(self, Bucket, Key):
+        return {"Body": open(self._path(Bucket, Key), "rb")}
+
+    def head_object(self, Bucket, Key):
+        stat = os.stat(self._path(Bucket, Key))
+        return {"ContentLength": stat.st_size, "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc)}
+
+    def delete_object(self, Bucket, Key):
+        try:
+            os.remove(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+    def list_objects_v2(self, Bucket, **_):
+        base = os.path.join(self.root, Bucket)
+        contents = []
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                contents.append({
+                    "Key": os.path.relpath(path, base).replace(os.sep, "/"),
+                    "Size": stat.st_size,
+                    "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                })
+        return {"Contents": contents, "IsTruncated": False}
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        kind = os.getenv("HIRE_OS_STORAGE", "local")
+        bucket = os.getenv("HIRE_OS_S3_BUCKET", "hire-os")
+        if kind == "s3":
+            import boto3  # Optional dependency, only for the s3 backend
+            _backend = ObjectStoreBackend(boto3.client("s3", endpoint_url=os.getenv("HIRE_OS_S3_ENDPOINT")), bucket)
+        elif kind == "s3-local":
+            _backend = ObjectStoreBackend(LocalObjectClient(), bucket)
+        else:
+            _backend = LocalBackend()
+    return _backend
+
+
+# --- 2. WRITES ---
+
+def put_stream(fileobj, kind, ext):
+    """Stores a binary stream. Returns its ref (idempotent for identical content)."""
+    return REF_PREFIX + get_backend().put_stream(fileobj, kind, ext)
+
+
+def put_bytes(data, kind, ext):
+    return put_stream(io.BytesIO(bytes(data)), kind, ext)
+
+
+def put_file(path, kind, ext=None):
+    with open(path, "rb") as f:
+        return put_stream(f, kind, ext if ext is not None else os.path.splitext(path)[1])
+
+
+# --- 3. READS (refs or legacy plain paths) ---
+
+def exists(ref):
+    if not ref:
+        return False
+    return get_backend().exists(_key(ref)) if is_ref(ref) else os.path.exists(ref)
+
+
+def open_file(ref):
+    return get_backend().open(_key(ref)) if is_ref(ref) else open(ref, "rb")
+
+
+def read_bytes(ref):
+    with open_file(ref) as f:
+        return f.read()
+
+
+def size(ref):
+    return get_backend().size(_key(ref)) if is_ref(ref) else os.path.getsize(ref)
+
+
+def local_path(ref):
+    """A real file path for the ref (downloaded to the local cache for object stores)."""
+    return get_backend().local_path(_key(ref)) if is_ref(ref) else ref
+
+
+# --- 4. REFERENCE COUNTS ---
+
+def retain(conn, refs):
+    """One more reference per ref; call inside the transaction that saves them (caller commits)."""
+    conn.executemany("""
+        INSERT INTO stored_objects (key, refcount, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT(key) DO UPDATE SET refcount = refcount + 1, updated_at = excluded.updated_at
+    """, [(_key(ref), datetime.now()) for ref in refs if is_ref(ref)])
+
+
+def release(refs):
+    """
+    Drops one reference per ref and deletes objects nobody references any
+    more. Objects written within DELETE_GRACE_SECONDS are left to the GC, so
+    a concurrent upload of identical content never loses its file.
+    Returns the keys deleted.
+    """
+    keys = [_key(ref) for ref in refs if is_ref(ref)]
+    if not keys:
+        return []
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("UPDATE stored_objects SET refcount = refcount - 1, updated_at = ? WHERE key = ?",
+                         [(datetime.now(), key) for key in keys])
+        unreferenced = [
+            row['key'] for row in conn.execute(
+                f"SELECT key FROM stored_objects WHERE refcount <= 0 AND key IN ({','.join('?' * len(set(keys)))})",
+                list(set(keys))
+            )
+        ]
+        conn.executemany("DELETE FROM stored_objects WHERE key = ?", [(key,) for key in unreferenced])
+        conn.commit()
+    finally:
+        conn.close()
+
+    backend, cutoff, deleted = get_backend(), time.time() - DELETE_GRACE_SECONDS, []
+    for key in unreferenced:
+        try:
+            if backend.exists(key) and backend.mtime(key) < cutoff:
+                backend.delete(key)
+                deleted.append(key)
+        except Exception as e:
+            print(f"⚠️ Could not delete stored object {key}: {e}")
+    return deleted
+
+
+def collect_orphans(dry_run=True, grace_seconds=DELETE_GRACE_SECONDS):
+    """
+    Stored objects with no reference (never retained, or released inside
+    the grace window) and older than the grace period. Deleted unless
+    dry_run. Returns (count, bytes, keys).
+    """
+    conn = get_db_connection()
+    referenced = {row['key'] for row in conn.execute("SELECT key FROM stored_objects WHERE refcount > 0")}
+    conn.close()
+    backend, cutoff = get_backend(), time.time() - grace_seconds
+    orphans = [(key, size) for key, mtime, size in backend.iter_keys() if key not in referenced and mtime < cutoff]
+    if not dry_run:
+        for key, _ in orphans:
+            backend.delete(key)
+    return len(orphans), sum(size for _, size in orphans), [REF_PREFIX + key for key, _ in orphans]
+
+
+# --- 5. MIGRATION ---
+
+LEGACY_COLUMNS = {"resume_path": "resumes", "interview_transcript_path": "transcripts"}
+
+
+def _transcript_ext(path):
+    return ".jsonl.gz" if path.endswith(".jsonl.gz") else os.path.splitext(path)[1]
+
+
+def migrate_legacy_files(delete_originals=True):
+    """
+    Moves files referenced by plain paths (data/resumes, data/transcripts)
+    into the store and rewrites the candidate rows. Returns files migrated.
+    """
+    conn = get_db_connection()
+    migrated = 0
+    try:
+        for column, kind in LEGACY_COLUMNS.items():
+            rows = conn.execute(
+                f"SELECT id, {column} AS path FROM candidates WHERE {column} IS NOT NULL AND {column} NOT LIKE ?",
+                (REF_PREFIX + "%",)
+            ).fetchall()
+            by_path = {}
+            for row in rows:
+                by_path.setdefault(row['path'], []).append(row['id'])
+            for path, candidate_ids in by_path.items():
+                if not os.path.isfile(path):
+                    continue
+                ref = put_file(path, kind, _transcript_ext(path) if kind == "transcripts" else None)
+                conn.executemany(f"UPDATE candidates SET {column} = ? WHERE id = ?", [(ref, cid) for cid in candidate_ids])
+                retain(conn, [ref] * len(candidate_ids))
+                conn.commit()
+                if delete_originals:
+                    os.remove(path)
+                migrated += 1
+    finally:
+        conn.close()
+    print(f"📦 Migrated {migrated} files into the store")
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS file store")
+    parser.add_argument("--migrate", action="store_true", help="Move legacy flat files into the store")
+    parser.add_argument("--keep-originals", action="store_true")
+    parser.add_argument("--orphans", action="store_true", help="Report unreferenced stored objects")
+    parser.add_argument("--delete", action="store_true", help="With --orphans: delete them")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate_legacy_files(delete_originals=not args.keep_originals)
+    if args.orphans:
+        count, size, _ = collect_orphans(dry_run=not args.delete)
+        print(f"🗑️ {'Deleted' if args.delete else 'Found'} {count} unreferenced objects ({size / 1e6:.1f} MB)")
@@ -4,14 +4,44 @@ import re
 import sys
 from crewai import Agent, Task, Crew
 from crewai.tools import BaseTool
-from langchain_openai import ChatOpenAI
-from pypdf import PdfReader
-from openai import OpenAI  # <--- Need this for DALL-E
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.database_manager import get_db_connection
+from src.llm_clients import get_chat_llm, get_openai_client  # <--- Rate-limited OpenAI clients
 from services.email_service import send_shortlist_email, send_rejection_email # <--- Imported Email Service
+from services import storage_service as storage
+from src.screening_runs import (
+    start_or_resume_run,
+    lease_items,
+    renew_lease,
+    checkpoint_score,
+    complete_item,
+    fail_item,
+    flag_item,
+    finish_run_if_done,
+    get_run_progress,
+    get_run_log,
+    get_unscored_resumes,
+    send_email_once,
+    worker_id
+)
+from src.resume_corpus import get_corpus, get_doc_id, get_resume_text
+from src.transcripts import read_transcript_file, render_within_budget, load_turns
+from src.requirement_matcher import compile_requirements, save_match
+from src.pdf_extraction import extract_resume, ExtractionError, ResumePrefetcher
+from src.model_router import route
+from src.decision_policy import (
+    get_policy, screen_decision, grade_decision, parse_sub_scores, record_score, SCREEN_SUB_SCORES, GRADE_SUB_SCORES
+)
+from src.candidate_status import transition, claim_candidate, claim_candidates, release_claims
+
+# Configuration
+AGENT_MODE = os.getenv("HIRE_OS_AGENT_MODE", "direct")  # "direct": one LLM call with the document inlined, "tool": CrewAI agent reads the file
+DEFAULT_CONTEXT_TOKENS = 3000  # Used when a job has no context_token_budget
+CHARS_PER_TOKEN = 4            # Rough English average, good enough for budgeting
+SECTION_PRIORITY = ["skills", "experience", "projects", "summary", "header", "education", "certifications", "other"]
+GRADABLE_STATUSES = ("INTERVIEW_COMPLETED", "FINALIST")  # FINALIST: re-running grading updates scores
 
 
 # --- 1. DEFINE TOOLS NATIVELY ---
@@ -22,13 +52,10 @@ class ResumeReadTool(BaseTool):
 
     def _run(self, file_path: str) -> str:
         try:
-            if not os.path.exists(file_path):
+            if not storage.exists(file_path):
                 return f"Error: File not found at {file_path}"
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
+            # Parsed in the sandboxed extraction pool, never in this process
+            return extract_resume(file_path)
         except Exception as e:
             return f"Error reading PDF: {e}"
 
@@ -38,219 +65,495 @@ class TranscriptReadTool(BaseTool):
 
     def _run(self, file_path: str) -> str:
         try:
-            if not os.path.exists(file_path):
+            if not storage.exists(file_path):
                 return f"Error: File not found at {file_path}"
-            with open(file_path, "r") as f:
-                return f.read()
+            return read_transcript_file(file_path)
         except Exception as e:
             return f"Error reading transcript: {e}"
 
 # --- 2. AGENT FACTORY ---
 
-def create_screener_agent():
+def create_screener_agent(model_name="gpt-4o"):
     return Agent(
         role='Senior Technical Recruiter',
         goal='Analyze resumes to filter the top 10% of candidates.',
         backstory="""You are an expert HR recruiter. You look for specific keywords and project experience.""",
         tools=[ResumeReadTool()],
         verbose=True,
-        llm=ChatOpenAI(model_name="gpt-4o", temperature=0)
+        llm=get_chat_llm(model_name, temperature=0, traffic="batch")
     )
 
 
 
-def create_grader_agent():
+def create_grader_agent(model_name="gpt-4o"):
     return Agent(
         role='Chief Technology Officer',
         goal='Evaluate interview transcripts and make hiring decisions.',
         backstory="""You are a CTO who values deep technical understanding.""",
         tools=[TranscriptReadTool()],
         verbose=True,
-        llm=ChatOpenAI(model_name="gpt-4o", temperature=0)
+        llm=get_chat_llm(model_name, temperature=0, traffic="batch")
     )
 
 
 
-# --- 3. ORCHESTRATION ---
+# --- 3. DIRECT CONTEXT (no tool round trip) ---
 
-def run_resume_screening(job_id):
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def trim_to_budget(text, max_tokens):
+    """
+    Keeps the head and the tail of a long text (the middle is dropped).
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    head = max_chars * 2 // 3
+    return text[:head] + "\n[...]\n" + text[-(max_chars - head):]
+
+
+def build_resume_context(candidate_id, resume_path, max_tokens=DEFAULT_CONTEXT_TOKENS):
+    """
+    Resume text for a single-shot prompt (from the pre-extracted corpus).
+    Over budget, sections are kept in SECTION_PRIORITY order.
+    Returns None if the resume cannot be read.
+    """
+    text = get_resume_text(candidate_id, resume_path)
+    if text is None:
+        return None
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sections = get_corpus().get_sections(get_doc_id(candidate_id))
+    budget = max_tokens * CHARS_PER_TOKEN
+    parts = []
+    for name in SECTION_PRIORITY:
+        chunk = sections.get(name)
+        if not chunk or budget <= 0:
+            continue
+        parts.append(chunk[:budget])
+        budget -= len(parts[-1])
+    return "\n\n".join(parts) or trim_to_budget(text, max_tokens)
+
+
+def build_transcript_context(candidate_id, transcript_path, max_tokens=DEFAULT_CONTEXT_TOKENS):
+    """
+    Transcript for a single-shot prompt: built from the recorded turns when
+    there are any, otherwise from the (legacy) transcript file.
+    """
+    if load_turns(candidate_id, last_n=1):
+        return render_within_budget(candidate_id, max_tokens)
+    return trim_to_budget(read_transcript_file(transcript_path), max_tokens)
+
+
+def parse_llm_json(output_str):
+    """
+    Returns the first {...} object in an LLM answer as a dict, or None.
+    """
+    json_match = re.search(r'\{.*\}', output_str, re.DOTALL)
+    if not json_match:
+        return None
+    try:
+        return json.loads(json_match.group())
+    except ValueError:
+        return None
+
+
+SCREENING_FORMAT = (
+    "Output JSON with score (0-100), summary, and sub_scores "
+    '{"skills": 0-100, "experience": 0-100, "projects": 0-100}.'
+)
+
+
+def screen_direct(llm, job_context, candidate_id, resume_path, max_tokens=DEFAULT_CONTEXT_TOKENS):
+    """
+    Scores one resume with a single LLM call. Returns the raw answer.
+    """
+    resume_text = build_resume_context(candidate_id, resume_path, max_tokens)
+    if resume_text is None:
+        raise FileNotFoundError(f"Resume not readable: {resume_path}")
+
+    prompt = f"""
+    You are a Senior Technical Recruiter. You look for specific keywords and project experience.
+
+    1. Match the resume below against: {job_context}
+    2. {SCREENING_FORMAT}
+
+    RESUME:
+    {resume_text}
+    """
+    return llm.predict(prompt)
+
+
+def screen_with_tools(screener, job_context, resume_path):
+    """
+    Scores one resume through the CrewAI agent (the agent calls ResumeReadTool).
+    """
+    task = Task(
+        description=f"""
+        1. Read the resume at path: '{resume_path}'.
+        2. Match against: {job_context}
+        3. {SCREENING_FORMAT}
+        """,
+        expected_output="JSON with score, sub_scores and summary",
+        agent=screener
+    )
+    crew = Crew(agents=[screener], tasks=[task], verbose=True)
+    return str(crew.kickoff())
+
+
+GRADING_FORMAT = """
+    OUTPUT FORMAT (Strict JSON, no markdown):
+    {
+        "score": <integer_0_to_100>,
+        "feedback": "<2-sentence_justification>",
+        "decision": "<FINALIST_or_REJECTED>",
+        "sub_scores": {"technical_depth": <0-100>, "problem_solving": <0-100>, "communication": <0-100>}
+    }
+"""
+
+
+def grade_direct(llm, job, candidate_id, name, transcript_path, max_tokens=DEFAULT_CONTEXT_TOKENS):
+    """
+    Grades one interview transcript with a single LLM call. Returns the raw answer.
+    """
+    transcript = build_transcript_context(candidate_id, transcript_path, max_tokens)
+    prompt = f"""
+    You are a CTO who values deep technical understanding.
+
+    1. Evaluate candidate '{name}' for the role of '{job['title']}'.
+    2. Requirements: {job['requirements']}.
+    {GRADING_FORMAT}
+    TRANSCRIPT:
+    {transcript}
+    """
+    return llm.predict(prompt)
+
+
+def grade_with_tools(grader, job, name, transcript_path):
+    task = Task(
+        description=f"""
+        1. Read the interview transcript at: '{transcript_path}'.
+        2. Evaluate candidate '{name}' for the role of '{job['title']}'.
+        3. Requirements: {job['requirements']}.
+        {GRADING_FORMAT}
+        """,
+        expected_output="JSON object with score, feedback, and decision",
+        agent=grader
+    )
+    crew = Crew(agents=[grader], tasks=[task], verbose=True)
+    return str(crew.kickoff())
+
+
+# --- 4. ORCHESTRATION ---
+
+def run_resume_screening(job_id, progress_cb=None):
+    """
+    Screens all APPLIED candidates of a job as a checkpointed screening run.
+    If a previous run for this job was interrupted, it is resumed: candidates
+    that were already scored are not sent to the LLM again and emails that
+    were already sent are not repeated.
+    progress_cb(done, total) is called after every candidate (used by the worker).
+    """
     conn = get_db_connection()
     
     # Get Job
-    job = conn.execute("SELECT title, description, requirements FROM jobs WHERE id=?", (job_id,)).fetchone()
+    job = conn.execute(
+        "SELECT title, description, requirements, context_token_budget FROM jobs WHERE id=?", (job_id,)
+    ).fetchone()
+    conn.close()
     if not job:
-        conn.close()
         return "Job not found."
     
     job_context = f"Job Title: {job['title']}\nDescription: {job['description']}\nRequirements: {job['requirements']}"
+    max_tokens = job['context_token_budget'] or DEFAULT_CONTEXT_TOKENS
+    matcher = compile_requirements(job['requirements'] or "")
+    policy = get_policy(job_id)
 
-    # Get Candidates (Added 'email' to the query so we can send the notification)
-    candidates = conn.execute("SELECT id, name, email, resume_path FROM candidates WHERE job_id=? AND status='APPLIED'", (job_id,)).fetchall()
-    
-    if not candidates:
-        conn.close()
+    # Create (or resume) the run for this job
+    run_id = start_or_resume_run(job_id)
+    if run_id is None:
         return "No pending candidates to screen."
 
-    screener = create_screener_agent()
-    results_log = []
+    screeners = {}  # model -> Agent/LLM, only built if a candidate still needs an LLM call
+    owner = worker_id()
 
-    print(f"🕵️ Starting screening for {len(candidates)} candidates...")
+    # PDF extraction runs ahead of the LLM stage in a separate process pool
+    prefetcher = ResumePrefetcher(get_unscored_resumes(run_id))
 
-    for cand in candidates:
-        cand_id = cand['id']
-        name = cand['name']
-        email = cand['email']  # Capture email
-        resume_path = cand['resume_path']
+    print(f"🕵️ Screening run #{run_id}: {get_run_progress(run_id)}")
 
-        print(f"Processing {name} (File: {resume_path})...")
+    while True:
+        # A batch per write transaction: parallel runs of the same job contend once per batch
+        items = lease_items(run_id, owner)
+        if not items:
+            break
 
-        task = Task(
-            description=f"""
-            1. Read the resume at path: '{resume_path}'.
-            2. Match against: {job_context}
-            3. Output JSON with score (0-100) and summary.
-            """,
-            expected_output="JSON with score and summary",
-            agent=screener
-        )
+        for item in items:
+            if not renew_lease(item['item_id'], owner):
+                continue  # Lease expired and another worker took the item
+            cand_id = item['candidate_id']
+            name = item['name']
+            email = item['email']  # Capture email
+            resume_path = item['resume_path']
 
-        crew = Crew(agents=[screener], tasks=[task], verbose=True)
-        result = crew.kickoff()
-        
-        # Simple Parse
-        try:
-            output_str = str(result)
-            json_match = re.search(r'\{.*\}', output_str, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                score = data.get('score', 0)
-                summary = data.get('summary', "Parsed summary.")
-            else:
-                score = 0
-                summary = "Parsing failed."
-        except:
-            score = 0
-            summary = "Error parsing result."
-
-        # Determine Status
-        new_status = 'SHORTLISTED' if score >= 70 else 'REJECTED'
-        
-        # Update Database
-        conn.execute("UPDATE candidates SET resume_score=?, resume_summary=?, status=? WHERE id=?", 
-                     (score, summary, new_status, cand_id))
-        conn.commit()
-
-        # --- EMAIL NOTIFICATION TRIGGER ---
-        if new_status == "SHORTLISTED":
-            print(f"📧 Sending Shortlist Email to {name}...")
             try:
-                send_shortlist_email(email, name, job['title'])
-                results_log.append(f"{name}: {score} (SHORTLISTED & Emailed)")
+                if item['score'] is None:
+                    print(f"Processing {name} (File: {resume_path})...")
+
+                    # Hard filter (only for jobs whose policy opts in): resumes missing the
+                    # must-have skills never reach the LLM; otherwise the pre-score only ranks
+                    match = None
+                    try:
+                        prefetcher.wait(cand_id)
+                        resume_text = get_resume_text(cand_id, resume_path)
+                    except ExtractionError as e:
+                        if e.retryable:
+                            raise
+                        print(f"☣️ {name}: resume could not be read ({e}), flagged for review")
+                        flag_item(item['item_id'], cand_id, e)
+                        continue
+                    if resume_text is not None:
+                        match = matcher.match(resume_text)
+                        save_match(cand_id, match)
+
+                    sub_scores = {}
+                    hard_rejected = bool(match and match['rejected'] and policy['hard_reject'])
+                    if hard_rejected:
+                        score = match['score']
+                        summary = f"Missing must-have skills: {', '.join(match['missing'])}."
+                        print(f"⛔ {name}: {summary}")
+                    else:
+                        def screen(model_name):
+                            if model_name not in screeners:
+                                screeners[model_name] = (
+                                    create_screener_agent(model_name) if AGENT_MODE == "tool"
+                                    else get_chat_llm(model_name, temperature=0, traffic="batch")
+                                )
+                            if AGENT_MODE == "tool":
+                                return screen_with_tools(screeners[model_name], job_context, resume_path)
+                            return screen_direct(screeners[model_name], job_context, cand_id, resume_path, max_tokens)
+
+                        # Cheap model first, GPT-4o only for borderline scores
+                        output_str = route("screen", job_id, cand_id, screen, parse_llm_json)
+
+                        # Simple Parse
+                        data = parse_llm_json(output_str)
+                        if data:
+                            score = data.get('score', 0)
+                            summary = data.get('summary', "Parsed summary.")
+                            sub_scores = parse_sub_scores(data, SCREEN_SUB_SCORES)
+                        else:
+                            score = 0
+                            summary = "Parsing failed."
+
+                    # Determine Status (threshold/weights come from the job's decision policy)
+                    new_status = screen_decision(policy, score, sub_scores, hard_rejected)
+                
+                    # Checkpoint: candidate row + raw score + work item in one transaction
+                    if not checkpoint_score(item['item_id'], cand_id, score, summary, new_status, sub_scores,
+                                            source="matcher" if hard_rejected else "llm"):
+                        new_status = None
+                else:
+                    # Scored before a crash; only the notification is left to do
+                    print(f"Resuming {name} (already scored)...")
+                    score = item['score']
+                    new_status = item['new_status']
             except Exception as e:
-                print(f"❌ Failed to send email: {e}")
-                results_log.append(f"{name}: {score} (SHORTLISTED - Email Failed)")
+                print(f"❌ Screening failed for {name}: {e}")
+                fail_item(item['item_id'], e)
+                continue
+
+            # --- EMAIL NOTIFICATION TRIGGER (idempotent per candidate + stage) ---
+            if new_status is None:
+                # Another run or an admin moved the candidate first: their decision stands
+                complete_item(item['item_id'], "Skipped - decided elsewhere")
+
+            elif new_status == "SHORTLISTED":
+                print(f"📧 Sending Shortlist Email to {name}...")
+                if send_email_once(cand_id, 'SHORTLIST', send_shortlist_email, email, name, job['title']):
+                    complete_item(item['item_id'], "SHORTLISTED & Emailed")
+                else:
+                    complete_item(item['item_id'], "SHORTLISTED - Email Failed")
     
-        else: 
-            # --- NEW: SEND REJECTION EMAIL AUTOMATICALLY ---
-            print(f"📉 Rejection: Sending email to {name}...")
-            try:
-                send_rejection_email(email, name, job['title'])
-                results_log.append(f"{name}: {score} (REJECTED & Emailed)")
-            except Exception as e:
-                print(f"❌ Failed to send rejection email: {e}")
-                results_log.append(f"{name}: {score} (REJECTED - Email Failed)")
+            else: 
+                # --- NEW: SEND REJECTION EMAIL AUTOMATICALLY ---
+                print(f"📉 Rejection: Sending email to {name}...")
+                if send_email_once(cand_id, 'REJECTION', send_rejection_email, email, name, job['title']):
+                    complete_item(item['item_id'], "REJECTED & Emailed")
+                else:
+                    complete_item(item['item_id'], "REJECTED - Email Failed")
+
+            if progress_cb:
+                progress = get_run_progress(run_id)
+                progress_cb(progress['DONE'] + progress['FAILED'], sum(progress.values()))
+
+    finish_run_if_done(run_id)
 
+    # Shortlisted candidates will log in soon: have their greeting ready
+    conn = get_db_connection()
+    shortlisted = conn.execute(
+        "SELECT COUNT(*) FROM candidates WHERE job_id=? AND status='SHORTLISTED'", (job_id,)
+    ).fetchone()[0]
     conn.close()
-    return "\n".join(results_log)
+    if shortlisted:
+        try:
+            from src.interview_bot import prepare_opener
+            prepare_opener(job_id, traffic="batch")
+        except Exception as e:
+            print(f"⚠️ Could not prepare interview opener: {e}")
+
+    return "\n".join(get_run_log(run_id))
+
+
+
+
+def _grade_claimed(conn, job_id, job, policy, cand, owner, graders, max_tokens):
+    """
+    Grades one claimed candidate and, if the claim still holds, stores the
+    score and decision. Returns the result line, or None if skipped.
+    """
+    cand_id = cand['id']
+    name = cand['name']
+    transcript_path = cand['interview_transcript_path']
+    
+    if not storage.exists(transcript_path):
+        print(f"Skipping {name}: No transcript found.")
+        release_claims(owner, [cand_id])
+        return None
+
+    print(f"Processing {name}...")
+    
+    def grade(model_name):
+        if model_name not in graders:
+            graders[model_name] = (
+                create_grader_agent(model_name) if AGENT_MODE == "tool"
+                else get_chat_llm(model_name, temperature=0, traffic="batch")
+            )
+        if AGENT_MODE == "tool":
+            return grade_with_tools(graders[model_name], job, name, transcript_path)
+        return grade_direct(graders[model_name], job, cand_id, name, transcript_path, max_tokens)
+
+    try:
+        output_str = route("grade", job_id, cand_id, grade, parse_llm_json)
+    except Exception:
+        release_claims(owner, [cand_id])
+        raise
+
+    # --- PARSING LOGIC ---
+    data = None
+    try:
+        data = parse_llm_json(output_str)
+        
+        sub_scores = {}
+        if data:
+            score = data.get('score', 0)
+            feedback = data.get('feedback', "No feedback provided.")
+            decision = str(data.get('decision', "REJECTED")).upper()
+            sub_scores = parse_sub_scores(data, GRADE_SUB_SCORES)
+        else:
+            score = 50
+            feedback = "Manual Review Needed (Parse Failed)"
+            decision = "FINALIST" 
+            
+    except Exception as e:
+        print(f"Error parsing: {e}")
+        score = 0
+        feedback = f"Error: {e}"
+        decision = "REJECTED"
+
+    # Determine Final Status (the grader's decision unless the job's policy sets a threshold)
+    final_status = grade_decision(policy, score, sub_scores, decision) if data else (
+        "FINALIST" if "FINALIST" in decision else "REJECTED"
+    )
 
+    # Update Database with REAL Score (raw score kept separately from the decision),
+    # only if the candidate is still ours and still waiting for a grade
+    if not transition(conn, cand_id, (cand['status'],), final_status, owner=owner,
+                      interview_score=score, interview_feedback=feedback):
+        conn.rollback()
+        print(f"⏭️ {name} was moved elsewhere while grading; result discarded")
+        return None
+    record_score(conn, cand_id, "grade", score, sub_scores, llm_decision=decision)
+    conn.commit()
+    return f"{name}: {score}/100 -> {final_status}"
 
 
+def grade_candidate(candidate_id):
+    """
+    Grades a single submitted interview: the grade_candidate task queued by
+    the interview.submitted event (src/event_bus.py), so each candidate is
+    graded right after finishing. Returns the result line, or None if the
+    candidate is not waiting for a grade (another worker has it, or its
+    job was deleted).
+    """
+    owner = worker_id()
+    cand = claim_candidate(candidate_id, "INTERVIEW_COMPLETED", owner)
+    if cand is None:
+        return None
+    conn = get_db_connection()
+    try:
+        job = conn.execute(
+            "SELECT title, requirements, context_token_budget FROM jobs WHERE id=?", (cand['job_id'],)
+        ).fetchone()
+        if job is None:  # Job deleted after the interview was submitted
+            release_claims(owner, [candidate_id])
+            return None
+        max_tokens = job['context_token_budget'] or DEFAULT_CONTEXT_TOKENS
+        return _grade_claimed(conn, cand['job_id'], job, get_policy(cand['job_id']), cand, owner, {}, max_tokens)
+    finally:
+        conn.close()
 
-def run_interview_evaluation(job_id):
+
+def run_interview_evaluation(job_id, progress_cb=None):
     conn = get_db_connection()
-    job = conn.execute("SELECT title, requirements FROM jobs WHERE id=?", (job_id,)).fetchone()
+    job = conn.execute("SELECT title, requirements, context_token_budget FROM jobs WHERE id=?", (job_id,)).fetchone()
+    if job is None:  # Deleted while the evaluate_job task was queued
+        conn.close()
+        return "Job not found."
+    max_tokens = job['context_token_budget'] or DEFAULT_CONTEXT_TOKENS
+    policy = get_policy(job_id)
     
-    # Fetch candidates who are ready for evaluation
+    # Candidates who are ready for evaluation (normally graded one by one on submission, see grade_candidate)
     # Note: We also include 'FINALIST' here so you can re-run it to fix/update scores if needed
-    candidates = conn.execute("""
-        SELECT id, name, interview_transcript_path 
-        FROM candidates 
-        WHERE job_id=? AND (status='INTERVIEW_COMPLETED' OR status='FINALIST')
-    """, (job_id,)).fetchall()
+    total = conn.execute(
+        f"SELECT COUNT(*) FROM candidates WHERE job_id=? AND status IN ({','.join('?' * len(GRADABLE_STATUSES))})",
+        (job_id, *GRADABLE_STATUSES)
+    ).fetchone()[0]
 
-    if not candidates:
+    if not total:
         conn.close()
         return "No candidates ready for evaluation."
 
-    grader = create_grader_agent()
+    graders = {}  # model -> Agent/LLM
     results_log = []
+    owner = worker_id()
+    last_id = 0  # Claims walk the ids once, so a re-graded FINALIST is not picked up again
+    done = 0
 
-    print(f"👨‍💻 Evaluating {len(candidates)} transcripts...")
+    print(f"👨‍💻 Evaluating {total} transcripts...")
 
-    for cand in candidates:
-        cand_id = cand['id']
-        name = cand['name']
-        transcript_path = cand['interview_transcript_path']
-        
-        if not transcript_path or not os.path.exists(transcript_path):
-            print(f"Skipping {name}: No transcript found.")
-            continue
+    while True:
+        # Claimed in batches: a second run of the same job (another tab, another worker) takes other candidates
+        batch = claim_candidates(job_id, GRADABLE_STATUSES, owner, after_id=last_id)
+        if not batch:
+            break
+        last_id = batch[-1]['id']
 
-        print(f"Processing {name}...")
-        
-        task = Task(
-            description=f"""
-            1. Read the interview transcript at: '{transcript_path}'.
-            2. Evaluate candidate '{name}' for the role of '{job['title']}'.
-            3. Requirements: {job['requirements']}.
-            
-            OUTPUT FORMAT (Strict JSON, no markdown):
-            {{
-                "score": <integer_0_to_100>,
-                "feedback": "<2-sentence_justification>",
-                "decision": "<FINALIST_or_REJECTED>"
-            }}
-            """,
-            expected_output="JSON object with score, feedback, and decision",
-            agent=grader
-        )
+        for cand in batch:
+            if progress_cb:
+                progress_cb(min(done, total), total)
+            done += 1
 
-        crew = Crew(agents=[grader], tasks=[task], verbose=True)
-        result = crew.kickoff()
-        
-        # --- PARSING LOGIC ---
-        try:
-            output_str = str(result)
-            json_match = re.search(r'\{.*\}', output_str, re.DOTALL)
-            
-            if json_match:
-                data = json.loads(json_match.group())
-                score = data.get('score', 0)
-                feedback = data.get('feedback', "No feedback provided.")
-                decision = str(data.get('decision', "REJECTED")).upper()
-            else:
-                score = 50
-                feedback = "Manual Review Needed (Parse Failed)"
-                decision = "FINALIST" 
-                
-        except Exception as e:
-            print(f"Error parsing: {e}")
-            score = 0
-            feedback = f"Error: {e}"
-            decision = "REJECTED"
-
-        # Determine Final Status
-        final_status = "FINALIST" if "FINALIST" in decision else "REJECTED"
-
-        # Update Database with REAL Score
-        conn.execute("""
-            UPDATE candidates 
-            SET interview_score = ?, interview_feedback = ?, status = ?
-            WHERE id = ?
-        """, (score, feedback, final_status, cand_id))
-        
-        conn.commit()
-        results_log.append(f"{name}: {score}/100 -> {final_status}")
+            try:
+                result = _grade_claimed(conn, job_id, job, policy, cand, owner, graders, max_tokens)
+            except Exception as e:
+                print(f"❌ Grading failed for {cand['name']}: {e}")
+                continue
+            if result:
+                results_log.append(result)
 
     conn.close()
     return "\n".join(results_log) 
@@ -260,7 +563,7 @@ def generate_viral_linkedin_post(job_title, requirements, description):
     """
     Uses GPT-4o to write a high-engagement LinkedIn post with the Apply Link.
     """
-    llm = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
+    llm = get_chat_llm("gpt-4o", temperature=0.7, traffic="interactive")
     
     # 🔗 DEFINE THE LINK (Change this if you deploy to the cloud later)
     portal_link = "https://hire-os-v0-apply-dashboard.streamlit.app" 
@@ -295,7 +598,7 @@ def generate_job_image(job_title, requirements):
     Uses DALL-E 3 to generate a professional, tech-themed image for the job post.
     Returns the image URL.
     """
-    client = OpenAI() 
+    client = get_openai_client(traffic="interactive")
 
     visual_prompt = f"""
     A professional, futuristic, and vibrant digital illustration suitable for a LinkedIn job announcement post.
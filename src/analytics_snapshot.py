@@ -0,0 +1,165 @@
+"""
+Read-only analytics snapshot of the live database.
+
+Heavy dashboard reads (analytics, exports) run on a copy made with the SQLite
+online backup API instead of on data/hire_os.db, so they never hold the live
+file while add_candidate, screening or save_transcript write to it:
+
+    rows, status = read(("funnel",), lambda conn: conn.execute(SQL).fetchall())
+    status['age_seconds']  ->  how stale the snapshot is
+
+The copy is refreshed on read once it is older than MAX_AGE and something
+was committed since it was taken (or continuously with --watch). A refresh
+writes a new file and renames it over the old one, so open readers keep the
+previous snapshot until they close.
+
+    python -m src.analytics_snapshot            # refresh once
+    python -m src.analytics_snapshot --watch 30 # refresh every 30s
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection, DB_PATH
+
+SNAPSHOT_PATH = "data/hire_os_analytics.db"
+MAX_AGE = float(os.getenv("HIRE_OS_SNAPSHOT_MAX_AGE", "30"))  # Seconds
+
+_refresh_lock = threading.Lock()
+_watch = {"conn": None, "data_version": None}  # Change detection for this process
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _live_changed():
+    """
+    True if anything was committed to the live DB since the last call.
+    PRAGMA data_version on a long-lived connection changes with every commit
+    made by other connections, and costs no I/O.
+    """
+    if _watch["conn"] is None:
+        get_db_connection().close()  # Make sure the schema exists
+        _watch["conn"] = sqlite3.connect(DB_PATH, check_same_thread=False)
+    version = _watch["conn"].execute("PRAGMA data_version").fetchone()[0]
+    changed = version != _watch["data_version"]
+    _watch["data_version"] = version
+    return changed
+
+
+def _read_meta():
+    """{copied_at, checked_at} of the current snapshot, or None."""
+    try:
+        conn = connect()
+        row = conn.execute("SELECT copied_at, checked_at FROM snapshot_meta").fetchone()
+        conn.close()
+        return dict(row) if row else None
+    except sqlite3.Error:
+        return None
+
+
+def _write_meta(path, copied_at, checked_at):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS snapshot_meta (copied_at REAL, checked_at REAL)")
+    conn.execute("DELETE FROM snapshot_meta")
+    conn.execute("INSERT INTO snapshot_meta (copied_at, checked_at) VALUES (?, ?)", (copied_at, checked_at))
+    conn.commit()
+    conn.close()
+
+
+# --- 1. REFRESH ---
+
+def refresh_snapshot(force=False):
+    """
+    Copies the live DB into SNAPSHOT_PATH (one backup step: in WAL mode the
+    read transaction does not block writers). When nothing was committed
+    since the last copy made by this process, only the check time is
+    updated, unless force. Returns True if copied.
+    """
+    with _refresh_lock:
+        changed = _live_changed()  # Checked before the copy: a racing commit only causes one extra refresh
+        meta = _read_meta()
+        now = time.time()
+        if meta and not changed and not force:
+            _write_meta(SNAPSHOT_PATH, meta['copied_at'], now)
+            return False
+
+        tmp_path = f"{SNAPSHOT_PATH}.{os.getpid()}.tmp"
+        src = get_db_connection()
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst)
+            dst.execute("PRAGMA journal_mode=DELETE")  # A read-only WAL file would need its -shm
+            dst.commit()
+        finally:
+            dst.close()
+            src.close()
+        _write_meta(tmp_path, now, now)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+        print(f"📸 Analytics snapshot refreshed ({os.path.getsize(SNAPSHOT_PATH) / 1e6:.1f} MB)")
+        return True
+
+
+def ensure_fresh(max_age=MAX_AGE):
+    """Refreshes the snapshot if missing or last checked over max_age ago. Returns snapshot_status()."""
+    meta = _read_meta()
+    if meta is None or time.time() - meta['checked_at'] > max_age:
+        refresh_snapshot()
+    return snapshot_status()
+
+
+def snapshot_status():
+    """
+    copied_at: when the data was copied (identifies the snapshot)
+    age_seconds: how stale it can be, i.e. time since the live DB was last
+    checked for changes (None values if there is no snapshot yet)
+    """
+    meta = _read_meta()
+    if meta is None:
+        return {"copied_at": None, "checked_at": None, "age_seconds": None}
+    return dict(meta, age_seconds=round(time.time() - meta['checked_at'], 1))
+
+
+# --- 2. READS ---
+
+def connect():
+    """Read-only connection to the snapshot."""
+    conn = sqlite3.connect(f"file:{SNAPSHOT_PATH}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def read(key, loader, max_age=MAX_AGE):
+    """
+    Returns (loader(conn), status) run on the snapshot. The result is kept
+    until the snapshot holds different data, so reruns cost one meta lookup.
+    """
+    status = ensure_fresh(max_age)
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and hit[0] == status['copied_at']:
+        return hit[1], status
+    conn = connect()
+    try:
+        value = loader(conn)
+    finally:
+        conn.close()
+    with _cache_lock:
+        _cache[key] = (status['copied_at'], value)
+    return value, status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS analytics snapshot")
+    parser.add_argument("--watch", type=float, help="Refresh every N seconds until interrupted")
+    parser.add_argument("--force", action="store_true", help="Copy even if nothing changed")
+    args = parser.parse_args()
+
+    refresh_snapshot(force=args.force)
+    while args.watch:
+        time.sleep(args.watch)
+        refresh_snapshot()
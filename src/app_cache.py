@@ -0,0 +1,80 @@
+"""
+Process-wide caches for the Streamlit pages.
+
+All pages run in one Streamlit server process, so a module-level cache is
+shared by every session and every rerun:
+
+    get_data(key, loader, ttl)        re-loaded after `ttl` seconds or invalidate()
+
+Job lists and job details are cached here; add_job and delete_job_permanently
+invalidate them, so a rerun with unchanged data makes no DB query at all
+(checked by benchmarks/bench_rerun_queries.py). The TTL only bounds
+staleness for writes made by other processes. Per-job candidate queries use
+the version counters of src/data_versions.py instead; OpenAI clients are
+shared by src/llm_clients.py.
+"""
+import os
+import sys
+import time
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+DEFAULT_TTL = float(os.getenv("HIRE_OS_CACHE_TTL", "60"))  # Seconds
+
+_data = {}
+_lock = threading.Lock()
+
+
+# --- 1. CACHES ---
+
+def get_data(key, loader, ttl=DEFAULT_TTL):
+    now = time.monotonic()
+    with _lock:
+        hit = _data.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    value = loader()
+    with _lock:
+        _data[key] = (now + ttl, value)
+    return value
+
+
+def invalidate(*prefixes):
+    """Drops data entries whose key tuple starts with one of the prefixes (all if none)."""
+    with _lock:
+        if not prefixes:
+            _data.clear()
+            return
+        for key in list(_data):
+            if any(key[:len(prefix)] == prefix for prefix in prefixes):
+                del _data[key]
+
+
+# --- 2. CACHED QUERIES ---
+
+def get_open_jobs():
+    """[dict(id, title, description, requirements)] of OPEN jobs."""
+    def load():
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT id, title, description, requirements FROM jobs WHERE status='OPEN'"
+        ).fetchall()
+        conn.close()
+        return [dict(r) for r in rows]
+    return get_data(("jobs", "open"), load)
+
+
+def get_job(job_id):
+    def load():
+        conn = get_db_connection()
+        row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+    return get_data(("jobs", "detail", job_id), load)
+
+
+def invalidate_jobs():
+    invalidate(("jobs",))
@@ -0,0 +1,277 @@
+"""
+Archival of closed jobs, compaction and orphan-file garbage collection.
+
+    python -m src.archival --archive --older-than-days 30 --dry-run
+    python -m src.archival --archive --job-id 3
+    python -m src.archival --gc --dry-run
+    python -m src.archival --vacuum
+
+Archiving moves a job out of the hot database: its rows (every table keyed
+by the job or by one of its candidates) and its resume / transcript files
+are written into one gzipped SQLite file, data/archive/job_<id>.db.gz,
+then deleted from the live DB and released from the file store
+(services/storage_service.py). An archive is a plain SQLite
+database once gunzipped (files are in its `archived_files` table).
+
+Freed pages are returned to the filesystem with incremental VACUUM, and the
+GC removes stored objects and legacy files (data/resumes, data/transcripts)
+that no candidate row references.
+"""
+import os
+import sys
+import gzip
+import time
+import shutil
+import argparse
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from services import storage_service as storage
+
+ARCHIVE_DIR = "data/archive"
+FILE_DIRS = ["data/resumes", "data/transcripts"]  # Flat directories from before the file store
+FILE_COLUMNS = ["resume_path", "interview_transcript_path"]  # Columns of `candidates` pointing at files
+GC_GRACE_SECONDS = 3600  # Uploads are written before their candidate row exists
+SETTLED_STATUSES = ("REJECTED", "HIRED", "REJECTED_FINAL")  # Candidates with nothing left to do
+
+# Operational or derived tables: never archived (derived rows are removed by their owners)
+SKIP_TABLES = {
+    "sqlite_sequence", "tasks", "workers", "rate_limits", "data_versions", "resume_docs",
+    "quarantined_files", "question_bank", "talent_postings", "talent_terms", "talent_docs",
+}
+
+
+def _archived_tables(conn):
+    """[(table, WHERE clause with one `?` for the job id)] for everything belonging to a job."""
+    tables = []
+    for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"):
+        if table in SKIP_TABLES:
+            continue
+        columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if table == "jobs":
+            tables.append((table, "id = ?"))
+        elif "job_id" in columns:
+            tables.append((table, "job_id = ?"))
+        elif "candidate_id" in columns:
+            tables.append((table, "candidate_id IN (SELECT id FROM main.candidates WHERE job_id = ?)"))
+    return tables
+
+
+def _job_files(conn, job_id):
+    """Every file reference of the job's candidates (a shared file appears once per reference)."""
+    refs = []
+    for row in conn.execute(f"SELECT {', '.join(FILE_COLUMNS)} FROM candidates WHERE job_id = ?", (job_id,)):
+        refs.extend(row[col] for col in FILE_COLUMNS if row[col])
+    return refs
+
+
+def _referenced_files(conn):
+    """Normalized legacy paths still referenced by any candidate row."""
+    paths = set()
+    for row in conn.execute(f"SELECT {', '.join(FILE_COLUMNS)} FROM candidates"):
+        paths.update(os.path.normpath(row[col]) for col in FILE_COLUMNS if row[col] and not storage.is_ref(row[col]))
+    return paths
+
+
+def remove_files(refs):
+    """
+    Drops references whose candidate rows are gone: stored files are released
+    (deleted at refcount zero), legacy files are deleted if no remaining
+    candidate points at them. Returns the number of files deleted.
+    """
+    deleted = len(storage.release([ref for ref in refs if storage.is_ref(ref)]))
+    legacy = [path for path in refs if not storage.is_ref(path)]
+    if legacy:
+        conn = get_db_connection()
+        referenced = _referenced_files(conn)
+        conn.close()
+        for path in set(legacy):
+            if os.path.normpath(path) in referenced or not os.path.isfile(path):
+                continue
+            try:
+                os.remove(path)
+                deleted += 1
+            except OSError as e:
+                print(f"⚠️ Could not delete {path}: {e}")
+    return deleted
+
+
+# --- 1. ARCHIVAL ---
+
+def archivable_jobs(older_than_days=30):
+    """
+    Jobs no longer OPEN, or whose deadline passed more than N days ago and
+    whose candidates are all settled (an OPEN job with someone still
+    shortlisted or waiting for the HR round stays, however old).
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    conn = get_db_connection()
+    rows = conn.execute(f"""
+        SELECT id FROM jobs
+        WHERE status != 'OPEN'
+           OR (deadline < ? AND NOT EXISTS (
+                SELECT 1 FROM candidates c
+                WHERE c.job_id = jobs.id AND c.status NOT IN ({','.join('?' * len(SETTLED_STATUSES))})
+              ))
+        ORDER BY id
+    """, (str(cutoff), *SETTLED_STATUSES)).fetchall()
+    conn.close()
+    return [row['id'] for row in rows]
+
+
+def archive_job(job_id, dry_run=False):
+    """
+    Moves a job, its candidates and their files into data/archive/job_<id>.db.gz.
+    Returns a report dict (rows per table, files, bytes); nothing changes on dry_run.
+    """
+    conn = get_db_connection()
+    try:
+        tables = _archived_tables(conn)
+        rows = {table: conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", (job_id,)).fetchone()[0]
+                for table, where in tables}
+        refs = _job_files(conn, job_id)
+        files = sorted(ref for ref in set(refs) if storage.exists(ref))
+        report = {
+            "job_id": job_id,
+            "rows": {table: count for table, count in rows.items() if count},
+            "files": len(files),
+            "file_bytes": sum(storage.size(ref) for ref in files),
+        }
+        if dry_run or not rows.get("jobs"):
+            return report
+        candidate_ids = [r['id'] for r in conn.execute("SELECT id FROM candidates WHERE job_id = ?", (job_id,))]
+
+        # 1. Copy rows + files into an uncompressed archive DB next to the final one
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        archive_path = os.path.join(ARCHIVE_DIR, f"job_{job_id}.db.gz")
+        tmp_path = archive_path[:-len(".gz")] + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn.execute("ATTACH DATABASE ? AS archive", (tmp_path,))
+        for table, where in tables:
+            conn.execute(f"CREATE TABLE archive.{table} AS SELECT * FROM main.{table} WHERE {where}", (job_id,))
+        conn.execute("CREATE TABLE archive.archived_files (path TEXT PRIMARY KEY, data BLOB)")
+        for ref in files:
+            conn.execute("INSERT INTO archive.archived_files (path, data) VALUES (?, ?)", (ref, storage.read_bytes(ref)))
+        conn.commit()
+        conn.execute("DETACH DATABASE archive")
+
+        # 2. Compress, and only then remove anything from the live DB
+        with open(tmp_path, "rb") as src, gzip.open(archive_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(tmp_path)
+        report['archive'] = archive_path
+        report['archive_bytes'] = os.path.getsize(archive_path)
+
+        # 3. Candidate-keyed rows first: their WHERE clause looks candidates up by job
+        conn.execute("BEGIN IMMEDIATE")
+        for table, where in sorted(tables, key=lambda t: t[0] in ("candidates", "jobs")):
+            conn.execute(f"DELETE FROM main.{table} WHERE {where}", (job_id,))
+        conn.execute("DELETE FROM data_versions WHERE job_id = ?", (job_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+    # 4. Derived indexes and caches
+    try:
+        from src.talent_search import remove_candidates
+        remove_candidates(candidate_ids)
+    except Exception as e:
+        print(f"⚠️ Could not clean talent index: {e}")
+    from src.app_cache import invalidate_jobs
+    invalidate_jobs()
+
+    report['files_deleted'] = remove_files(refs)
+    print(f"🗄️ Job {job_id} archived to {archive_path} ({sum(rows.values())} rows, {len(files)} files)")
+    return report
+
+
+def archive_closed_jobs(older_than_days=30, dry_run=False):
+    reports = [archive_job(job_id, dry_run=dry_run) for job_id in archivable_jobs(older_than_days)]
+    if reports and not dry_run:
+        compact()
+    return reports
+
+
+# --- 2. COMPACTION ---
+
+def compact(max_pages=None):
+    """
+    Returns free pages to the filesystem. The first run switches the DB to
+    auto_vacuum=INCREMENTAL, which needs one full VACUUM; later runs only
+    release the free list. Returns the number of pages released.
+    """
+    conn = get_db_connection()
+    try:
+        before = conn.execute("PRAGMA page_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            print("🧹 Enabling incremental auto-vacuum (one-time full VACUUM)...")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            # Frees one page per step; execute() steps only once, executescript() runs it to the end
+            conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages or 0)});")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        released = before - conn.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"🧹 Compaction released {released} pages")
+    return released
+
+
+# --- 3. ORPHAN FILES ---
+
+def collect_garbage(dry_run=True, grace_seconds=GC_GRACE_SECONDS):
+    """
+    Finds stored objects and legacy files under FILE_DIRS that no candidate
+    references (older than the grace period) and deletes them unless
+    dry_run. Returns {files, bytes, paths}.
+    """
+    conn = get_db_connection()
+    referenced = _referenced_files(conn)
+    conn.close()
+
+    cutoff = time.time() - grace_seconds
+    orphans = []
+    for directory in FILE_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file() and os.path.normpath(entry.path) not in referenced and entry.stat().st_mtime < cutoff:
+                orphans.append((entry.path, entry.stat().st_size))
+
+    if not dry_run:
+        remove_files([path for path, _ in orphans])
+    stored, stored_bytes, stored_refs = storage.collect_orphans(dry_run=dry_run, grace_seconds=grace_seconds)
+    report = {
+        "files": len(orphans) + stored,
+        "bytes": sum(size for _, size in orphans) + stored_bytes,
+        "paths": [path for path, _ in orphans] + stored_refs,
+    }
+    print(f"🗑️ {'Would delete' if dry_run else 'Deleted'} {report['files']} orphan files ({report['bytes'] / 1e6:.1f} MB)")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS archival and storage maintenance")
+    parser.add_argument("--archive", action="store_true", help="Archive closed jobs (or --job-id)")
+    parser.add_argument("--job-id", type=int, help="Archive this job only")
+    parser.add_argument("--older-than-days", type=int, default=30)
+    parser.add_argument("--gc", action="store_true", help="Delete files no candidate references")
+    parser.add_argument("--vacuum", action="store_true", help="Release free pages")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+
+    if args.archive:
+        if args.job_id:
+            reports = [archive_job(args.job_id, dry_run=args.dry_run)]
+        else:
+            reports = archive_closed_jobs(args.older_than_days, dry_run=args.dry_run)
+        for report in reports:
+            print(report)
+    if args.gc:
+        collect_garbage(dry_run=args.dry_run)
+    if args.vacuum and not args.dry_run:
+        compact()
@@ -0,0 +1,245 @@
+"""
+Bulk candidate import from a CSV manifest plus a ZIP of resumes.
+
+    python -m src.bulk_import applications.csv --zip resumes.zip --job-id 3
+
+The manifest has one application per row with the columns name, email,
+resume (file name inside the ZIP, or a path on disk when no ZIP is given)
+and optionally job_id (otherwise --job-id). Rows are streamed in chunks:
+
+    1. validate + deduplicate by (email, job) against the DB and the file
+    2. stream the chunk's PDFs out of the ZIP into the file store, one member at a time
+    3. insert the chunk with executemany in one transaction
+    4. extract the PDFs in the sandboxed process pool, then write corpus,
+       profiles and talent index for the chunk in one transaction
+
+Neither the manifest nor the archive is ever loaded into memory as a whole.
+"""
+import os
+import sys
+import re
+import csv
+import time
+import zipfile
+import argparse
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from services import storage_service as storage
+
+CHUNK_SIZE = 1000
+EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")  # Same check as the apply portal
+
+
+def _read_manifest(csv_file):
+    """Yields normalized dicts from a CSV path or text file object."""
+    handle = open(csv_file, "r", newline="", encoding="utf-8-sig") if isinstance(csv_file, str) else csv_file
+    try:
+        for row in csv.DictReader(handle):
+            yield {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+    finally:
+        if handle is not csv_file:
+            handle.close()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _Deduper:
+    """(email, job) pairs already in the DB or earlier in the manifest; loaded per job on first use."""
+
+    def __init__(self):
+        self.seen = {}
+
+    def is_new(self, email, job_id):
+        if job_id not in self.seen:
+            conn = get_db_connection()
+            self.seen[job_id] = {
+                (r['email'] or "").lower() for r in conn.execute("SELECT email FROM candidates WHERE job_id=?", (job_id,))
+            }
+            conn.close()
+        return email.lower() not in self.seen[job_id]
+
+    def add(self, email, job_id):
+        """Records a pair once its row is staged (a row without a resume does not block a later one)."""
+        self.seen[job_id].add(email.lower())
+
+
+# --- 1. STAGES ---
+
+def _stage_files(chunk, archive, members, deduper, stats):
+    """Stores the chunk's resumes (streamed member by member). Returns insert rows."""
+    records = []
+    for row in chunk:
+        if not deduper.is_new(row['email'], row['job_id']):
+            stats['duplicates'] += 1
+            continue
+        resume = row.get('resume', "")
+        path = None
+        if archive is not None:
+            info = members.get(resume) or members.get(os.path.basename(resume))
+            if info is not None:
+                with archive.open(info) as src:
+                    path = storage.put_stream(src, "resumes", ".pdf")
+        elif resume and os.path.exists(resume):
+            path = storage.put_file(resume, "resumes", ".pdf")
+
+        if path is None:
+            stats['missing_resume'] += 1
+            continue
+        deduper.add(row['email'], row['job_id'])
+        records.append((row['job_id'], row['name'], row['email'], path))
+    return records
+
+
+def _insert(records):
+    """
+    One transaction per chunk. Rows that collide with an application saved
+    meanwhile (UNIQUE job_id, email) are skipped. Returns [(candidate_id, resume_path)].
+    """
+    conn = get_db_connection()
+    try:
+        now = datetime.now()
+        conn.execute("BEGIN IMMEDIATE")  # Holds the write lock, so new ids follow the current maximum
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM candidates").fetchone()[0]
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidates (job_id, name, email, resume_path, applied_at) VALUES (?, ?, ?, ?, ?)",
+            [record + (now,) for record in records]
+        )
+        inserted = conn.execute(
+            "SELECT id, resume_path FROM candidates WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        storage.retain(conn, [row['resume_path'] for row in inserted])
+        conn.commit()
+    finally:
+        conn.close()
+    return [(row['id'], row['resume_path']) for row in inserted]
+
+
+def _ingest(inserted, pool, stats):
+    """Extracts the chunk in parallel, then corpus + profiles + talent index."""
+    from src.pdf_extraction import extract_many
+    from src.resume_corpus import add_resumes, get_corpus, tokenize
+    from src.candidate_profiles import parse_profile, save_profile
+    from src.talent_search import index_tokens
+
+    by_path = {}
+    for cand_id, path in inserted:
+        by_path.setdefault(path, []).append(cand_id)
+
+    extracted = []
+    for path, content_hash, text, error in extract_many(list(by_path), pool=pool):
+        if error:
+            stats['extract_failed'] += len(by_path[path])
+            continue
+        extracted += [(cand_id, content_hash, text) for cand_id in by_path[path]]
+    ingested = add_resumes(extracted).items() if extracted else []
+
+    corpus = get_corpus()
+    conn = get_db_connection()
+    try:
+        for cand_id, doc_id in ingested:
+            text = corpus.get_text(doc_id)
+            save_profile(conn, cand_id, parse_profile(text, corpus.get_sections(doc_id)))
+            index_tokens(conn, cand_id, tokenize(text), [])
+        conn.commit()
+    finally:
+        conn.close()
+    stats['ingested'] += len(extracted)
+
+
+# --- 2. ENTRY POINT ---
+
+def import_applications(csv_file, zip_path=None, job_id=None, chunk_size=CHUNK_SIZE, extract=True, progress_cb=None):
+    """
+    Imports a manifest (path or text file object). Returns a stats dict with
+    rows read, inserted, duplicates, invalid, missing resumes, extraction
+    failures, seconds and rows per second.
+    progress_cb(stats) is called after every chunk.
+    """
+    start = time.perf_counter()
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "missing_resume": 0,
+             "ingested": 0, "extract_failed": 0}
+
+    archive = zipfile.ZipFile(zip_path) if zip_path else None  # Reads the central directory only
+    members = {}
+    if archive is not None:
+        for info in archive.infolist():
+            if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                members[info.filename] = info
+                members.setdefault(os.path.basename(info.filename), info)
+
+    pool = None
+    if extract:
+        try:
+            import pypdf  # noqa: F401
+            from src.pdf_extraction import ExtractionPool
+            pool = ExtractionPool()
+        except ImportError as e:
+            print(f"⚠️ Importing without text extraction ({e}); run `python -m src.resume_corpus --sync` later")
+
+    deduper = _Deduper()
+    try:
+        for chunk in _chunks(_read_manifest(csv_file), chunk_size):
+            valid = []
+            for row in chunk:
+                stats['read'] += 1
+                try:
+                    row['job_id'] = int(row.get('job_id') or job_id)
+                except (TypeError, ValueError):
+                    stats['invalid'] += 1
+                    continue
+                if not row.get('name') or not EMAIL_RE.match(row.get('email', "")):
+                    stats['invalid'] += 1
+                    continue
+                row['email'] = row['email'].lower()
+                valid.append(row)
+
+            records = _stage_files(valid, archive, members, deduper, stats)
+            if not records:
+                continue
+            inserted = _insert(records)
+            stats['inserted'] += len(inserted)
+            stats['duplicates'] += len(records) - len(inserted)  # Applied through the portal meanwhile
+            if pool is not None:
+                _ingest(inserted, pool, stats)
+
+            elapsed = time.perf_counter() - start
+            stats['seconds'] = round(elapsed, 2)
+            stats['rows_per_second'] = round(stats['read'] / elapsed, 1) if elapsed else 0.0
+            print(f"📦 {stats['read']:,} rows read, {stats['inserted']:,} inserted ({stats['rows_per_second']:,.0f} rows/s)")
+            if progress_cb:
+                progress_cb(dict(stats))
+    finally:
+        if pool is not None:
+            pool.close()
+        if archive is not None:
+            archive.close()
+
+    elapsed = time.perf_counter() - start
+    stats['seconds'] = round(elapsed, 2)
+    stats['rows_per_second'] = round(stats['read'] / elapsed, 1) if elapsed else 0.0
+    print(f"✅ Bulk import done: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS bulk candidate import")
+    parser.add_argument("manifest", help="CSV with name, email, resume[, job_id]")
+    parser.add_argument("--zip", dest="zip_path", help="ZIP archive containing the resume PDFs")
+    parser.add_argument("--job-id", type=int, help="Job for rows without a job_id column")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-extract", action="store_true", help="Skip text extraction (ingest later)")
+    args = parser.parse_args()
+
+    import_applications(args.manifest, args.zip_path, args.job_id, args.chunk_size, extract=not args.no_extract)
@@ -0,0 +1,265 @@
+"""
+Structured candidate profiles, extracted once when a candidate applies.
+
+    candidate_profiles  years_experience, education (+ numeric level),
+                        last_title, location
+    candidate_skills    one row per (skill, candidate) with the years of the
+                        experience entries that mention the skill
+
+Both are indexed, so questions like "5+ years of Python" or "knows AWS,
+based in Berlin" are plain SQL (search_profiles) instead of LLM calls.
+Extraction is deterministic: date ranges in the experience section, the
+requirement matcher's skill vocabulary and a few header patterns.
+
+    python -m src.candidate_profiles --rebuild
+    python -m src.candidate_profiles --skill python --min-years 5
+"""
+import os
+import sys
+import re
+import argparse
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from src.resume_corpus import get_resume_text, get_doc_id, get_corpus, tokenize
+from src.requirement_matcher import RequirementMatcher, KNOWN_SKILLS, canonical_skill
+
+# Two-letter abbreviations only count with dots ("b.e.", "m.s.") or before
+# "in" ("ms in physics"): bare "be", "ms", "ba" are ordinary words, units or
+# US states, and "master" alone matches job titles such as "Scrum Master".
+EDUCATION_LEVELS = [  # (level, name, patterns) - highest first
+    (4, "PhD", r"\b(ph\.?\s?d|doctorate|doctor of philosophy)\b"),
+    (3, "Masters", r"\b(master'?s?(?=\s+(?:degree|of|in)\b)|m\.?\s?sc|m\.\s?s|(?<!\d )ms in|m\.?\s?tech|mba|m\.?\s?eng|m\.\s?a|ma in)\b"),
+    (2, "Bachelors", r"\b(bachelor'?s?|b\.?\s?sc|b\.\s?s|bs in|b\.?\s?tech|b\.\s?e|b\.?\s?eng|b\.\s?a|ba in)\b"),
+    (1, "Associate", r"\b(associate'?s? degree|diploma)\b"),
+]
+MONTHS = {m: i for i, m in enumerate("jan feb mar apr may jun jul aug sep oct nov dec".split(), 1)}
+DATE_RANGE_RE = re.compile(
+    r"(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+|(\d{1,2})/)?((?:19|20)\d{2})"
+    r"\s*(?:-|–|—|to|until)\s*"
+    r"(?:(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+|(\d{1,2})/)?((?:19|20)\d{2})|(present|current|now|today))",
+    re.I
+)
+YEARS_CLAIM_RE = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)", re.I)
+LOCATION_RE = re.compile(r"(?:location|based in|address)\s*[:\-]?\s*([A-Za-z .'-]+(?:,\s*[A-Za-z .'-]+)?)", re.I)
+CITY_RE = re.compile(r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)?,\s*(?:[A-Z]{2}|[A-Z][a-z]+(?: [A-Z][a-z]+)?))\b")
+
+_skill_matcher = None
+
+
+def skill_matcher():
+    global _skill_matcher
+    if _skill_matcher is None:
+        _skill_matcher = RequirementMatcher(KNOWN_SKILLS, [])
+    return _skill_matcher
+
+
+# --- 1. EXTRACTION ---
+
+def _month_index(month_name, month_num, year, default_month):
+    month = MONTHS.get((month_name or "")[:3].lower()) or (int(month_num) if month_num else default_month)
+    return int(year) * 12 + min(max(month, 1), 12) - 1
+
+
+def _experience_entries(text, now=None):
+    """
+    Splits experience text into entries at every date range.
+    Returns [(start_month, end_month, title, entry_text)] (months since year 0).
+    """
+    now = now or datetime.now()
+    entries = []
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        m = DATE_RANGE_RE.search(line)
+        if not m:
+            if entries:
+                entries[-1][3].append(line)
+            continue
+        start = _month_index(m.group(1), m.group(2), m.group(3), 1)
+        if m.group(7):
+            end = now.year * 12 + now.month - 1
+        else:
+            end = _month_index(m.group(4), m.group(5), m.group(6), 12)
+        title = (line[:m.start()] + line[m.end():]).strip(" |,-–—()\t")
+        if not title and i > 0:
+            title = lines[i - 1].strip()
+        if end >= start:
+            entries.append([start, end, title, [line]])
+    return [(s, e, title, "\n".join(body)) for s, e, title, body in entries]
+
+
+def _union_years(intervals):
+    """Years covered by month intervals (overlapping jobs are counted once)."""
+    months, last_end = 0, None
+    for start, end in sorted(intervals):
+        if last_end is not None and start <= last_end:
+            if end > last_end:
+                months += end - last_end
+                last_end = end
+            continue
+        months += end - start + 1
+        last_end = end
+    return round(months / 12, 1)
+
+
+def parse_profile(text, sections=None):
+    """
+    Returns dict(years_experience, education, education_level, last_title,
+    location, skills={skill: years}) for a normalized resume text.
+    """
+    sections = sections or {}
+    experience = sections.get("experience") or text
+    entries = _experience_entries(experience)
+
+    years = _union_years([(s, e) for s, e, _, _ in entries]) if entries else None
+    if years is None:
+        claims = [int(n) for n in YEARS_CLAIM_RE.findall(sections.get("summary") or text[:2000])]
+        years = float(max(claims)) if claims else None
+
+    last_title = None
+    if entries:
+        latest = max(entries, key=lambda entry: (entry[1], entry[0]))
+        last_title = latest[2][:120] or None
+
+    education, education_level = None, 0
+    education_text = (sections.get("education") or text).lower()
+    for level, name, pattern in EDUCATION_LEVELS:
+        if re.search(pattern, education_text):
+            education, education_level = name, level
+            break
+
+    header = sections.get("header") or text[:500]
+    m = LOCATION_RE.search(header) or CITY_RE.search(header)
+    location = m.group(1).strip(" .,").lower() if m else None
+
+    matcher = skill_matcher()
+    skills = {skill: 0.0 for skill in matcher.scan(tokenize(text))}
+    for skill in skills:
+        intervals = [(s, e) for s, e, _, body in entries if skill in matcher.scan(tokenize(body))]
+        if intervals:
+            skills[skill] = _union_years(intervals)
+
+    return {
+        "years_experience": years, "education": education, "education_level": education_level,
+        "last_title": last_title, "location": location, "skills": skills,
+    }
+
+
+# --- 2. STORAGE ---
+
+def save_profile(conn, candidate_id, profile):
+    """Writes one profile (caller commits)."""
+    conn.execute("DELETE FROM candidate_skills WHERE candidate_id=?", (candidate_id,))
+    conn.execute("""
+        INSERT OR REPLACE INTO candidate_profiles
+            (candidate_id, years_experience, education, education_level, last_title, location, skills, extracted_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        candidate_id, profile['years_experience'], profile['education'], profile['education_level'],
+        profile['last_title'], profile['location'], ", ".join(sorted(profile['skills'])), datetime.now()
+    ))
+    conn.executemany(
+        "INSERT INTO candidate_skills (skill, candidate_id, years) VALUES (?, ?, ?)",
+        [(skill, candidate_id, years) for skill, years in profile['skills'].items()]
+    )
+
+
+def extract_profile(candidate_id, resume_path=None):
+    """
+    Parses a candidate's resume (from the corpus) into the profile tables.
+    Called once from add_candidate. Returns the profile or None.
+    """
+    text = get_resume_text(candidate_id, resume_path)
+    if text is None:
+        return None
+    profile = parse_profile(text, get_corpus().get_sections(get_doc_id(candidate_id)))
+
+    conn = get_db_connection()
+    try:
+        save_profile(conn, candidate_id, profile)
+        conn.commit()
+    finally:
+        conn.close()
+    return profile
+
+
+def remove_profiles(candidate_ids):
+    conn = get_db_connection()
+    conn.executemany("DELETE FROM candidate_skills WHERE candidate_id=?", [(cid,) for cid in candidate_ids])
+    conn.executemany("DELETE FROM candidate_profiles WHERE candidate_id=?", [(cid,) for cid in candidate_ids])
+    conn.commit()
+    conn.close()
+
+
+def rebuild_profiles():
+    conn = get_db_connection()
+    rows = conn.execute("SELECT id, resume_path FROM candidates").fetchall()
+    conn.close()
+    done = 0
+    for row in rows:
+        try:
+            done += extract_profile(row['id'], row['resume_path']) is not None
+        except Exception as e:
+            print(f"⚠️ Could not extract profile for candidate {row['id']}: {e}")
+    print(f"🧾 Profiles rebuilt: {done}/{len(rows)} candidates")
+    return done
+
+
+# --- 3. QUERIES ---
+
+def search_profiles(skills=None, min_years=None, min_education=None, location=None, job_id=None, limit=200):
+    """
+    Candidates matching every given filter, straight from the indexes.
+    skills: list of skill names (each one required; years apply per skill when
+    min_years is given). min_education: "Associate" / "Bachelors" / "Masters" / "PhD".
+    location: case-insensitive prefix, e.g. "berlin".
+    """
+    sql = """
+        SELECT c.id, c.name, c.email, c.job_id, c.status, p.years_experience, p.education,
+               p.last_title, p.location, p.skills
+        FROM candidate_profiles p JOIN candidates c ON c.id = p.candidate_id
+        WHERE 1=1
+    """
+    params = []
+    for skill in skills or []:
+        sql += " AND p.candidate_id IN (SELECT candidate_id FROM candidate_skills WHERE skill=? AND years >= ?)"
+        params += [canonical_skill(skill), min_years or 0]
+    if min_years and not skills:
+        sql += " AND p.years_experience >= ?"
+        params.append(min_years)
+    if min_education:
+        level = next((lvl for lvl, name, _ in EDUCATION_LEVELS if name == min_education), 0)
+        sql += " AND p.education_level >= ?"
+        params.append(level)
+    if location:
+        sql += " AND p.location LIKE ?"
+        params.append(location.strip().lower() + "%")
+    if job_id is not None:
+        sql += " AND c.job_id = ?"
+        params.append(job_id)
+    sql += " ORDER BY p.years_experience DESC LIMIT ?"
+    params.append(limit)
+
+    conn = get_db_connection()
+    rows = [dict(r) for r in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS candidate profiles")
+    parser.add_argument("--rebuild", action="store_true", help="Re-extract every candidate's profile")
+    parser.add_argument("--skill", action="append", help="Required skill (repeatable)")
+    parser.add_argument("--min-years", type=float)
+    parser.add_argument("--education", choices=[name for _, name, _ in EDUCATION_LEVELS])
+    parser.add_argument("--location")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_profiles()
+    if args.skill or args.min_years or args.education or args.location:
+        for r in search_profiles(args.skill, args.min_years, args.education, args.location):
+            print(f"#{r['id']} {r['name']} <{r['email']}> {r['years_experience']}y {r['education']} "
+                  f"{r['last_title']} ({r['location']})")
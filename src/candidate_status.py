@@ -0,0 +1,203 @@
+"""
+Candidate status state machine.
+
+    APPLIED -> SHORTLISTED / REJECTED -> INTERVIEW_COMPLETED -> FINALIST
+            -> HR_ROUND_SCHEDULED -> HIRED / REJECTED_FINAL
+
+REJECTED is used at both screening and grading. The edges back out of it
+(a policy change re-deciding the candidate) are guarded by the stage it was
+rejected at: only a candidate without a graded interview can become
+SHORTLISTED again, and only a graded one can become FINALIST.
+
+Every status change goes through transition(), a compare-and-set: the
+UPDATE only matches while the candidate is still in the expected status, so
+when two admin tabs or two workers act on the same candidate exactly one of
+them wins. The loser gets False and must not send emails or overwrite scores.
+
+Workers pull candidates with claim_candidates(): a batch is leased in one
+short write transaction (claimed_by / claim_expires), processed with no lock
+held, and each claim is cleared by the transition that finishes the
+candidate. Claims of a crashed worker expire and are picked up again.
+
+    python benchmarks/bench_status_claims.py --workers 8
+"""
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+# Allowed edges. REJECTED can move back when a policy change re-decides it (src/decision_policy.py);
+# INTERVIEW_COMPLETED and FINALIST may stay put (re-submitted interview, re-grade).
+TRANSITIONS = {
+    "APPLIED": {"SHORTLISTED", "REJECTED"},
+    "SHORTLISTED": {"INTERVIEW_COMPLETED", "REJECTED"},
+    "REJECTED": {"SHORTLISTED", "FINALIST"},
+    "INTERVIEW_COMPLETED": {"INTERVIEW_COMPLETED", "FINALIST", "REJECTED"},
+    "FINALIST": {"FINALIST", "REJECTED", "HR_ROUND_SCHEDULED"},
+    "HR_ROUND_SCHEDULED": {"HIRED", "REJECTED_FINAL"},
+    "HIRED": set(),
+    "REJECTED_FINAL": set(),
+}
+STATUSES = list(TRANSITIONS)
+
+# Row conditions for edges that depend on where the candidate came from (see above)
+GRADED_SQL = ("(interview_feedback IS NOT NULL OR EXISTS (SELECT 1 FROM candidate_scores s "
+              "WHERE s.candidate_id = candidates.id AND s.stage = 'grade'))")
+EDGE_GUARDS = {
+    ("REJECTED", "SHORTLISTED"): f"NOT {GRADED_SQL}",
+    ("REJECTED", "FINALIST"): GRADED_SQL,
+}
+CLAIM_SECONDS = 300  # A worker that dies keeps its candidates for at most this long
+CLAIM_BATCH = 10
+
+
+class InvalidTransition(ValueError):
+    """A status change that is not an edge of TRANSITIONS."""
+
+
+def _as_tuple(statuses):
+    return (statuses,) if isinstance(statuses, str) else tuple(statuses)
+
+
+def check_transition(from_status, to_status):
+    """Raises InvalidTransition unless every status in from_status may move to to_status."""
+    for status in _as_tuple(from_status):
+        if to_status not in TRANSITIONS.get(status, ()):
+            raise InvalidTransition(f"{status} -> {to_status} is not an allowed status change")
+
+
+def _from_condition(from_statuses, to_status):
+    """WHERE clause (and params) matching rows in from_statuses that may move to to_status."""
+    plain = [s for s in from_statuses if (s, to_status) not in EDGE_GUARDS]
+    parts = [f"status IN ({','.join('?' * len(plain))})"] if plain else []
+    params = list(plain)
+    for status in from_statuses:
+        guard = EDGE_GUARDS.get((status, to_status))
+        if guard:
+            parts.append(f"(status = ? AND {guard})")
+            params.append(status)
+    return f"({' OR '.join(parts)})", params
+
+
+# --- 1. COMPARE-AND-SET TRANSITIONS ---
+
+def transition(conn, candidate_id, from_status, to_status, owner=None, **fields):
+    """
+    Moves a candidate from `from_status` (one status or a tuple) to
+    `to_status` and sets `fields` (column=value) on the same row, releasing
+    any claim. With `owner`, the candidate must also still be claimed by it.
+    Guarded edges (EDGE_GUARDS) also require their row condition.
+    Returns True if this call made the change (caller commits).
+    """
+    from_statuses = _as_tuple(from_status)
+    check_transition(from_statuses, to_status)
+    assignments = ["status = ?", "claimed_by = NULL", "claim_expires = NULL"] + [f"{col} = ?" for col in fields]
+    condition, condition_params = _from_condition(from_statuses, to_status)
+    sql = f"UPDATE candidates SET {', '.join(assignments)} WHERE id = ? AND {condition}"
+    params = [to_status, *fields.values(), candidate_id, *condition_params]
+    if owner is not None:
+        sql += " AND claimed_by = ?"
+        params.append(owner)
+    return conn.execute(sql, params).rowcount == 1
+
+
+def set_status(candidate_id, from_status, to_status, **fields):
+    """transition() in its own transaction. Returns True if this call made the change."""
+    conn = get_db_connection()
+    try:
+        changed = transition(conn, candidate_id, from_status, to_status, **fields)
+        conn.commit()
+    finally:
+        conn.close()
+    return changed
+
+
+def transition_many(conn, changes):
+    """
+    Applies [(candidate_id, from_status, to_status)] as compare-and-set
+    updates, one statement per kind of edge. Returns how many candidates
+    changed (caller commits).
+    """
+    by_edge = {}
+    for candidate_id, from_status, to_status in changes:
+        check_transition(from_status, to_status)
+        by_edge.setdefault((from_status, to_status), []).append(candidate_id)
+    updated = 0
+    for (from_status, to_status), ids in by_edge.items():
+        condition, params = _from_condition((from_status,), to_status)
+        cur = conn.executemany(
+            f"UPDATE candidates SET status=?, claimed_by=NULL, claim_expires=NULL WHERE id=? AND {condition}",
+            [(to_status, candidate_id, *params) for candidate_id in ids]
+        )
+        updated += cur.rowcount
+    return updated
+
+
+# --- 2. BATCH CLAIMS ---
+
+def claim_candidates(job_id, statuses, owner, limit=CLAIM_BATCH, after_id=0, claim_seconds=CLAIM_SECONDS):
+    """
+    Claims up to `limit` unclaimed candidates of a job that are in one of
+    `statuses`, in id order after `after_id` (a worker passes the last id it
+    saw, so statuses that do not change, e.g. a FINALIST re-grade, are not
+    claimed again by the same sweep). Returns the claimed candidate rows.
+    """
+    statuses = _as_tuple(statuses)
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        ids = [row['id'] for row in conn.execute(f"""
+            SELECT id FROM candidates
+            WHERE job_id = ? AND status IN ({','.join('?' * len(statuses))}) AND id > ?
+              AND (claim_expires IS NULL OR claim_expires < ?)
+            ORDER BY id LIMIT ?
+        """, (job_id, *statuses, after_id, now, limit))]
+        if not ids:
+            conn.rollback()
+            return []
+        placeholders = ','.join('?' * len(ids))
+        conn.execute(
+            f"UPDATE candidates SET claimed_by = ?, claim_expires = ? WHERE id IN ({placeholders})",
+            (owner, now + claim_seconds, *ids)
+        )
+        conn.commit()
+        return conn.execute(f"SELECT * FROM candidates WHERE id IN ({placeholders}) ORDER BY id", ids).fetchall()
+    finally:
+        conn.close()
+
+
+def claim_candidate(candidate_id, statuses, owner, claim_seconds=CLAIM_SECONDS):
+    """Claims one candidate if it is in one of `statuses` and unclaimed. Returns its row, or None."""
+    statuses = _as_tuple(statuses)
+    conn = get_db_connection()
+    try:
+        now = time.time()
+        cur = conn.execute(f"""
+            UPDATE candidates SET claimed_by = ?, claim_expires = ?
+            WHERE id = ? AND status IN ({','.join('?' * len(statuses))})
+              AND (claim_expires IS NULL OR claim_expires < ?)
+        """, (owner, now + claim_seconds, candidate_id, *statuses, now))
+        conn.commit()
+        if cur.rowcount != 1:
+            return None
+        return conn.execute("SELECT * FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def release_claims(owner, candidate_ids):
+    """Gives claimed candidates back without changing their status (e.g. after an error)."""
+    if not candidate_ids:
+        return
+    conn = get_db_connection()
+    conn.execute(
+        f"UPDATE candidates SET claimed_by = NULL, claim_expires = NULL "
+        f"WHERE claimed_by = ? AND id IN ({','.join('?' * len(candidate_ids))})",
+        (owner, *candidate_ids)
+    )
+    conn.commit()
+    conn.close()
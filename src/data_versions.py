@@ -0,0 +1,61 @@
+"""
+Per-job data versions.
+
+Every INSERT/UPDATE/DELETE on `jobs` or `candidates` bumps a counter in
+`data_versions` (SQLite triggers, see create_tables), both for the affected
+job and for the global row ALL_JOBS. Readers cache query results keyed by
+that counter, so checking whether anything changed is one primary-key lookup
+and a rerun with no changes re-uses the previous result:
+
+    df = cached(("candidates", job_id), lambda: load(job_id), job_id)
+"""
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+ALL_JOBS = 0  # Version row bumped by every change, for cross-job views
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_version(job_id=ALL_JOBS):
+    conn = get_db_connection()
+    row = conn.execute("SELECT version FROM data_versions WHERE job_id=?", (job_id,)).fetchone()
+    conn.close()
+    return row['version'] if row else 0
+
+
+def bump_version(conn, job_id):
+    """For writes that bypass the triggers (caller commits)."""
+    for key in {job_id, ALL_JOBS}:
+        conn.execute("""
+            INSERT INTO data_versions (job_id, version) VALUES (?, 1)
+            ON CONFLICT(job_id) DO UPDATE SET version = version + 1
+        """, (key,))
+
+
+def cached(key, loader, job_id=ALL_JOBS):
+    """
+    Returns loader() and keeps it until the job's version changes.
+    The version is read before loading, so a write racing with the load only
+    causes one extra reload, never a stale hit.
+    """
+    version = get_version(job_id)
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit and hit[0] == version:
+        return hit[1]
+    value = loader()
+    with _cache_lock:
+        _cache[key] = (version, value)
+    return value
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -1,18 +1,57 @@
 import sqlite3
 import os
+import threading
 from datetime import datetime, timedelta
 
 DB_PATH = "data/hire_os.db"
+SCHEMA_VERSION = 12  # Bump whenever create_tables() changes; stored in PRAGMA user_version
 
-def get_db_connection():
+_schema_checked = False
+_schema_lock = threading.Lock()
+
+def _connect():
     if not os.path.exists("data"):
         os.makedirs("data")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=30)  # Workers and Streamlit share the file
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_db_connection():
+    conn = _connect()
+    if not _schema_checked:
+        _ensure_schema(conn)
+    return conn
+
+def _ensure_schema(conn):
+    """
+    Runs the DDL once per process, on the first connection instead of at
+    import, and skips it entirely when the database is already current.
+    The flag is only set once the schema is in place: if create_tables()
+    fails, the next connection tries again.
+    """
+    global _schema_checked
+    with _schema_lock:
+        if _schema_checked:  # Another thread finished while we waited for the lock
+            return
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            create_tables()
+        _schema_checked = True
+
+def _ensure_column(conn, table, column, definition):
+    """
+    Adds a column to an existing table (CREATE TABLE IF NOT EXISTS does not
+    migrate databases created by older versions).
+    """
+    columns = [row['name'] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
 def create_tables():
-    conn = get_db_connection()
+    conn = _connect()  # Not get_db_connection(): this runs inside _ensure_schema
+    # New databases release freed pages on demand (src/archival.py); existing ones switch on first compact()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    # WAL: long readers (exports, dashboards) see a snapshot and never block writers
+    conn.execute("PRAGMA journal_mode=WAL")
     
     conn.execute('''
         CREATE TABLE IF NOT EXISTS jobs (
@@ -43,6 +82,403 @@ def create_tables():
             FOREIGN KEY(job_id) REFERENCES jobs(id)
         )
     ''')
+
+    # Max tokens of resume/transcript inlined into a single-shot prompt (direct agent mode)
+    _ensure_column(conn, "jobs", "context_token_budget", "INTEGER DEFAULT 3000")
+
+    # Deterministic requirement match (src/requirement_matcher.py), set before any LLM call
+    _ensure_column(conn, "candidates", "match_score", "INTEGER")
+    _ensure_column(conn, "candidates", "match_evidence", "TEXT")     # JSON: matched/missing skills + aliases
+
+    # One application per email and job, also for concurrent apply-portal / bulk-import writers
+    try:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_candidates_job_email_unique ON candidates(job_id, email)")
+        conn.execute("DROP INDEX IF EXISTS idx_candidates_job_email")
+    except sqlite3.IntegrityError:
+        print("⚠️ Duplicate applications in the database; remove them to enforce one application per email and job")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_job_email ON candidates(job_id, email)")
+
+    # Application date (export date filters); older rows stay NULL
+    _ensure_column(conn, "candidates", "applied_at", "DATETIME")
+
+    # Worker claims on candidates (src/candidate_status.py), cleared by the transition that finishes them
+    _ensure_column(conn, "candidates", "claimed_by", "TEXT")
+    _ensure_column(conn, "candidates", "claim_expires", "REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_job_status ON candidates(job_id, status, id)")
+
+    # --- SCREENING RUNS (checkpointed, resumable) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS screening_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            status TEXT DEFAULT 'RUNNING',   -- RUNNING / COMPLETED
+            total INTEGER DEFAULT 0,
+            started_at DATETIME,
+            finished_at DATETIME,
+            FOREIGN KEY(job_id) REFERENCES jobs(id)
+        )
+    ''')
+
+    # One row per candidate in a run. A row is leased by a worker while it is
+    # being scored; the score is checkpointed before any email goes out.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS screening_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER,
+            candidate_id INTEGER,
+            status TEXT DEFAULT 'PENDING',   -- PENDING / LEASED / DONE / FAILED
+            attempts INTEGER DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,              -- unix timestamp
+            score INTEGER,                   -- NULL until the LLM call succeeded
+            summary TEXT,
+            new_status TEXT,
+            result TEXT,
+            error TEXT,
+            UNIQUE(run_id, candidate_id),
+            FOREIGN KEY(run_id) REFERENCES screening_runs(id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_screening_items_run ON screening_items(run_id, status)")
+
+    # Ledger that makes notification emails idempotent per candidate + stage
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id INTEGER,
+            stage TEXT,
+            status TEXT DEFAULT 'SENDING',   -- SENDING / SENT / FAILED
+            created_at DATETIME,
+            UNIQUE(candidate_id, stage)
+        )
+    ''')
+
+    # --- TASK QUEUE (consumed by `python -m src.worker`) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,              -- screen_job / evaluate_job / interview_turn / grade_candidate
+            job_id INTEGER,
+            payload TEXT,                    -- JSON
+            priority INTEGER DEFAULT 0,      -- higher runs first
+            status TEXT DEFAULT 'QUEUED',    -- QUEUED / RUNNING / DONE / FAILED
+            attempts INTEGER DEFAULT 0,
+            max_attempts INTEGER DEFAULT 3,
+            visible_at REAL DEFAULT 0,       -- unix timestamp; RUNNING tasks reappear after it
+            worker TEXT,
+            progress REAL DEFAULT 0,         -- 0.0 - 1.0
+            progress_message TEXT,
+            result TEXT,                     -- JSON
+            error TEXT,
+            created_at DATETIME,
+            updated_at DATETIME
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(status, priority DESC, visible_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks(job_id, kind, status)")
+
+    # --- PIPELINE EVENTS (see src/event_bus.py): durable log, subscribers run as tasks ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pipeline_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,             -- e.g. interview.submitted
+            job_id INTEGER,
+            payload TEXT,                    -- JSON
+            created_at DATETIME
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS workers (
+            id TEXT PRIMARY KEY,
+            started_at DATETIME,
+            last_seen REAL                   -- unix timestamp
+        )
+    ''')
+
+    # Shared token buckets for OpenAI calls (HIRE_OS_SHARED_RATE_LIMIT=1)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            name TEXT PRIMARY KEY,
+            tokens REAL,
+            rate REAL,                       -- tokens per second
+            updated REAL,                    -- unix timestamp
+            blocked_until REAL
+        )
+    ''')
+
+    # --- RESUME CORPUS (see src/resume_corpus.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS resume_docs (
+            doc_id INTEGER PRIMARY KEY,      -- record number in data/corpus/docs.bin
+            content_hash TEXT UNIQUE,        -- sha256 of the resume file
+            created_at DATETIME
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_resume_docs (
+            candidate_id INTEGER PRIMARY KEY,
+            doc_id INTEGER,
+            FOREIGN KEY(candidate_id) REFERENCES candidates(id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_resume_docs_doc ON candidate_resume_docs(doc_id)")
+
+    # Files that crashed the sandboxed extractor or hit its memory cap (see src/pdf_extraction.py); never retried
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS quarantined_files (
+            content_hash TEXT PRIMARY KEY,
+            path TEXT,
+            reason TEXT,
+            created_at DATETIME
+        )
+    ''')
+
+    # --- TALENT REDISCOVERY INDEXES (see src/talent_search.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS talent_postings (
+            term TEXT,
+            candidate_id INTEGER,
+            weight REAL,
+            PRIMARY KEY(term, candidate_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_talent_postings_weight ON talent_postings(term, weight DESC)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS talent_terms (
+            term TEXT PRIMARY KEY,
+            df INTEGER DEFAULT 0,            -- candidates containing the term
+            listed INTEGER DEFAULT 0         -- rows kept in talent_postings
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS talent_docs (
+            candidate_id INTEGER PRIMARY KEY,
+            terms TEXT,                      -- indexed terms (for un-indexing)
+            vec BLOB,                        -- float32[256]
+            weights BLOB                     -- float32 term weight, same order as terms (for refilling lists)
+        )
+    ''')
+    _ensure_column(conn, "talent_docs", "weights", "BLOB")
+
+    # --- CANDIDATE PROFILES (see src/candidate_profiles.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_profiles (
+            candidate_id INTEGER PRIMARY KEY,
+            years_experience REAL,
+            education TEXT,                  -- PhD / Masters / Bachelors / Associate
+            education_level INTEGER,         -- 4 / 3 / 2 / 1 (0 = unknown)
+            last_title TEXT,
+            location TEXT COLLATE NOCASE,    -- lowercased
+            skills TEXT,                     -- comma list (display only, query candidate_skills)
+            extracted_at DATETIME,
+            FOREIGN KEY(candidate_id) REFERENCES candidates(id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_profiles_years ON candidate_profiles(years_experience)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_profiles_education ON candidate_profiles(education_level)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_profiles_location ON candidate_profiles(location)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_skills (
+            skill TEXT,
+            candidate_id INTEGER,
+            years REAL,                      -- years of experience entries mentioning the skill
+            PRIMARY KEY(skill, candidate_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_skills_years ON candidate_skills(skill, years)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills(candidate_id)")
+
+    # --- INTERVIEW OPENERS (greeting template + first questions, one LLM call per job) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS interview_openers (
+            job_id INTEGER PRIMARY KEY,
+            template TEXT,                   -- greeting with a {candidate_name} placeholder
+            questions TEXT,                  -- JSON list of first technical questions
+            requirements_hash TEXT,          -- regenerated when title/requirements change
+            created_at DATETIME,
+            FOREIGN KEY(job_id) REFERENCES jobs(id)
+        )
+    ''')
+
+    # --- QUESTION BANK (see src/question_bank.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS question_bank (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            skill TEXT,                      -- canonical skill name
+            difficulty INTEGER,              -- 1 (warm-up) .. 3 (hard)
+            question TEXT,
+            rubric TEXT,                     -- what a good answer covers
+            source TEXT,                     -- seed / import / generated / manual
+            content_hash TEXT UNIQUE,
+            vec BLOB,                        -- float32[256] hashed term vector
+            created_at DATETIME
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_question_bank_skill ON question_bank(skill, difficulty)")
+
+    # --- MODEL ROUTING LOG (see src/model_router.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS routing_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stage TEXT,                      -- screen / grade
+            job_id INTEGER,
+            candidate_id INTEGER,
+            cheap_model TEXT,                -- NULL when the cascade is disabled
+            cheap_score REAL,
+            escalated INTEGER DEFAULT 0,
+            final_model TEXT,
+            final_score REAL,
+            reason TEXT,
+            prompt_tokens INTEGER,           -- both calls when escalated (per model: see below)
+            completion_tokens INTEGER,
+            latency_ms INTEGER,
+            created_at DATETIME
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_routing_log_job ON routing_log(job_id, stage)")
+    # Tokens per model (rows logged before these columns only have the summed prompt/completion_tokens)
+    for column in ("cheap_prompt_tokens", "cheap_completion_tokens", "expensive_prompt_tokens", "expensive_completion_tokens"):
+        _ensure_column(conn, "routing_log", column, "INTEGER")
+
+    # --- RAW SCORES + DECISION POLICIES (see src/decision_policy.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_scores (
+            candidate_id INTEGER,
+            stage TEXT,                      -- screen / grade
+            raw_score REAL,
+            sub_scores TEXT,                 -- JSON {name: 0-100}
+            llm_decision TEXT,               -- grader's own FINALIST/REJECTED
+            source TEXT,                     -- llm / matcher (hard filter)
+            scored_at DATETIME,
+            PRIMARY KEY(candidate_id, stage),
+            FOREIGN KEY(candidate_id) REFERENCES candidates(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS decision_policies (
+            job_id INTEGER PRIMARY KEY,
+            screen_threshold REAL,
+            grade_threshold REAL,            -- NULL: the grader's decision stands
+            screen_weights TEXT,             -- JSON {sub_score: weight}
+            grade_weights TEXT,
+            updated_at DATETIME,
+            FOREIGN KEY(job_id) REFERENCES jobs(id)
+        )
+    ''')
+
+    # Reject on missing must-have skills without an LLM call (opt-in per job)
+    _ensure_column(conn, "decision_policies", "hard_reject", "INTEGER DEFAULT 0")
+
+    # --- INTERVIEW TURNS (see src/transcripts.py) ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS interview_turns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id INTEGER,
+            turn_no INTEGER,
+            role TEXT,                       -- user (candidate) / assistant (interviewer)
+            body BLOB,                       -- zlib-compressed UTF-8 text
+            chars INTEGER,
+            tokens INTEGER,                  -- estimated
+            latency_ms INTEGER,              -- model latency (assistant turns)
+            model TEXT,
+            created_at REAL,                 -- unix timestamp
+            UNIQUE(candidate_id, turn_no),
+            FOREIGN KEY(candidate_id) REFERENCES candidates(id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_interview_turns_role ON interview_turns(candidate_id, role, turn_no)")
+
+    # --- FILE STORE (see services/storage_service.py): one count per DB reference ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stored_objects (
+            key TEXT PRIMARY KEY,               -- <kind>/<h0h1>/<h2h3>/<sha256><ext>
+            refcount INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME
+        )
+    ''')
+
+    # --- STATUS EVENTS (see src/pipeline_metrics.py): append-only, written by triggers ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,   -- Rollup cursor; commit order == id order
+            candidate_id INTEGER,
+            job_id INTEGER,
+            from_status TEXT,                       -- NULL when the candidate was created
+            to_status TEXT,
+            at REAL                                 -- Unix time
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidate_events_candidate ON candidate_events(candidate_id, id)")
+    # Every status change is logged whoever makes it (transition(), bulk import, ad-hoc SQL)
+    now = "(julianday('now') - 2440587.5) * 86400.0"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_candidates_insert_event AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidate_events (candidate_id, job_id, from_status, to_status, at)
+            VALUES (NEW.id, NEW.job_id, NULL, NEW.status, {now});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_candidates_status_event AFTER UPDATE OF status ON candidates
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            INSERT INTO candidate_events (candidate_id, job_id, from_status, to_status, at)
+            VALUES (NEW.id, NEW.job_id, OLD.status, NEW.status, {now});
+        END
+    """)
+
+    # Incremental rollups of the events (src/pipeline_metrics.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS metric_cursors (
+            name TEXT PRIMARY KEY,
+            last_event_id INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stage_open (
+            candidate_id INTEGER PRIMARY KEY,       -- Stage each candidate is in, and since when
+            job_id INTEGER,
+            status TEXT,
+            entered_at REAL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stage_durations (
+            job_id INTEGER,
+            stage TEXT,
+            bucket INTEGER,                         -- Log-spaced duration histogram
+            count INTEGER DEFAULT 0,
+            total_seconds REAL DEFAULT 0,
+            PRIMARY KEY (job_id, stage, bucket)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stage_daily (
+            job_id INTEGER,
+            day TEXT,                               -- YYYY-MM-DD (local time)
+            stage TEXT,
+            entered INTEGER DEFAULT 0,
+            exited INTEGER DEFAULT 0,
+            PRIMARY KEY (job_id, day, stage)
+        )
+    ''')
+
+    # --- DATA VERSIONS (see src/data_versions.py): bumped by triggers on every write ---
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            job_id INTEGER PRIMARY KEY,      -- 0 = any job
+            version INTEGER DEFAULT 0
+        )
+    ''')
+    bump = '''
+        INSERT INTO data_versions (job_id, version) VALUES ({key}, 1)
+        ON CONFLICT(job_id) DO UPDATE SET version = version + 1;
+    '''
+    for table, job_column in (("jobs", "id"), ("candidates", "job_id")):
+        # UPDATE bumps both the old and the new job (a candidate may move between jobs)
+        for event, rows in (("INSERT", ["NEW"]), ("UPDATE", ["OLD", "NEW"]), ("DELETE", ["OLD"])):
+            body = "".join(bump.format(key=f"{row}.{job_column}") for row in rows) + bump.format(key="0")
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version AFTER {event} ON {table} BEGIN {body} END")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
@@ -53,24 +489,47 @@ def add_job(title, description, requirements, minutes_open=10):
     # Calculate Deadline
     deadline = datetime.now() + timedelta(minutes=minutes_open)
     
-    conn.execute(
+    cur = conn.execute(
         "INSERT INTO jobs (title, description, requirements, deadline) VALUES (?, ?, ?, ?)",
         (title, description, requirements, deadline)
     )
     conn.commit()
     conn.close()
 
+    # Open-job lists cached by the pages are stale now
+    from src.app_cache import invalidate_jobs
+    invalidate_jobs()
+    return cur.lastrowid
+
 def add_candidate(job_id, name, email, resume_path):
+    """Raises sqlite3.IntegrityError if this email already applied for the job."""
     conn = get_db_connection()
-    conn.execute(
-        "INSERT INTO candidates (job_id, name, email, resume_path) VALUES (?, ?, ?, ?)",
-        (job_id, name, email, resume_path)
-    )
-    conn.commit()
-    conn.close()
+    try:
+        cur = conn.execute(
+            "INSERT INTO candidates (job_id, name, email, resume_path, applied_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, name, email, resume_path, datetime.now())
+        )
+        from services.storage_service import retain
+        retain(conn, [resume_path])  # The row holds a reference to the stored file
+        conn.commit()
+    finally:
+        conn.close()
+    candidate_id = cur.lastrowid
 
-# Run table creation on import
-create_tables()
+    # Keep the talent rediscovery index current (never fails the application)
+    try:
+        from src.talent_search import index_candidate
+        index_candidate(candidate_id, resume_path)
+    except Exception as e:
+        print(f"⚠️ Could not index candidate {candidate_id}: {e}")
+
+    # One-time structured profile (skills, years, education, title, location)
+    try:
+        from src.candidate_profiles import extract_profile
+        extract_profile(candidate_id, resume_path)
+    except Exception as e:
+        print(f"⚠️ Could not extract profile for candidate {candidate_id}: {e}")
+    return candidate_id
 
 def delete_job_permanently(job_id):
     """
@@ -78,13 +537,55 @@ def delete_job_permanently(job_id):
     """
     conn = get_db_connection()
     try:
+        candidate_rows = conn.execute(
+            "SELECT id, resume_path, interview_transcript_path FROM candidates WHERE job_id = ?", (job_id,)
+        ).fetchall()
+        candidate_ids = [r['id'] for r in candidate_rows]
+
         # 1. Delete all candidates linked to this job first (to prevent orphans)
         conn.execute("DELETE FROM candidates WHERE job_id = ?", (job_id,))
         
-        # 2. Delete the job itself
+        # 2. Per-candidate and per-job bookkeeping (queued tasks, screening runs, metrics)
+        for table in ("candidate_scores", "candidate_resume_docs", "email_log"):
+            conn.executemany(f"DELETE FROM {table} WHERE candidate_id = ?", [(cid,) for cid in candidate_ids])
+        conn.execute(
+            "DELETE FROM screening_items WHERE run_id IN (SELECT id FROM screening_runs WHERE job_id = ?)", (job_id,)
+        )
+        for table in ("screening_runs", "tasks", "routing_log", "interview_openers", "decision_policies",
+                      "candidate_events", "stage_open", "stage_durations", "stage_daily"):
+            conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+
+        # 3. Delete the job itself
         conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
         
         conn.commit()
+
+        from src.app_cache import invalidate_jobs
+        invalidate_jobs()
+
+        # 4. Drop them from the talent rediscovery index and the interview turns
+        try:
+            from src.talent_search import remove_candidates
+            remove_candidates(candidate_ids)
+        except Exception as e:
+            print(f"⚠️ Could not clean talent index: {e}")
+        try:
+            from src.candidate_profiles import remove_profiles
+            remove_profiles(candidate_ids)
+        except Exception as e:
+            print(f"⚠️ Could not clean candidate profiles: {e}")
+        try:
+            from src.transcripts import clear_turns
+            clear_turns(candidate_ids)
+        except Exception as e:
+            print(f"⚠️ Could not clean interview turns: {e}")
+
+        # 5. Resume PDFs and transcripts (kept if another candidate still points at them)
+        try:
+            from src.archival import remove_files
+            remove_files([path for r in candidate_rows for path in (r['resume_path'], r['interview_transcript_path']) if path])
+        except Exception as e:
+            print(f"⚠️ Could not delete candidate files: {e}")
         return True
     except Exception as e:
         print(f"Error deleting job: {e}")
@@ -0,0 +1,220 @@
+"""
+Decision policies: turning stored scores into statuses.
+
+The LLM only produces numbers. Raw scores and sub-scores are kept in
+`candidate_scores` (one row per candidate and stage) and the per-job policy
+in `decision_policies` decides what they mean:
+
+    screen  weighted score >= screen_threshold     -> SHORTLISTED, else REJECTED
+            (with hard_reject, candidates stopped by the requirement matcher
+            stay REJECTED; off by default)
+    grade   weighted score >= grade_threshold      -> FINALIST, else REJECTED
+            (no grade_threshold: the grader's own decision stands)
+
+A weighting is {sub_score_name: weight}; without one the raw score is used.
+simulate() re-applies a policy to a whole job with column arithmetic and
+apply_policy() commits the resulting statuses in one transaction, so a
+policy change never calls the LLM again. No emails are sent for re-decided
+candidates.
+"""
+import os
+import sys
+import json
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+DEFAULT_THRESHOLD = 70
+SCREEN_SUB_SCORES = ["skills", "experience", "projects"]
+GRADE_SUB_SCORES = ["technical_depth", "problem_solving", "communication"]
+
+# Statuses each stage may move between; later stages (HR round, hired) are never touched
+SCREEN_STATUSES = ("SHORTLISTED", "REJECTED")
+GRADE_STATUSES = ("FINALIST", "REJECTED")
+
+
+# --- 1. SCORES ---
+
+def parse_sub_scores(data, names):
+    """Numeric sub-scores from an LLM answer ({} when missing)."""
+    raw = (data or {}).get('sub_scores') or {}
+    sub_scores = {}
+    for name in names:
+        try:
+            sub_scores[name] = float(raw[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return sub_scores
+
+
+def record_score(conn, candidate_id, stage, raw_score, sub_scores=None, llm_decision=None, source="llm"):
+    """Stores a raw score (caller commits). source: llm / matcher."""
+    conn.execute("""
+        INSERT OR REPLACE INTO candidate_scores
+            (candidate_id, stage, raw_score, sub_scores, llm_decision, source, scored_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (candidate_id, stage, raw_score, json.dumps(sub_scores or {}), llm_decision, source, datetime.now()))
+
+
+def effective_score(raw_score, sub_scores, weights):
+    """Weighted mean of the sub-scores, or the raw score if they don't cover the weights."""
+    weights = {k: w for k, w in (weights or {}).items() if w}
+    if not weights or not all(k in (sub_scores or {}) for k in weights):
+        return raw_score
+    return sum(sub_scores[k] * w for k, w in weights.items()) / sum(weights.values())
+
+
+# --- 2. POLICIES ---
+
+def get_policy(job_id):
+    conn = get_db_connection()
+    row = conn.execute("SELECT * FROM decision_policies WHERE job_id=?", (job_id,)).fetchone()
+    conn.close()
+    if not row:
+        return {"screen_threshold": DEFAULT_THRESHOLD, "grade_threshold": None,
+                "screen_weights": {}, "grade_weights": {}, "hard_reject": False}
+    return {
+        "screen_threshold": row['screen_threshold'] if row['screen_threshold'] is not None else DEFAULT_THRESHOLD,
+        "grade_threshold": row['grade_threshold'],
+        "screen_weights": json.loads(row['screen_weights'] or "{}"),
+        "grade_weights": json.loads(row['grade_weights'] or "{}"),
+        "hard_reject": bool(row['hard_reject']),
+    }
+
+
+def screen_decision(policy, raw_score, sub_scores=None, hard_rejected=False):
+    score = effective_score(raw_score, sub_scores, policy['screen_weights'])
+    return 'SHORTLISTED' if not hard_rejected and score >= policy['screen_threshold'] else 'REJECTED'
+
+
+def grade_decision(policy, raw_score, sub_scores=None, llm_decision=None):
+    if policy['grade_threshold'] is None:
+        return 'FINALIST' if "FINALIST" in str(llm_decision or "").upper() else 'REJECTED'
+    score = effective_score(raw_score, sub_scores, policy['grade_weights'])
+    return 'FINALIST' if score >= policy['grade_threshold'] else 'REJECTED'
+
+
+# --- 3. WHAT-IF SIMULATION ---
+
+def load_scores(job_id):
+    """
+    One row per decided candidate of the job with its scores flattened into
+    columns (sub-score columns are NaN where missing). Candidates scored
+    before sub-scores existed fall back to resume_score / interview_score.
+    """
+    import pandas as pd  # Only the dashboard and CLI need pandas
+
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT c.id, c.name, c.status, c.resume_score, c.interview_score, c.interview_feedback,
+               s.raw_score AS screen_raw, s.sub_scores AS screen_subs, s.source AS screen_source,
+               g.raw_score AS grade_raw, g.sub_scores AS grade_subs, g.llm_decision
+        FROM candidates c
+        LEFT JOIN candidate_scores s ON s.candidate_id = c.id AND s.stage = 'screen'
+        LEFT JOIN candidate_scores g ON g.candidate_id = c.id AND g.stage = 'grade'
+        WHERE c.job_id = ? AND c.status IN ('SHORTLISTED', 'REJECTED', 'INTERVIEW_COMPLETED', 'FINALIST')
+    """, (job_id,)).fetchall()
+    conn.close()
+
+    records = []
+    for r in rows:
+        record = {
+            "id": r['id'], "name": r['name'], "status": r['status'],
+            "screen_raw": r['screen_raw'] if r['screen_raw'] is not None else r['resume_score'],
+            "hard_rejected": r['screen_source'] == "matcher",
+            "grade_raw": r['grade_raw'] if r['grade_raw'] is not None else r['interview_score'],
+            "llm_finalist": "FINALIST" in str(r['llm_decision'] or r['status']).upper(),
+            "graded": r['grade_raw'] is not None or r['interview_feedback'] is not None,
+        }
+        screen_subs = json.loads(r['screen_subs'] or "{}")
+        grade_subs = json.loads(r['grade_subs'] or "{}")
+        for name in SCREEN_SUB_SCORES:
+            record[f"screen_{name}"] = screen_subs.get(name)
+        for name in GRADE_SUB_SCORES:
+            record[f"grade_{name}"] = grade_subs.get(name)
+        records.append(record)
+    return pd.DataFrame.from_records(records, columns=[
+        "id", "name", "status", "screen_raw", "hard_rejected", "grade_raw", "llm_finalist", "graded",
+        *[f"screen_{n}" for n in SCREEN_SUB_SCORES], *[f"grade_{n}" for n in GRADE_SUB_SCORES]
+    ])
+
+
+def _weighted(df, prefix, raw_column, weights):
+    """Column version of effective_score."""
+    weights = {k: w for k, w in (weights or {}).items() if w}
+    if not weights:
+        return df[raw_column].astype(float)
+    columns = [f"{prefix}_{k}" for k in weights]
+    subs = df[columns].astype(float)
+    weighted = (subs * list(weights.values())).sum(axis=1) / sum(weights.values())
+    return weighted.where(subs.notna().all(axis=1), df[raw_column].astype(float))
+
+
+def simulate(scores, policy):
+    """
+    Re-decides every candidate in `scores` (from load_scores) under `policy`.
+    Returns the frame with new_status and changed columns added.
+    """
+    df = scores.copy()
+    if df.empty:
+        df['new_status'] = df['status']
+        df['changed'] = False
+        return df
+
+    screen_score = _weighted(df, "screen", "screen_raw", policy['screen_weights'])
+    passed_screen = (screen_score >= policy['screen_threshold']).fillna(False)
+    if policy.get('hard_reject'):
+        passed_screen &= ~df['hard_rejected'].astype(bool)
+
+    if policy['grade_threshold'] is None:
+        passed_grade = df['llm_finalist'].astype(bool)
+    else:
+        grade_score = _weighted(df, "grade", "grade_raw", policy['grade_weights'])
+        passed_grade = (grade_score >= policy['grade_threshold']).fillna(False)
+
+    graded = df['graded'].astype(bool) & df['status'].isin(GRADE_STATUSES)
+    screened = ~df['graded'].astype(bool) & df['status'].isin(SCREEN_STATUSES)
+
+    df['new_status'] = df['status']
+    df.loc[screened, 'new_status'] = passed_screen[screened].map({True: 'SHORTLISTED', False: 'REJECTED'})
+    df.loc[graded, 'new_status'] = passed_grade[graded].map({True: 'FINALIST', False: 'REJECTED'})
+    df['changed'] = df['new_status'] != df['status']
+    return df
+
+
+def funnel(df, column="status"):
+    counts = df[column].value_counts()
+    return {status: int(counts.get(status, 0)) for status in ("SHORTLISTED", "FINALIST", "REJECTED", "INTERVIEW_COMPLETED")}
+
+
+def save_policy(conn, job_id, policy):
+    conn.execute("""
+        INSERT OR REPLACE INTO decision_policies
+            (job_id, screen_threshold, grade_threshold, screen_weights, grade_weights, hard_reject, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (job_id, policy['screen_threshold'], policy['grade_threshold'],
+          json.dumps(policy['screen_weights'] or {}), json.dumps(policy['grade_weights'] or {}),
+          int(bool(policy.get('hard_reject'))), datetime.now()))
+
+
+def apply_policy(job_id, policy):
+    """
+    Saves the policy and commits every changed status in one transaction.
+    A candidate whose status moved since the simulation is left alone.
+    Returns the number of candidates updated.
+    """
+    from src.candidate_status import transition_many
+
+    result = simulate(load_scores(job_id), policy)
+    changes = result[result['changed']]
+    conn = get_db_connection()
+    try:
+        save_policy(conn, job_id, policy)
+        updated = transition_many(conn, [(int(row.id), row.status, row.new_status) for row in changes.itertuples()])
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"⚖️ Policy applied to job {job_id}: {updated} candidates re-decided")
+    return updated
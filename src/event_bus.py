@@ -0,0 +1,113 @@
+"""
+Pipeline event bus.
+
+    event = publish(conn, "interview.submitted", {"candidate_id": 7}, job_id=3)
+    conn.commit()
+    notify(event)
+
+publish() appends the event to `pipeline_events` and, in the caller's
+transaction, queues one task per durable subscriber (SUBSCRIPTIONS). The
+event is committed together with the state change that caused it, survives
+crashes, and each subscriber task is handled once by whichever worker claims
+it (retries and visibility timeouts as for any task, see src/task_queue.py).
+Background workers pick it up on their next poll, so each candidate is
+handled seconds after the event instead of in admin-triggered batches.
+
+notify() runs after the commit, in the publishing process: it calls the
+in-process listeners registered with subscribe() and, when no worker is
+online, drains the new tasks in a background thread here, so a
+single-process setup keeps moving too.
+"""
+import os
+import sys
+import json
+import threading
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.task_queue import insert_task, PRIORITY_EVENT
+
+# topic -> task kinds run for every event (handlers in src/worker.py)
+SUBSCRIPTIONS = {
+    "interview.submitted": ["grade_candidate"],
+}
+
+_listeners = {}
+_listeners_lock = threading.Lock()
+_drain_lock = threading.Lock()
+_drain_pending = threading.Event()
+
+
+# --- 1. PUBLISH ---
+
+def publish(conn, topic, payload=None, job_id=None):
+    """
+    Records an event and queues its subscriber tasks (caller commits, then
+    calls notify()). Returns the event dict.
+    """
+    payload = dict(payload or {})
+    cur = conn.execute(
+        "INSERT INTO pipeline_events (topic, job_id, payload, created_at) VALUES (?, ?, ?, ?)",
+        (topic, job_id, json.dumps(payload), datetime.now())
+    )
+    event = {"id": cur.lastrowid, "topic": topic, "job_id": job_id, "payload": payload, "tasks": []}
+    for kind in SUBSCRIPTIONS.get(topic, []):
+        event["tasks"].append(
+            insert_task(conn, kind, dict(payload, event_id=event["id"]), priority=PRIORITY_EVENT, job_id=job_id)
+        )
+    return event
+
+
+def notify(event):
+    """Delivers a committed event to in-process listeners and makes sure its tasks run."""
+    with _listeners_lock:
+        listeners = list(_listeners.get(event["topic"], []))
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            print(f"⚠️ Listener for {event['topic']} failed: {e}")
+
+    if event["tasks"]:
+        from src.task_queue import workers_online
+        if not workers_online():
+            kinds = SUBSCRIPTIONS.get(event["topic"], [])
+            _drain_pending.set()
+            threading.Thread(target=_drain, args=(kinds,), daemon=True).start()
+
+
+# --- 2. IN-PROCESS CONSUMERS ---
+
+def subscribe(topic, listener):
+    """Calls listener(event) in this process after each committed event of `topic`."""
+    with _listeners_lock:
+        _listeners.setdefault(topic, []).append(listener)
+
+
+def _drain(kinds):
+    """
+    Runs queued subscriber tasks in this process until none is left (fallback
+    when no `python -m src.worker` is running). One drain thread at a time; a
+    task queued while it finishes makes it take another pass.
+    """
+    from src.task_queue import claim_task, complete_task, fail_task
+    from src.worker import HANDLERS
+
+    owner = f"{os.uname().nodename}:{os.getpid()}:events"
+    while _drain_pending.is_set():
+        if not _drain_lock.acquire(blocking=False):
+            return  # The running drain sees the pending flag
+        try:
+            _drain_pending.clear()
+            while True:
+                task = claim_task(owner, kinds=kinds)
+                if task is None:
+                    break
+                try:
+                    complete_task(task['id'], owner, HANDLERS[task['kind']](task, lambda done, total: None))
+                except Exception as e:
+                    print(f"❌ Event task #{task['id']} ({task['kind']}) failed: {e}")
+                    fail_task(task['id'], owner, e)
+        finally:
+            _drain_lock.release()
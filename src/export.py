@@ -0,0 +1,212 @@
+"""
+Streaming export of candidate pipelines.
+
+    python -m src.export --format csv --out pipeline.csv --job-id 3
+    python -m src.export --format parquet --out all.parquet --columns id,name,status,resume_score
+    python -m src.export --format jsonl --status FINALIST,HIRED --since 2024-01-01
+
+Rows are read with a cursor in fixed-size chunks and written out chunk by
+chunk, so memory stays constant whatever the table size. The whole export
+runs in one read transaction: with the database in WAL mode it sees a single
+consistent snapshot and never blocks the workers writing meanwhile.
+Parquet needs pyarrow (optional, imported only for that format).
+"""
+import io
+import os
+import sys
+import csv
+import json
+import argparse
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+CHUNK_SIZE = 5000
+FORMATS = ("csv", "jsonl", "parquet")
+JOB_COLUMNS = {"job_title": "j.title"}  # Joined from jobs
+CANDIDATE_STATUSES = ["APPLIED", "SHORTLISTED", "REJECTED", "INTERVIEW_COMPLETED", "FINALIST",
+                      "HR_ROUND_SCHEDULED", "HIRED", "REJECTED_FINAL"]
+
+
+def export_columns():
+    """{column: declared SQL type} of everything that can be exported."""
+    conn = get_db_connection()
+    columns = {row['name']: (row['type'] or "TEXT").upper() for row in conn.execute("PRAGMA table_info(candidates)")}
+    conn.close()
+    columns.update({name: "TEXT" for name in JOB_COLUMNS})
+    return columns
+
+
+def _build_query(columns, job_id, statuses, since, until):
+    select = [JOB_COLUMNS.get(col, f"c.{col}") + f' AS "{col}"' for col in columns]
+    where, params = [], []
+    if job_id is not None:
+        where.append("c.job_id = ?")
+        params.append(job_id)
+    if statuses:
+        where.append(f"c.status IN ({','.join('?' * len(statuses))})")
+        params.extend(statuses)
+    if since:
+        where.append("c.applied_at >= ?")
+        params.append(str(since))
+    if until:
+        where.append("c.applied_at < ?")
+        params.append(str(until))
+    sql = f"SELECT {', '.join(select)} FROM candidates c LEFT JOIN jobs j ON j.id = c.job_id"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY c.id", params
+
+
+# --- 1. WRITERS (one call per chunk) ---
+
+class _CsvWriter:
+    def __init__(self, out, columns, types):
+        self.out = out
+        self._write([columns])
+
+    def _write(self, rows):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        self.out.write(buf.getvalue().encode("utf-8"))
+
+    def write(self, rows):
+        self._write(rows)
+
+    def close(self):
+        pass
+
+
+class _JsonlWriter:
+    def __init__(self, out, columns, types):
+        self.out = out
+        self.columns = columns
+
+    def write(self, rows):
+        lines = "".join(json.dumps(dict(zip(self.columns, row)), default=str) + "\n" for row in rows)
+        self.out.write(lines.encode("utf-8"))
+
+    def close(self):
+        pass
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    return pa, pq
+
+
+class _ParquetWriter:
+    """One row group per chunk; the schema comes from the declared column types."""
+
+    def __init__(self, out, columns, types):
+        pa, pq = _pyarrow()
+        self.pa = pa
+        self.schema = pa.schema([
+            (col, pa.int64() if "INT" in types[col] else pa.float64() if types[col] in ("REAL", "FLOAT") else pa.string())
+            for col in columns
+        ])
+        self.writer = pq.ParquetWriter(out, self.schema)
+
+    def write(self, rows):
+        arrays = []
+        for i, field in enumerate(self.schema):
+            values = [row[i] for row in rows]
+            if field.type == self.pa.string():
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(self.pa.array(values, type=field.type))
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "parquet": _ParquetWriter}
+
+
+# --- 2. EXPORT ---
+
+def export_candidates(out, fmt="csv", columns=None, job_id=None, statuses=None, since=None, until=None,
+                      chunk_size=CHUNK_SIZE, snapshot=False):
+    """
+    Streams candidates to `out` (path or binary file object). A path is
+    written as <out>.part and renamed when the export is complete, so a
+    failed export never truncates or half-writes an existing file.
+    columns: projection (default: every column), see export_columns().
+    since/until: application date range on applied_at, until is exclusive.
+    snapshot: read the analytics snapshot instead of the live DB (see
+    src/analytics_snapshot.py; at most MAX_AGE seconds stale).
+    Returns the number of rows written.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown format '{fmt}' (use one of {', '.join(FORMATS)})")
+    types = export_columns()
+    columns = list(columns or types)
+    unknown = [col for col in columns if col not in types]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+    if fmt == "parquet":
+        _pyarrow()  # Fail before any file is created
+
+    sql, params = _build_query(columns, job_id, statuses, since, until)
+    if snapshot:
+        from src.analytics_snapshot import ensure_fresh, connect
+        ensure_fresh()
+        conn = connect()
+    else:
+        conn = get_db_connection()
+    part_path = f"{out}.part" if isinstance(out, str) else None
+    handle = open(part_path, "wb") if part_path else out
+    count = 0
+    done = False
+    try:
+        conn.execute("BEGIN")  # One read transaction = one snapshot for the whole export
+        cursor = conn.execute(sql, params)
+        writer = WRITERS[fmt](handle, columns, types)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            writer.write([tuple(row) for row in rows])
+            count += len(rows)
+        writer.close()
+        done = True
+    finally:
+        conn.rollback()
+        conn.close()
+        if part_path:
+            handle.close()
+            if done:
+                os.replace(part_path, out)
+            else:
+                os.remove(part_path)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS candidate export")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", default="-", help="Output file ('-' = stdout)")
+    parser.add_argument("--columns", help="Comma-separated projection (default: all)")
+    parser.add_argument("--job-id", type=int)
+    parser.add_argument("--status", help="Comma-separated statuses")
+    parser.add_argument("--since", help="Applied on/after (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Applied before (YYYY-MM-DD)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--snapshot", action="store_true", help="Read the analytics snapshot, not the live DB")
+    args = parser.parse_args()
+
+    target = sys.stdout.buffer if args.out == "-" else args.out
+    rows = export_candidates(
+        target, args.format,
+        columns=args.columns.split(",") if args.columns else None,
+        job_id=args.job_id,
+        statuses=args.status.split(",") if args.status else None,
+        since=args.since, until=args.until, chunk_size=args.chunk_size, snapshot=args.snapshot,
+    )
+    print(f"✅ Exported {rows:,} candidates", file=sys.stderr)
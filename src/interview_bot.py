@@ -1,23 +1,25 @@
 import os
+import json
+import hashlib
+from functools import lru_cache
+from datetime import datetime
 from dotenv import load_dotenv  # <--- Add this import
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationChain
-from langchain.prompts import PromptTemplate
+
+from src.llm_clients import get_chat_llm  # <--- Rate-limited OpenAI client
 
 # Load environment variables (API Key)
 load_dotenv()  # <--- Add this function call
 
 # Configuration
 LLM_MODEL = "gpt-4o" 
+OPENING_INPUT = "Hello, I am ready."  # Hidden first candidate message that triggers the greeting
+NAME_PLACEHOLDER = "{candidate_name}"  # Filled in per candidate in cached openers
+DEFAULT_OPENER = (
+    "Hi {candidate_name}, welcome to your technical interview for the {job_title} role! "
+    "To get started, could you briefly introduce yourself and tell me about a recent project you are proud of?"
+)
 
-def get_interview_chain(job_title, job_requirements):
-    # ... (rest of the code remains exactly the same)
-    
-    # Ensure key is loaded (Optional safety check)
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Error: OPENAI_API_KEY not found in environment.")
-
+def build_interview_prompt(job_title, job_requirements, first_questions=None, reference_questions=None):
     template = f"""
     You are an expert Technical Interviewer for the role of {job_title}.
     The candidate requirements are: {job_requirements}.
@@ -32,20 +34,38 @@ def get_interview_chain(job_title, job_requirements):
     - Keep the tone professional but encouraging.
     - Do not give away answers.
     - After 5-7 exchanges, thank them and conclude the interview.
-    
+    {_first_questions_hint(first_questions)}{_reference_hint(reference_questions)}
     Current Conversation:
     {{history}}
     
     Candidate: {{input}}
     Interviewer:"""
-    
-    prompt = PromptTemplate(
+
+    return _compiled_prompt(template)
+
+@lru_cache(maxsize=256)
+def _compiled_prompt(template):
+    """PromptTemplate per distinct prompt text, shared by every session of the process."""
+    from langchain.prompts import PromptTemplate  # LangChain loads on the first interview turn, not at page load
+    return PromptTemplate(
         input_variables=["history", "input"],
         template=template
     )
 
-    llm = ChatOpenAI(model_name=LLM_MODEL, temperature=0.7)
+def get_interview_chain(job_title, job_requirements, first_questions=None):
+    # ... (rest of the code remains exactly the same)
+    
+    # Ensure key is loaded (Optional safety check)
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Error: OPENAI_API_KEY not found in environment.")
+
+    prompt = build_interview_prompt(job_title, job_requirements, first_questions)
 
+    # Candidates are waiting on every turn: interactive quota
+    llm = get_chat_llm(LLM_MODEL, temperature=0.7, traffic="interactive")
+
+    from langchain.memory import ConversationBufferMemory
+    from langchain.chains import ConversationChain
     memory = ConversationBufferMemory(ai_prefix="Interviewer", human_prefix="Candidate")
 
     conversation = ConversationChain(
@@ -57,27 +77,185 @@ def get_interview_chain(job_title, job_requirements):
     
     return conversation
 
-def save_transcript(candidate_id, transcript_text):
+def _first_questions_hint(first_questions):
+    if not first_questions:
+        return ""
+    lines = "\n".join(f"      * {q}" for q in first_questions)
+    # Doubled braces: the result is embedded in the PromptTemplate
+    return ("- After the introduction, start the technical part with one of these questions:\n" + lines + "\n").replace("{", "{{").replace("}", "}}")
+
+def _reference_hint(reference_questions):
+    if not reference_questions:
+        return ""
+    lines = "\n".join(
+        f"      * [{q['skill']}, level {q['difficulty']}] {q['question']} (a good answer covers: {q['rubric'] or 'n/a'})"
+        for q in reference_questions
+    )
+    hint = (
+        "- Unless a follow-up on the last answer is needed, your next question should be one of these "
+        "(reuse the wording, keep your message short; never reveal the rubric):\n" + lines + "\n"
+    )
+    return hint.replace("{", "{{").replace("}", "}}")
+
+def restore_interview_chain(job_title, job_requirements, history, first_questions=None):
+    """
+    Rebuilds an interview chain and replays the chat history (list of
+    {"role", "content"} dicts as kept by the interview portal) into its memory.
+    """
+    chain = get_interview_chain(job_title, job_requirements, first_questions)
+    chat_memory = chain.memory.chat_memory
+
+    if history and history[0]["role"] == "assistant":
+        # The portal does not display the hidden opening message
+        chat_memory.add_user_message(OPENING_INPUT)
+    for msg in history:
+        if msg["role"] == "user":
+            chat_memory.add_user_message(msg["content"])
+        else:
+            chat_memory.add_ai_message(msg["content"])
+
+    return chain
+
+def interview_turn(chain, job_title, job_requirements, history, user_input, first_questions=None):
+    """
+    One interviewer turn with retrieval: bank questions for the job's skills,
+    at the difficulty the conversation has reached and closest to the latest
+    answer, are put into the prompt before the model is called.
+    `history` excludes `user_input`.
+    """
+    reference = []
+    if user_input != OPENING_INPUT:
+        try:
+            from src.question_bank import retrieve_questions
+            reference = retrieve_questions(job_requirements, list(history) + [{"role": "user", "content": user_input}])
+        except Exception as e:
+            print(f"⚠️ Question retrieval failed: {e}")
+    chain.prompt = build_interview_prompt(job_title, job_requirements, first_questions, reference)
+    return chain.predict(input=user_input)
+
+def predict_interview_turn(job_title, job_requirements, history, user_input, first_questions=None):
     """
-    Saves the final interview transcript to a file and updates the DB.
+    Stateless version of `interview_turn` used by the background worker.
+    """
+    chain = restore_interview_chain(job_title, job_requirements, history, first_questions)
+    return interview_turn(chain, job_title, job_requirements, history, user_input, first_questions)
+
+# --- CACHED OPENERS (one LLM call per job instead of one per candidate) ---
+
+def _requirements_hash(job_title, job_requirements):
+    return hashlib.sha256(f"{job_title}\n{job_requirements}".encode("utf-8")).hexdigest()
+
+def prepare_opener(job_id, force=False, traffic="batch"):
+    """
+    Generates the greeting template and a few first technical questions for a
+    job and caches them in `interview_openers`. Called when a shortlist is
+    produced; cheap no-op if the cache is current. If the LLM call fails the
+    default greeting is returned but not cached.
+    traffic: "interactive" when a candidate is waiting on a cache miss.
     """
     from src.database_manager import get_db_connection
-    
-    # Save to file
-    filename = f"data/transcripts/interview_{candidate_id}.txt"
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
-    with open(filename, "w") as f:
-        f.write(transcript_text)
-        
-    # Update DB
+
     conn = get_db_connection()
-    conn.execute(
-        "UPDATE candidates SET interview_transcript_path = ?, status = 'INTERVIEW_COMPLETED' WHERE id = ?",
-        (filename, candidate_id)
-    )
+    job = conn.execute("SELECT title, requirements FROM jobs WHERE id=?", (job_id,)).fetchone()
+    cached = conn.execute("SELECT requirements_hash FROM interview_openers WHERE job_id=?", (job_id,)).fetchone()
+    conn.close()
+    if not job:
+        return None
+    req_hash = _requirements_hash(job['title'], job['requirements'])
+    if cached and cached['requirements_hash'] == req_hash and not force:
+        return get_cached_opener(job_id)
+
+    prompt = f"""
+    You are an expert Technical Interviewer for the role of {job['title']}.
+    The candidate requirements are: {job['requirements']}.
+
+    Write the opening message of the interview and three first technical questions.
+    - The opening message welcomes the candidate and asks them to introduce themselves.
+    - Address the candidate with the literal placeholder {NAME_PLACEHOLDER}.
+    - Questions get harder from first to third and each targets one requirement.
+
+    Output JSON only: {{"greeting": "...", "questions": ["...", "...", "..."]}}
+    """
+    template, questions = DEFAULT_OPENER.replace("{job_title}", job['title']), []
+    try:
+        llm = get_chat_llm(LLM_MODEL, temperature=0.7, traffic=traffic)
+        raw = llm.predict(prompt)
+        data = json.loads(raw[raw.index("{"):raw.rindex("}") + 1])
+        if NAME_PLACEHOLDER in data.get("greeting", ""):
+            template = data["greeting"]
+        questions = [str(q) for q in data.get("questions", [])][:3]
+    except Exception as e:
+        # Not cached: the next call tries the LLM again instead of keeping the fallback for good
+        print(f"⚠️ Opener generation failed for job {job_id}, using the default greeting: {e}")
+        return {"template": template, "questions": questions}
+
+    try:
+        # Reused for later candidates through the question bank
+        from src.question_bank import add_job_questions
+        add_job_questions(job['requirements'], questions)
+    except Exception as e:
+        print(f"⚠️ Could not add the opener questions of job {job_id} to the question bank: {e}")
+
+    conn = get_db_connection()
+    conn.execute("""
+        INSERT OR REPLACE INTO interview_openers (job_id, template, questions, requirements_hash, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (job_id, template, json.dumps(questions), req_hash, datetime.now()))
+    conn.commit()
+    conn.close()
+    print(f"👋 Interview opener cached for job {job_id}")
+    return {"template": template, "questions": questions}
+
+def get_cached_opener(job_id):
+    """
+    Returns {"template", "questions"} for a job, or None if not prepared yet.
+    """
+    from src.database_manager import get_db_connection
+
+    conn = get_db_connection()
+    row = conn.execute("SELECT template, questions FROM interview_openers WHERE job_id=?", (job_id,)).fetchone()
+    conn.close()
+    if not row:
+        return None
+    return {"template": row['template'], "questions": json.loads(row['questions'] or "[]")}
+
+def personalize_opener(template, candidate_name):
+    first_name = (candidate_name or "").split()[0] if (candidate_name or "").strip() else "there"
+    return template.replace(NAME_PLACEHOLDER, first_name)
+
+def save_transcript(candidate_id, transcript_text=None):
+    """
+    Finishes an interview: exports the recorded turns (src/transcripts.py) as
+    gzipped JSONL and updates the DB. `transcript_text` is only used for
+    interviews that have no recorded turns.
+    """
+    from src.database_manager import get_db_connection
+    from src.transcripts import load_turns, export_transcript, save_transcript_text
+    from src.candidate_status import transition
+    from src.event_bus import publish, notify
+    from services.storage_service import retain, release
+
+    if load_turns(candidate_id, last_n=1) or transcript_text is None:
+        filename = export_transcript(candidate_id)
+    else:
+        filename = save_transcript_text(transcript_text)
+
+    # Update DB (the row now references the new file instead of any earlier one).
+    # Only an interview still open may be submitted: a graded candidate keeps its transcript.
+    conn = get_db_connection()
+    previous = conn.execute("SELECT job_id, interview_transcript_path FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+    submitted = transition(conn, candidate_id, ("SHORTLISTED", "INTERVIEW_COMPLETED"), "INTERVIEW_COMPLETED",
+                           interview_transcript_path=filename)
+    if submitted:
+        retain(conn, [filename])
+        # Committed with the status change: grading starts right away (src/event_bus.py)
+        event = publish(conn, "interview.submitted", {"candidate_id": candidate_id}, job_id=previous['job_id'])
     conn.commit()
     conn.close()
-    return filename
\ No newline at end of file
+    if not submitted:
+        print(f"⚠️ Candidate {candidate_id} is past the interview stage; transcript not saved (the orphan GC removes the file)")
+        return None
+    notify(event)
+    if previous['interview_transcript_path']:
+        release([previous['interview_transcript_path']])
+    return filename
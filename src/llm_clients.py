@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import threading
+import httpx
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.rate_limiter import get_limiter
+
+# Calls and tokens of every OpenAI response in this process (for benchmarks). Counting parses
+# each response body a second time, so it is off until a benchmark calls reset_usage().
+_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+_usage_lock = threading.Lock()
+_count_usage = False
+
+
+def get_usage():
+    with _usage_lock:
+        return dict(_usage)
+
+
+def reset_usage():
+    """Zeroes the counters and starts counting."""
+    global _count_usage
+    with _usage_lock:
+        for key in _usage:
+            _usage[key] = 0
+        _count_usage = True
+
+
+def _record_usage(response):
+    if not _count_usage or "application/json" not in response.headers.get("content-type", ""):
+        return
+    try:
+        usage = json.loads(response.read()).get("usage") or {}
+    except Exception:
+        return
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["prompt_tokens"] += usage.get("prompt_tokens", 0)
+        _usage["completion_tokens"] += usage.get("completion_tokens", 0)
+
+
+class RateLimitedTransport(httpx.HTTPTransport):
+    """
+    httpx transport that sends every OpenAI request through the shared limiter
+    (token bucket per traffic class, jittered retries, circuit breaker).
+    """
+
+    def __init__(self, traffic="batch", **kwargs):
+        super().__init__(**kwargs)
+        self.traffic = traffic
+
+    def handle_request(self, request):
+        request.read()  # Buffer the body so the request can be retried
+
+        def send():
+            response = super(RateLimitedTransport, self).handle_request(request)
+            return response.status_code, response.headers, response
+
+        response = get_limiter().call(send, traffic=self.traffic)
+        _record_usage(response)
+        return response
+
+
+def _http_client(traffic):
+    return httpx.Client(transport=RateLimitedTransport(traffic=traffic), timeout=httpx.Timeout(120.0, connect=10.0))
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _shared_client(key, factory):
+    """One client per key and process; clients are thread-safe and keep their connection pool."""
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = factory()
+        return _clients[key]
+
+
+def get_chat_llm(model_name="gpt-4o", temperature=0, traffic="batch"):
+    """
+    ChatOpenAI behind the shared rate limiter. The SDK's own retries are turned
+    off because the limiter retries with backoff that knows about all callers.
+    traffic: "interactive" for candidate/admin-facing calls, "batch" for bulk work.
+    """
+    def build():
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model_name=model_name,
+            temperature=temperature,
+            max_retries=0,
+            http_client=_http_client(traffic)
+        )
+    return _shared_client(("chat", model_name, temperature, traffic), build)
+
+
+def get_openai_client(traffic="interactive"):
+    """
+    Raw OpenAI() client (used for DALL-E) behind the shared rate limiter.
+    """
+    def build():
+        from openai import OpenAI
+        return OpenAI(max_retries=0, http_client=_http_client(traffic))
+    return _shared_client(("openai", traffic), build)
@@ -0,0 +1,269 @@
+"""
+Model cascade for screening and grading.
+
+Every candidate is scored by CHEAP_MODEL first. Only when that score lands
+within UNCERTAINTY_BAND points of the 70-point threshold (or the answer
+cannot be parsed) is the call repeated with EXPENSIVE_MODEL, whose answer
+then wins. Each decision is written to `routing_log` with both scores, the
+tokens of each model's call and latency. Tokens are counted per call with a
+LangChain callback, which only sees calls made in the current thread, so
+concurrent calls in the same process are not charged to this route.
+
+    python -m src.model_router --report                 # from routing_log, no API calls
+    python -m src.model_router --replay --job-id 3      # re-score history with the cheap model
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+# Configuration
+CASCADE_ENABLED = os.getenv("HIRE_OS_CASCADE", "1") == "1"
+CHEAP_MODEL = os.getenv("HIRE_OS_CHEAP_MODEL", "gpt-4o-mini")
+EXPENSIVE_MODEL = os.getenv("HIRE_OS_EXPENSIVE_MODEL", "gpt-4o")
+UNCERTAINTY_BAND = float(os.getenv("HIRE_OS_UNCERTAINTY_BAND", "10"))  # Escalate if |score - 70| <= band
+THRESHOLD = 70
+
+# USD per 1M tokens (input, output); used for savings estimates only
+PRICES = {"gpt-4o": (2.50, 10.00), "gpt-4o-mini": (0.15, 0.60)}
+
+
+def _score_of(data):
+    try:
+        return float(data.get('score'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def needs_escalation(score, band=UNCERTAINTY_BAND):
+    return score is None or abs(score - THRESHOLD) <= band
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    price_in, price_out = PRICES.get(model, PRICES["gpt-4o"])
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+# --- 1. ROUTING ---
+
+def _timed_call(call, model):
+    """Returns call(model) and the latency and tokens of that call alone."""
+    from langchain_community.callbacks import get_openai_callback
+
+    start = time.perf_counter()
+    with get_openai_callback() as cb:
+        raw = call(model)
+    return raw, {
+        "latency_ms": int((time.perf_counter() - start) * 1000),
+        "prompt_tokens": cb.prompt_tokens,
+        "completion_tokens": cb.completion_tokens,
+    }
+
+
+def route(stage, job_id, candidate_id, call, parse):
+    """
+    Runs call(model_name) -> raw answer through the cascade and returns the
+    raw answer that should be used. parse(raw) -> dict (or None) with a 'score'.
+    stage: "screen" or "grade".
+    """
+    if not CASCADE_ENABLED:
+        raw, usage = _timed_call(call, EXPENSIVE_MODEL)
+        log_route(stage, job_id, candidate_id, None, None, False, EXPENSIVE_MODEL,
+                  _score_of(parse(raw)), "cascade disabled", None, usage)
+        return raw
+
+    raw, cheap = _timed_call(call, CHEAP_MODEL)
+    cheap_score = _score_of(parse(raw))
+    if not needs_escalation(cheap_score):
+        log_route(stage, job_id, candidate_id, CHEAP_MODEL, cheap_score, False, CHEAP_MODEL, cheap_score,
+                  "outside band", cheap, None)
+        return raw
+
+    reason = "unparseable" if cheap_score is None else f"within ±{UNCERTAINTY_BAND:g} of {THRESHOLD}"
+    raw, expensive = _timed_call(call, EXPENSIVE_MODEL)
+    log_route(stage, job_id, candidate_id, CHEAP_MODEL, cheap_score, True, EXPENSIVE_MODEL,
+              _score_of(parse(raw)), reason, cheap, expensive)
+    print(f"⤴️ Escalated candidate {candidate_id} to {EXPENSIVE_MODEL} ({reason})")
+    return raw
+
+
+def log_route(stage, job_id, candidate_id, cheap_model, cheap_score, escalated, final_model, final_score, reason,
+              cheap_usage, expensive_usage):
+    """cheap_usage / expensive_usage: latency and tokens of each model's call (None if not called)."""
+    calls = [u for u in (cheap_usage, expensive_usage) if u]
+    conn = get_db_connection()
+    conn.execute("""
+        INSERT INTO routing_log (stage, job_id, candidate_id, cheap_model, cheap_score, escalated, final_model,
+                                 final_score, reason, prompt_tokens, completion_tokens,
+                                 cheap_prompt_tokens, cheap_completion_tokens,
+                                 expensive_prompt_tokens, expensive_completion_tokens, latency_ms, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (stage, job_id, candidate_id, cheap_model, cheap_score, int(escalated), final_model, final_score, reason,
+          sum(u['prompt_tokens'] for u in calls), sum(u['completion_tokens'] for u in calls),
+          (cheap_usage or {}).get('prompt_tokens', 0), (cheap_usage or {}).get('completion_tokens', 0),
+          (expensive_usage or {}).get('prompt_tokens', 0), (expensive_usage or {}).get('completion_tokens', 0),
+          sum(u['latency_ms'] for u in calls), datetime.now()))
+    conn.commit()
+    conn.close()
+
+
+# --- 2. OFFLINE ANALYSIS ---
+
+def report(stage=None):
+    """
+    Summarises routing_log: escalation rate, agreement of the cheap model with
+    GPT-4o on escalated cases, and cost versus sending everything to GPT-4o.
+    """
+    conn = get_db_connection()
+    sql = "SELECT * FROM routing_log"
+    params = []
+    if stage:
+        sql += " WHERE stage=?"
+        params.append(stage)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    if not rows:
+        print("No routing decisions logged yet.")
+        return None
+
+    escalated = [r for r in rows if r['escalated']]
+    both = [r for r in escalated if r['cheap_score'] is not None and r['final_score'] is not None]
+    agree = sum((r['cheap_score'] >= THRESHOLD) == (r['final_score'] >= THRESHOLD) for r in both)
+
+    actual, all_expensive = 0.0, 0.0
+    for r in rows:
+        if r['cheap_prompt_tokens'] is not None:
+            cheap = (r['cheap_prompt_tokens'], r['cheap_completion_tokens'])
+            expensive = (r['expensive_prompt_tokens'], r['expensive_completion_tokens'])
+        elif r['escalated']:
+            # Logged before tokens were split per model: both calls summed, assume an even split
+            cheap = expensive = (r['prompt_tokens'] / 2, r['completion_tokens'] / 2)
+        elif r['final_model'] == EXPENSIVE_MODEL:
+            cheap, expensive = (0, 0), (r['prompt_tokens'], r['completion_tokens'])
+        else:
+            cheap, expensive = (r['prompt_tokens'], r['completion_tokens']), (0, 0)
+        actual += estimate_cost(CHEAP_MODEL if r['cheap_model'] is None else r['cheap_model'], *cheap)
+        actual += estimate_cost(EXPENSIVE_MODEL, *expensive)
+        # Same prompt either way: one GPT-4o call of whichever size was measured
+        all_expensive += estimate_cost(EXPENSIVE_MODEL, *(expensive if any(expensive) else cheap))
+    summary = {
+        "decisions": len(rows),
+        "escalation_rate": len(escalated) / len(rows),
+        "cheap_agreement_on_escalated": (agree / len(both)) if both else None,
+        "cost_usd": actual,
+        "all_expensive_cost_usd": all_expensive,
+    }
+    print(f"🔀 {summary['decisions']} decisions, {summary['escalation_rate']:.0%} escalated")
+    if both:
+        print(f"   Cheap model agreed with {EXPENSIVE_MODEL} on {agree}/{len(both)} escalated cases")
+    print(f"   Estimated cost ${actual:.4f} vs ${all_expensive:.4f} all-{EXPENSIVE_MODEL}")
+    return summary
+
+
+def _expensive_scores(job_id):
+    """{candidate_id: latest EXPENSIVE_MODEL screening score} from routing_log."""
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT candidate_id, final_score FROM routing_log
+        WHERE job_id=? AND stage='screen' AND final_model=? AND final_score IS NOT NULL
+        ORDER BY id
+    """, (job_id, EXPENSIVE_MODEL)).fetchall()
+    conn.close()
+    return {row['candidate_id']: row['final_score'] for row in rows}
+
+
+def replay(job_id, limit=50, bands=(0, 5, 10, 15, 20)):
+    """
+    Re-scores historical candidates of a job with the cheap model (no DB
+    writes) and compares against EXPENSIVE_MODEL for several band widths:
+    agreement of the routed decision and share of GPT-4o calls saved.
+    The reference is the candidate's logged EXPENSIVE_MODEL score; candidates
+    that only ever had a cheap-model score (stored resume_score is then the
+    cheap model's own answer) are re-scored once with EXPENSIVE_MODEL.
+    """
+    from src.agents import screen_direct, parse_llm_json, DEFAULT_CONTEXT_TOKENS
+    from src.llm_clients import get_chat_llm
+
+    conn = get_db_connection()
+    job = conn.execute(
+        "SELECT title, description, requirements, context_token_budget FROM jobs WHERE id=?", (job_id,)
+    ).fetchone()
+    history = conn.execute("""
+        SELECT id, resume_path FROM candidates
+        WHERE job_id=? AND resume_score IS NOT NULL AND resume_path IS NOT NULL LIMIT ?
+    """, (job_id, limit)).fetchall()
+    conn.close()
+    if not job or not history:
+        print("Nothing to replay (no scored candidates for this job).")
+        return None
+
+    job_context = f"Job Title: {job['title']}\nDescription: {job['description']}\nRequirements: {job['requirements']}"
+    max_tokens = job['context_token_budget'] or DEFAULT_CONTEXT_TOKENS
+
+    def score(cand, model):
+        llm = get_chat_llm(model, temperature=0, traffic="batch")
+        raw, usage = _timed_call(lambda m: screen_direct(llm, job_context, cand['id'], cand['resume_path'], max_tokens),
+                                 model)
+        return _score_of(parse_llm_json(raw)), usage
+
+    logged = _expensive_scores(job_id)
+    pairs, tokens, rescored = [], {"prompt_tokens": 0, "completion_tokens": 0}, 0
+    for cand in history:
+        cheap, usage = score(cand, CHEAP_MODEL)
+        tokens['prompt_tokens'] += usage['prompt_tokens']
+        tokens['completion_tokens'] += usage['completion_tokens']
+        reference = logged.get(cand['id'])
+        if reference is None:
+            reference, _ = score(cand, EXPENSIVE_MODEL)
+            rescored += 1
+        if reference is not None:
+            pairs.append((cheap, reference))
+
+    n = len(pairs)
+    if not n:
+        print("Nothing to replay (no parseable reference scores).")
+        return None
+    per_call = {k: v / len(history) for k, v in tokens.items()}
+    expensive_call = estimate_cost(EXPENSIVE_MODEL, per_call['prompt_tokens'], per_call['completion_tokens'])
+    cheap_call = estimate_cost(CHEAP_MODEL, per_call['prompt_tokens'], per_call['completion_tokens'])
+
+    print(f"\nReplay of {n} candidates (job #{job_id}), reference = {EXPENSIVE_MODEL} "
+          f"({len(history) - rescored} logged, {rescored} re-scored)")
+    print(f"{'band':>5} {'escalated':>10} {'agreement':>10} {'cost vs all-4o':>15}")
+    results = []
+    for band in bands:
+        escalated = [needs_escalation(cheap, band) for cheap, _ in pairs]
+        # Escalated candidates get the expensive answer, i.e. the reference
+        agree = sum(
+            esc or (cheap >= THRESHOLD) == (reference >= THRESHOLD)
+            for esc, (cheap, reference) in zip(escalated, pairs)
+        )
+        cost = n * cheap_call + sum(escalated) * expensive_call
+        results.append({"band": band, "escalated": sum(escalated) / n, "agreement": agree / n,
+                        "cost_ratio": cost / (n * expensive_call) if expensive_call else None})
+        print(f"{band:5g} {sum(escalated) / n:10.0%} {agree / n:10.0%} "
+              f"{(cost / (n * expensive_call) if expensive_call else 0):15.0%}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS model cascade")
+    parser.add_argument("--report", action="store_true", help="Summarise logged routing decisions")
+    parser.add_argument("--stage", choices=["screen", "grade"])
+    parser.add_argument("--replay", action="store_true",
+                        help="Re-score historical candidates with the cheap model against GPT-4o")
+    parser.add_argument("--job-id", type=int)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.report:
+        report(args.stage)
+    if args.replay:
+        if args.job_id is None:
+            parser.error("--replay needs --job-id")
+        replay(args.job_id, args.limit)
@@ -0,0 +1,382 @@
+"""
+Sandboxed resume extraction.
+
+PDFs are parsed in worker processes, never in the Streamlit server or the
+screening loop itself. Every file gets a wall-clock timeout, a page cap and
+a memory cap (address-space limit on the worker); a worker that times out or
+runs out of memory is killed and replaced. Files that crash a worker or hit
+the memory cap are recorded in `quarantined_files` (by content hash) and are
+not retried; a timeout may be a busy machine, so those files are retried.
+
+    pool = ExtractionPool()
+    for path, text, error in pool.imap(paths):   # completion order
+        ...
+"""
+import os
+import sys
+import time
+import atexit
+import resource
+import threading
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import wait
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from src.resume_corpus import extract_pdf_text, hash_file
+from services import storage_service as storage
+
+# Configuration
+POOL_SIZE = int(os.getenv("HIRE_OS_EXTRACT_PROCESSES", str(min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT = float(os.getenv("HIRE_OS_EXTRACT_TIMEOUT", "20"))   # Seconds per file
+MAX_MEMORY_MB = int(os.getenv("HIRE_OS_EXTRACT_MAX_MB", "512"))      # Extra memory a worker may allocate
+MAX_PAGES = int(os.getenv("HIRE_OS_EXTRACT_MAX_PAGES", "15"))         # Later pages are ignored
+MAX_FILE_MB = 10                                                      # Larger files are quarantined unread
+
+
+class ExtractionError(RuntimeError):
+    """
+    Raised when a resume cannot be extracted. `retryable` is True for
+    timeouts; any other failure will happen again on the same file.
+    """
+
+    def __init__(self, reason, retryable=False):
+        super().__init__(reason)
+        self.retryable = retryable
+
+
+TIMED_OUT = "Timed out"
+CRASHED = "Extraction worker crashed"
+MEMORY_LIMIT = "Memory limit exceeded"
+
+
+def _is_fatal(reason):
+    """Crashes and memory-limit kills quarantine the file; timeouts and parser errors do not."""
+    return reason.startswith((CRASHED, MEMORY_LIMIT))
+
+
+# --- 1. WORKER PROCESS ---
+
+def _address_space_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * resource.getpagesize()
+
+
+def _worker_main(conn, max_pages, max_memory_mb):
+    """
+    Extraction loop of one worker: receives a path, sends (ok, text_or_reason).
+    The memory cap is relative to the worker's size after fork.
+    """
+    if max_memory_mb:
+        try:
+            limit = _address_space_bytes() + max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, resource.RLIM_INFINITY))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Extraction worker runs without memory cap: {e}")
+
+    while True:
+        try:
+            path = conn.recv()
+        except EOFError:
+            break
+        if path is None:
+            break
+        try:
+            conn.send((True, extract_pdf_text(path, max_pages=max_pages)))
+        except MemoryError:
+            conn.send((False, f"{MEMORY_LIMIT} ({max_memory_mb} MB)"))
+            break  # The interpreter state is not trustworthy any more
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+# --- 2. POOL ---
+
+class ExtractionPool:
+    """
+    Fixed set of extraction processes driven over pipes. Not thread-safe:
+    use one pool per thread (see get_pool for the shared, locked one).
+    """
+
+    def __init__(self, processes=POOL_SIZE, timeout=EXTRACT_TIMEOUT, max_pages=MAX_PAGES, max_memory_mb=MAX_MEMORY_MB):
+        self.size = max(1, processes)
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.workers = []
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        proc = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, self.max_pages, self.max_memory_mb), daemon=True
+        )
+        proc.start()
+        child_conn.close()
+        return {"proc": proc, "conn": parent_conn, "path": None, "deadline": None}
+
+    def _replace(self, worker):
+        worker['proc'].kill()
+        worker['proc'].join()
+        worker['conn'].close()
+        self.workers[self.workers.index(worker)] = self._spawn()
+
+    def imap(self, paths):
+        """
+        Extracts files in parallel. Yields (path, text, None) or
+        (path, None, reason) in completion order. `paths` is consumed lazily,
+        one path whenever a worker is free, so it may be a generator that
+        decides at that moment whether a file still needs extracting.
+        """
+        import pypdf  # noqa: F401 -- a missing dependency must not quarantine every file
+        pending = iter(paths)
+        exhausted = False
+
+        while True:
+            while not exhausted:
+                worker = next((w for w in self.workers if w['path'] is None), None)
+                if worker is None and len(self.workers) >= self.size:
+                    break
+                path = next(pending, None)
+                if path is None:
+                    exhausted = True
+                    break
+                if worker is None:
+                    worker = self._spawn()
+                    self.workers.append(worker)
+                worker['path'] = path
+                worker['deadline'] = time.monotonic() + self.timeout
+                worker['conn'].send(worker['path'])
+
+            busy = [w for w in self.workers if w['path']]
+            if not busy:
+                return
+            next_deadline = min(w['deadline'] for w in busy)
+            ready = wait([w['conn'] for w in busy], timeout=max(0.0, next_deadline - time.monotonic()))
+
+            for worker in busy:
+                path = worker['path']
+                if worker['conn'] in ready:
+                    try:
+                        ok, payload = worker['conn'].recv()
+                    except EOFError:
+                        # The pipe closes before the child is reaped (is_alive() may still be True):
+                        # always replace, and read the exit code once it has been joined
+                        proc = worker['proc']
+                        worker['path'] = None
+                        self._replace(worker)
+                        yield path, None, f"{CRASHED} (exit code {proc.exitcode})"
+                        continue
+                    worker['path'] = None
+                    if not ok and _is_fatal(payload):
+                        self._replace(worker)
+                    yield (path, payload, None) if ok else (path, None, payload)
+                elif time.monotonic() >= worker['deadline']:
+                    worker['path'] = None
+                    self._replace(worker)
+                    yield path, None, f"{TIMED_OUT} after {self.timeout:.0f}s"
+
+    def close(self):
+        for worker in self.workers:
+            try:
+                worker['conn'].send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        for worker in self.workers:
+            worker['proc'].join(timeout=1)
+            if worker['proc'].is_alive():
+                worker['proc'].kill()
+            worker['conn'].close()
+        self.workers = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool for single-file extraction (lazily started)."""
+    global _pool
+    if _pool is None:
+        _pool = ExtractionPool(processes=1)
+        atexit.register(_pool.close)
+    return _pool
+
+
+# --- 3. QUARANTINE ---
+
+def quarantine(path, reason, content_hash=None):
+    content_hash = content_hash or hash_file(path)
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO quarantined_files (content_hash, path, reason, created_at) VALUES (?, ?, ?, ?)",
+        (content_hash, path, reason, datetime.now())
+    )
+    conn.commit()
+    conn.close()
+    print(f"☣️ Quarantined {path}: {reason}")
+
+
+def quarantine_reason(content_hash):
+    conn = get_db_connection()
+    row = conn.execute("SELECT reason FROM quarantined_files WHERE content_hash=?", (content_hash,)).fetchone()
+    conn.close()
+    return row['reason'] if row else None
+
+
+def _precheck(path, content_hash):
+    """Returns a reason to skip the file without parsing it, or None."""
+    if not storage.exists(path):
+        return "File not found"
+    reason = quarantine_reason(content_hash)
+    if reason:
+        return f"Quarantined: {reason}"
+    if storage.size(path) > MAX_FILE_MB * 1024 * 1024:
+        quarantine(path, f"File larger than {MAX_FILE_MB} MB", content_hash)
+        return f"Quarantined: File larger than {MAX_FILE_MB} MB"
+    return None
+
+
+# --- 4. ENTRY POINTS ---
+
+def extract_resume(path, content_hash=None):
+    """
+    Extracts one resume (store ref or path) through the shared pool. Raises ExtractionError.
+    """
+    content_hash = content_hash or (hash_file(path) if storage.exists(path) else None)
+    reason = _precheck(path, content_hash)
+    if reason:
+        raise ExtractionError(reason)
+
+    with _pool_lock:
+        _, text, error = next(get_pool().imap([storage.local_path(path)]))
+    if error:
+        if _is_fatal(error):
+            quarantine(path, error, content_hash)
+        raise ExtractionError(error, retryable=error.startswith(TIMED_OUT))
+    return text
+
+
+def extract_many(paths, pool=None):
+    """
+    Pipelined extraction of many files (store refs or paths). Yields
+    (path, content_hash, text, error) in completion order; crashes and
+    memory-limit kills are quarantined. `paths` is consumed lazily (see
+    ExtractionPool.imap).
+    """
+    hashes, local, skipped = {}, {}, deque()
+
+    def feed():
+        for path in paths:
+            content_hash = hash_file(path) if storage.exists(path) else None
+            reason = _precheck(path, content_hash)
+            if reason:
+                skipped.append((path, content_hash, None, reason))
+                continue
+            hashes[path] = content_hash
+            local_path = storage.local_path(path)  # The workers open real files
+            local[local_path] = path
+            yield local_path
+
+    own_pool = pool is None
+    pool = pool or ExtractionPool()
+    try:
+        for local_path, text, error in pool.imap(feed()):
+            while skipped:
+                yield skipped.popleft()
+            path = local[local_path]
+            if error and _is_fatal(error):
+                quarantine(path, error, hashes[path])
+            yield path, hashes[path], text, error
+        while skipped:
+            yield skipped.popleft()
+    finally:
+        if own_pool:
+            pool.close()
+
+
+class ResumePrefetcher:
+    """
+    Extracts and ingests the resumes of a screening run in a background
+    thread, ahead of the LLM stage. wait(candidate_id) blocks until that
+    candidate's resume has been handled (or the timeout passes). Each file is
+    extracted once: by the prefetcher, or by the caller if wait() timed out
+    before the prefetcher got to it.
+    """
+
+    def __init__(self, rows):
+        self.rows = [(row['candidate_id'], row['resume_path']) for row in rows if row['resume_path']]
+        self.done = {cand_id: threading.Event() for cand_id, _ in self.rows}
+        self.state = {cand_id: "pending" for cand_id, _ in self.rows}  # pending / extracting / taken
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _start(self, cand_ids):
+        """Returns the candidates not taken back by wait(), now marked as being extracted here."""
+        with self.lock:
+            mine = [cand_id for cand_id in cand_ids if self.state[cand_id] == "pending"]
+            for cand_id in mine:
+                self.state[cand_id] = "extracting"
+        return mine
+
+    def _run(self):
+        from src.resume_corpus import add_resume, get_doc_id, get_doc_id_by_hash
+
+        by_path = {}
+        for cand_id, path in self.rows:
+            if get_doc_id(cand_id) is None:
+                by_path.setdefault(path, []).append(cand_id)
+            else:
+                self.done[cand_id].set()
+        for path in list(by_path):
+            # Identical files that are already in the corpus need no extraction
+            if storage.exists(path) and get_doc_id_by_hash(hash_file(path)) is not None:
+                for cand_id in self._start(by_path.pop(path)):
+                    add_resume(cand_id, path)
+                    self.done[cand_id].set()
+
+        def feed():
+            # Pulled by the pool whenever a worker is free
+            for path in list(by_path):
+                by_path[path] = self._start(by_path[path])
+                if by_path[path]:
+                    yield path
+                else:
+                    del by_path[path]
+
+        try:
+            for path, content_hash, text, error in extract_many(feed()):
+                for cand_id in by_path.pop(path):
+                    if text is not None:
+                        try:
+                            add_resume(cand_id, path, text=text)
+                        except Exception as e:
+                            print(f"⚠️ Could not ingest {path}: {e}")
+                    else:
+                        self.errors[cand_id] = ExtractionError(error, retryable=error.startswith(TIMED_OUT))
+                    self.done[cand_id].set()
+        finally:
+            for event in self.done.values():
+                event.set()
+
+    def wait(self, candidate_id, timeout=EXTRACT_TIMEOUT * 2):
+        """
+        Raises the ExtractionError of a failed extraction. If the prefetcher
+        has not started on this candidate when the timeout passes, it is taken
+        back and the caller extracts the file itself (get_resume_text).
+        """
+        event = self.done.get(candidate_id)
+        if event is None:
+            return
+        if not event.wait(timeout):
+            with self.lock:
+                if self.state[candidate_id] == "pending":
+                    self.state[candidate_id] = "taken"
+                    return
+            event.wait(EXTRACT_TIMEOUT * 2)  # Already in the pool: bounded by the per-file timeout
+        if candidate_id in self.errors:
+            raise self.errors[candidate_id]
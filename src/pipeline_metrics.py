@@ -0,0 +1,199 @@
+"""
+Pipeline latency metrics from the candidate status event log.
+
+Every status change appends a row to `candidate_events` (SQLite triggers,
+see create_tables). The rollups below are maintained incrementally:
+update_rollups() only reads the events after its cursor, so a refresh
+costs O(new events) however long the history is.
+
+    stage_open       stage each candidate is in, and since when
+    stage_durations  per job and stage, a log-spaced histogram of the time
+                     candidates spent there (percentiles without keeping
+                     every duration)
+    stage_daily      per job, day and stage: candidates that entered / left
+
+    python -m src.pipeline_metrics            # update, then print latency per job
+"""
+import os
+import sys
+import math
+import argparse
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+CURSOR = "stage_rollups"
+BATCH_SIZE = 10000
+BUCKETS_PER_DOUBLING = 4  # Histogram resolution: bucket edges ~19% apart
+PIPELINE_STAGES = ["APPLIED", "SHORTLISTED", "INTERVIEW_COMPLETED", "FINALIST", "HR_ROUND_SCHEDULED"]
+
+
+def _bucket(seconds):
+    return 0 if seconds < 1 else int(math.log2(seconds) * BUCKETS_PER_DOUBLING)
+
+
+def _bucket_value(bucket):
+    """Geometric middle of a bucket, in seconds."""
+    return 2 ** ((bucket + 0.5) / BUCKETS_PER_DOUBLING)
+
+
+def _day(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+# --- 1. INCREMENTAL ROLLUPS ---
+
+def update_rollups(batch_size=BATCH_SIZE):
+    """
+    Folds the events logged since the last call into the rollup tables, one
+    batch per write transaction (cursor moves in the same transaction, so
+    concurrent callers never count an event twice). Returns the number of
+    events processed.
+    """
+    processed = 0
+    while True:
+        conn = get_db_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT last_event_id FROM metric_cursors WHERE name=?", (CURSOR,)).fetchone()
+            cursor = row['last_event_id'] if row else 0
+            events = conn.execute(
+                "SELECT * FROM candidate_events WHERE id > ? ORDER BY id LIMIT ?", (cursor, batch_size)
+            ).fetchall()
+            if not events:
+                conn.rollback()
+                return processed
+
+            for event in events:
+                at = event['at']
+                current = conn.execute(
+                    "SELECT status, entered_at FROM stage_open WHERE candidate_id=?", (event['candidate_id'],)
+                ).fetchone()
+                if current and current['entered_at'] is not None:
+                    # Leaving a stage: one duration sample and one exit
+                    seconds = max(0.0, at - current['entered_at'])
+                    conn.execute("""
+                        INSERT INTO stage_durations (job_id, stage, bucket, count, total_seconds) VALUES (?, ?, ?, 1, ?)
+                        ON CONFLICT(job_id, stage, bucket) DO UPDATE
+                        SET count = count + 1, total_seconds = total_seconds + excluded.total_seconds
+                    """, (event['job_id'], current['status'], _bucket(seconds), seconds))
+                    conn.execute("""
+                        INSERT INTO stage_daily (job_id, day, stage, exited) VALUES (?, ?, ?, 1)
+                        ON CONFLICT(job_id, day, stage) DO UPDATE SET exited = exited + 1
+                    """, (event['job_id'], _day(at), current['status']))
+                conn.execute("""
+                    INSERT INTO stage_daily (job_id, day, stage, entered) VALUES (?, ?, ?, 1)
+                    ON CONFLICT(job_id, day, stage) DO UPDATE SET entered = entered + 1
+                """, (event['job_id'], _day(at), event['to_status']))
+                conn.execute(
+                    "INSERT OR REPLACE INTO stage_open (candidate_id, job_id, status, entered_at) VALUES (?, ?, ?, ?)",
+                    (event['candidate_id'], event['job_id'], event['to_status'], at)
+                )
+
+            conn.execute("""
+                INSERT INTO metric_cursors (name, last_event_id) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET last_event_id = excluded.last_event_id
+            """, (CURSOR, events[-1]['id']))
+            conn.commit()
+            processed += len(events)
+        finally:
+            conn.close()
+
+
+# --- 2. READS ---
+
+def _percentile(histogram, q):
+    """histogram: [(bucket, count)] sorted by bucket."""
+    total = sum(count for _, count in histogram)
+    seen = 0
+    for bucket, count in histogram:
+        seen += count
+        if seen >= q * total:
+            return _bucket_value(bucket)
+    return None
+
+
+def stage_latency(job_id=None):
+    """
+    Time spent per stage by candidates that already left it, one row per
+    job and stage (only `job_id` if given):
+    [{job_id, stage, candidates, mean_hours, p50_hours, p90_hours}].
+    Calls update_rollups() first.
+    """
+    update_rollups()
+    conn = get_db_connection()
+    sql = "SELECT job_id, stage, bucket, count, total_seconds FROM stage_durations"
+    params = ()
+    if job_id is not None:
+        sql += " WHERE job_id = ?"
+        params = (job_id,)
+    rows = conn.execute(sql + " ORDER BY job_id, stage, bucket", params).fetchall()
+    conn.close()
+
+    groups = {}
+    for row in rows:
+        group = groups.setdefault((row['job_id'], row['stage']), {"histogram": [], "seconds": 0.0})
+        group["histogram"].append((row['bucket'], row['count']))
+        group["seconds"] += row['total_seconds']
+
+    order = {stage: i for i, stage in enumerate(PIPELINE_STAGES)}
+    result = []
+    for (job, stage), group in sorted(groups.items(), key=lambda kv: (kv[0][0], order.get(kv[0][1], 99))):
+        n = sum(count for _, count in group["histogram"])
+        result.append({
+            "job_id": job,
+            "stage": stage,
+            "candidates": n,
+            "mean_hours": round(group["seconds"] / n / 3600, 2),
+            "p50_hours": round(_percentile(group["histogram"], 0.5) / 3600, 2),
+            "p90_hours": round(_percentile(group["histogram"], 0.9) / 3600, 2),
+        })
+    return result
+
+
+def daily_throughput(job_id=None, days=30):
+    """[{day, stage, entered, exited}] for the last `days` days (summed over jobs when job_id is None)."""
+    update_rollups()
+    conn = get_db_connection()
+    sql = """
+        SELECT day, stage, SUM(entered) AS entered, SUM(exited) AS exited FROM stage_daily
+        WHERE day >= date('now', 'localtime', ?)
+    """
+    params = [f"-{int(days)} days"]
+    if job_id is not None:
+        sql += " AND job_id = ?"
+        params.append(job_id)
+    rows = conn.execute(sql + " GROUP BY day, stage ORDER BY day, stage", params).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def stage_backlog(job_id=None):
+    """{stage: (candidates waiting, oldest wait in hours)} of candidates currently in each pipeline stage."""
+    update_rollups()
+    conn = get_db_connection()
+    sql = "SELECT status, COUNT(*) AS n, MIN(entered_at) AS oldest FROM stage_open"
+    params = ()
+    if job_id is not None:
+        sql += " WHERE job_id = ?"
+        params = (job_id,)
+    rows = conn.execute(sql + " GROUP BY status", params).fetchall()
+    conn.close()
+    now = datetime.now().timestamp()
+    return {
+        row['status']: (row['n'], round((now - row['oldest']) / 3600, 2))
+        for row in rows if row['status'] in PIPELINE_STAGES
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS pipeline latency metrics")
+    parser.add_argument("--job-id", type=int)
+    args = parser.parse_args()
+
+    print(f"📈 Rolled up {update_rollups():,} new events")
+    for row in stage_latency(args.job_id):
+        print(f"  job {row['job_id']:>4} {row['stage']:<20} n={row['candidates']:<6} "
+              f"p50={row['p50_hours']}h p90={row['p90_hours']}h mean={row['mean_hours']}h")
@@ -0,0 +1,262 @@
+"""
+Local interview question bank with retrieval.
+
+Questions and grading rubrics are stored per skill and difficulty (1-3) in
+`question_bank`, each with a 256-d hashed term vector (the same encoding as
+talent rediscovery). Per turn the interviewer retrieves a few unused
+questions for the job's skills (keyword index: skill column) at the
+difficulty the conversation has reached, re-ranked by similarity to the
+candidate's last answer (vector index). The vectors are cached in memory
+and only rows added since the last lookup are loaded, so the index updates
+incrementally and retrieval stays in the low milliseconds.
+
+    python -m src.question_bank --seed
+    python -m src.question_bank --import questions.jsonl   # {"skill", "difficulty", "question", "rubric"}
+    python -m src.question_bank --query "Python, AWS" --answer "I used boto3..."
+"""
+import os
+import sys
+import json
+import time
+import array
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from src.resume_corpus import tokenize
+from src.talent_search import hashed_vector
+from src.requirement_matcher import parse_requirements, canonical_skill, compile_requirements, TAXONOMY
+
+SHORT_ANSWER_TOKENS = 12  # Answers shorter than this keep the difficulty down
+
+SEED_QUESTIONS = [
+    ("python", 1, "What is the difference between a list and a tuple in Python, and when would you use each?",
+     "Mutability; tuples hashable as dict keys; fixed records vs growing collections."),
+    ("python", 2, "How do generators work in Python and when do they save memory?",
+     "yield, lazy evaluation, iterator protocol; streaming large files or infinite sequences."),
+    ("python", 3, "Explain the GIL and how you would speed up a CPU-bound Python workload.",
+     "One thread runs bytecode at a time; multiprocessing, C extensions/numpy, async only helps I/O."),
+    ("javascript", 1, "What is the difference between let, const and var?",
+     "Block vs function scope, hoisting, reassignment."),
+    ("javascript", 2, "Explain the event loop and how promises are scheduled.",
+     "Call stack, task vs microtask queue, await as promise continuation."),
+    ("javascript", 3, "How would you find and fix a memory leak in a long-running Node.js service?",
+     "Heap snapshots, retained closures/listeners/caches, load tests, bounded caches."),
+    ("react", 1, "What are props and state in React?", "Props from parent, read-only; state local and triggers re-render."),
+    ("react", 2, "When does a React component re-render and how do you avoid unnecessary renders?",
+     "State/prop/context change; memo, useMemo/useCallback, stable keys, state colocation."),
+    ("react", 3, "How would you design state management for a large React application?",
+     "Server vs client state, context boundaries, query caches, normalised stores, trade-offs."),
+    ("sql", 1, "What is the difference between an INNER JOIN and a LEFT JOIN?", "Matching rows only vs all left rows with NULLs."),
+    ("sql", 2, "How do indexes speed up queries, and when can they hurt?",
+     "B-tree lookups, selectivity, covering indexes; slower writes, storage, unused indexes."),
+    ("sql", 3, "A query got slow after the table grew 100x. How do you investigate?",
+     "EXPLAIN plan, missing/unused index, statistics, N+1, pagination, partitioning."),
+    ("aws", 1, "What is the difference between EC2 and Lambda?", "Servers you manage vs event-driven functions; cost and limits."),
+    ("aws", 2, "How do you give an application running on AWS access to S3 securely?",
+     "IAM roles/instance profiles, least privilege, no static keys, bucket policies."),
+    ("aws", 3, "Design a highly available web backend on AWS. What fails over and how?",
+     "Multi-AZ, load balancer, auto scaling, managed DB with replicas, health checks, backups."),
+    ("docker", 1, "What is the difference between a Docker image and a container?", "Immutable template vs running instance."),
+    ("docker", 2, "How do you keep Docker images small and builds fast?",
+     "Slim base, multi-stage builds, layer ordering, .dockerignore, cache."),
+    ("docker", 3, "How would you debug a container that works locally but crashes in production?",
+     "Logs, env/config differences, resource limits, health checks, reproduce with same image."),
+    ("kubernetes", 1, "What is a Pod and how does it relate to a Deployment?", "Smallest unit; Deployment manages replica sets of pods."),
+    ("kubernetes", 2, "How do liveness and readiness probes differ?", "Restart vs remove from service endpoints."),
+    ("kubernetes", 3, "How would you roll out a risky change to a service on Kubernetes safely?",
+     "Rolling/canary, readiness gates, PDBs, metrics-based rollback, feature flags."),
+    ("machine learning", 1, "What is overfitting and how do you detect it?", "Train vs validation gap; cross-validation."),
+    ("machine learning", 2, "How do you handle a heavily imbalanced classification dataset?",
+     "Metrics (PR-AUC, F1), resampling, class weights, threshold tuning."),
+    ("machine learning", 3, "Your model performs well offline but poorly in production. What do you check?",
+     "Data drift, leakage, training/serving skew, feedback loops, monitoring."),
+    ("large language models", 1, "What is a context window and why does it matter?", "Token limit; truncation, cost, retrieval."),
+    ("large language models", 2, "How does retrieval-augmented generation work?",
+     "Embed/index documents, retrieve top-k, ground the prompt, cite; chunking trade-offs."),
+    ("large language models", 3, "How would you evaluate and reduce hallucinations in an LLM feature?",
+     "Grounding, eval sets, automatic and human grading, constrained outputs, guardrails."),
+    ("crewai", 1, "What are agents, tasks and tools in CrewAI?", "Role/goal LLM workers, units of work, callable functions."),
+    ("crewai", 2, "When would you give an agent a tool instead of putting the data in the prompt?",
+     "Large/dynamic data, side effects vs extra round trips, latency and token cost."),
+    ("crewai", 3, "How would you make a multi-agent pipeline reliable and affordable in production?",
+     "Structured outputs, retries, checkpoints, caching, cheaper models, evaluation."),
+    ("langchain", 1, "What is a chain in LangChain?", "Composed steps: prompt, model, parser."),
+    ("langchain", 2, "How does conversation memory work and what are its limits?", "Buffer vs summary memory; context growth, cost."),
+    ("langchain", 3, "How would you build a retrieval pipeline with LangChain and evaluate it?",
+     "Loaders, splitters, embeddings, vector store, retriever, eval of recall and answers."),
+]
+
+
+def _content_hash(skill, question):
+    return hashlib.sha256(f"{skill}\n{question.strip().lower()}".encode("utf-8")).hexdigest()
+
+
+# --- 1. STORE ---
+
+def add_questions(rows, source="manual"):
+    """
+    Adds (skill, difficulty, question, rubric) rows; duplicates are ignored.
+    Returns the number of new questions.
+    """
+    records = []
+    for skill, difficulty, question, rubric in rows:
+        skill = canonical_skill(skill)
+        records.append((
+            skill, max(1, min(3, int(difficulty))), question, rubric, source, _content_hash(skill, question),
+            hashed_vector(tokenize(question + " " + (rubric or ""))).tobytes(), datetime.now()
+        ))
+    conn = get_db_connection()
+    before = conn.total_changes
+    conn.executemany("""
+        INSERT OR IGNORE INTO question_bank (skill, difficulty, question, rubric, source, content_hash, vec, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, records)
+    added = conn.total_changes - before
+    conn.commit()
+    conn.close()
+    return added
+
+
+def seed_questions():
+    added = add_questions(SEED_QUESTIONS, source="seed")
+    print(f"📚 Question bank seeded: {added} new questions")
+    return added
+
+
+def add_job_questions(requirements, questions):
+    """
+    Files generated questions (e.g. a job's cached first questions) under the
+    first job skill they mention; question i gets difficulty i + 1.
+    """
+    matcher = compile_requirements(requirements or "")
+    rows = []
+    for i, question in enumerate(questions):
+        found = matcher.scan(tokenize(question))
+        skill = next((s for s in matcher.must_have + matcher.nice_to_have if s in found), None)
+        if skill:
+            rows.append((skill, i + 1, question, ""))
+    return add_questions(rows, source="generated") if rows else 0
+
+
+def import_questions(path):
+    with open(path, "r") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    added = add_questions(
+        [(r['skill'], r.get('difficulty', 2), r['question'], r.get('rubric', "")) for r in rows], source="import"
+    )
+    print(f"📚 Imported {added} new questions from {path}")
+    return added
+
+
+class _BankCache:
+    """In-memory copy of the bank, refreshed incrementally by id."""
+
+    def __init__(self):
+        self.by_skill = {}
+        self.last_id = 0
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        with self.lock:
+            conn = get_db_connection()
+            rows = conn.execute(
+                "SELECT id, skill, difficulty, question, rubric, vec FROM question_bank WHERE id > ? ORDER BY id",
+                (self.last_id,)
+            ).fetchall()
+            conn.close()
+            for row in rows:
+                entry = dict(row)
+                entry['vec'] = array.array("f", row['vec'])
+                entry['key'] = row['question'].strip().lower()[:60]
+                self.by_skill.setdefault(row['skill'], []).append(entry)
+                self.last_id = row['id']
+            return self.by_skill
+
+
+_cache = _BankCache()
+
+
+# --- 2. RETRIEVAL ---
+
+def job_skills(requirements):
+    must, nice = parse_requirements(requirements)
+    skills = []
+    for skill in must + nice:
+        skills += [skill] + TAXONOMY.get(skill, [])
+    return list(dict.fromkeys(skills))
+
+
+def next_difficulty(history):
+    """
+    1 for the first technical question, +1 every two answers, held back while
+    the candidate's last answer is very short.
+    """
+    answers = [m['content'] for m in history if m['role'] == 'user']
+    difficulty = min(3, 1 + max(0, len(answers) - 1) // 2)
+    if answers and len(tokenize(answers[-1])) < SHORT_ANSWER_TOKENS:
+        difficulty = max(1, difficulty - 1)
+    return difficulty
+
+
+def retrieve_questions(requirements, history=(), k=3):
+    """
+    Returns up to k unused bank questions for the job's skills:
+    [dict(skill, difficulty, question, rubric)]. Questions the interviewer
+    has already asked (found in its messages) are skipped; skills not yet
+    covered come first, then closeness to the target difficulty, then
+    similarity to the candidate's last answer.
+    """
+    start = time.perf_counter()
+    bank = _cache.refresh()
+    if not bank:
+        seed_questions()
+        bank = _cache.refresh()
+    skills = [s for s in job_skills(requirements) if s in bank]
+    if not skills:
+        return []
+
+    asked_text = " ".join(m['content'] for m in history if m['role'] == 'assistant').lower()
+    answers = [m['content'] for m in history if m['role'] == 'user']
+    answer_vec = hashed_vector(tokenize(answers[-1])) if answers else None
+    target = next_difficulty(history)
+
+    scored = []
+    for skill in skills:
+        entries = bank[skill]
+        covered = any(e['key'] in asked_text for e in entries)
+        for e in entries:
+            if e['key'] in asked_text:
+                continue
+            similarity = sum(x * y for x, y in zip(answer_vec, e['vec'])) if answer_vec else 0.0
+            scored.append(((0 if covered else 1), -abs(e['difficulty'] - target), similarity, e))
+
+    scored.sort(key=lambda t: t[:3], reverse=True)
+    results = [
+        {"skill": e['skill'], "difficulty": e['difficulty'], "question": e['question'], "rubric": e['rubric']}
+        for *_, e in scored[:k]
+    ]
+    print(f"📚 Retrieved {len(results)} questions in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS interview question bank")
+    parser.add_argument("--seed", action="store_true", help="Add the built-in seed questions")
+    parser.add_argument("--import", dest="import_path", metavar="JSONL", help="Import questions from a JSONL file")
+    parser.add_argument("--query", metavar="REQUIREMENTS", help="Retrieve questions for a requirements string")
+    parser.add_argument("--answer", default="", help="Candidate answer to adapt to")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_questions()
+    if args.import_path:
+        import_questions(args.import_path)
+    if args.query:
+        history = [{"role": "user", "content": args.answer}] if args.answer else []
+        for q in retrieve_questions(args.query, history):
+            print(f"[{q['skill']} / L{q['difficulty']}] {q['question']}")
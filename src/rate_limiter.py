@@ -0,0 +1,363 @@
+import os
+import sys
+import time
+import random
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Configuration (requests per minute for the whole OpenAI account)
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+INTERACTIVE_SHARE = float(os.getenv("OPENAI_INTERACTIVE_SHARE", "0.3"))  # Reserved for candidate-facing calls
+SHARED_ACROSS_PROCESSES = os.getenv("HIRE_OS_SHARED_RATE_LIMIT", "0") == "1"
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5     # Seconds
+BACKOFF_CAP = 30.0     # Seconds
+BREAKER_THRESHOLD = 5  # Consecutive failures before the circuit opens
+BREAKER_COOLDOWN = 30  # Seconds the circuit stays open
+
+TRAFFIC_CLASSES = ("interactive", "batch")
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling OpenAI while the circuit breaker is open."""
+
+
+def is_circuit_open(error):
+    """
+    True if `error` is a CircuitOpenError or was raised from one (the OpenAI
+    SDK wraps transport errors in APIConnectionError).
+    """
+    while error is not None:
+        if isinstance(error, CircuitOpenError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+# --- 1. TOKEN BUCKETS ---
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. The refill rate adapts: it is halved on every 429
+    and creeps back towards the configured rate on each success (AIMD).
+    """
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.base_rate = rate_per_minute / 60.0
+        self.rate = self.base_rate
+        self.capacity = burst or max(1.0, self.base_rate * 5)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Takes a token if possible; otherwise returns the seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def penalize(self, pause_seconds, slow_down=True):
+        with self.lock:
+            if slow_down:
+                self.rate = max(self.base_rate / 16, self.rate / 2)
+                self.tokens = 0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause_seconds)
+
+    def reward(self):
+        with self.lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+    def set_rate_per_minute(self, rate_per_minute):
+        with self.lock:
+            self.base_rate = rate_per_minute / 60.0
+            self.rate = min(self.rate, self.base_rate)
+
+
+class SqliteTokenBucket(TokenBucket):
+    """
+    Same bucket, but its state lives in the `rate_limits` table so every
+    Streamlit server and worker process draws from one shared budget.
+    """
+
+    def __init__(self, name, rate_per_minute, burst=None):
+        super().__init__(rate_per_minute, burst)
+        self.name = name
+        from src.database_manager import get_db_connection
+        self._connect = get_db_connection
+        conn = self._connect()
+        conn.execute("""
+            INSERT OR IGNORE INTO rate_limits (name, tokens, rate, updated, blocked_until)
+            VALUES (?, ?, ?, ?, 0)
+        """, (name, self.capacity, self.rate, time.time()))
+        conn.commit()
+        conn.close()
+
+    def _update(self, fn):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, rate, updated, blocked_until FROM rate_limits WHERE name=?", (self.name,)
+            ).fetchone()
+            tokens, rate, updated, blocked_until, result = fn(
+                row['tokens'], row['rate'], row['updated'], row['blocked_until'], time.time()
+            )
+            conn.execute(
+                "UPDATE rate_limits SET tokens=?, rate=?, updated=?, blocked_until=? WHERE name=?",
+                (tokens, rate, updated, blocked_until, self.name)
+            )
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    def _reserve(self):
+        def take(tokens, rate, updated, blocked_until, now):
+            if now < blocked_until:
+                return tokens, rate, updated, blocked_until, blocked_until - now
+            tokens = min(self.capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                return tokens - 1, rate, now, blocked_until, 0.0
+            return tokens, rate, now, blocked_until, (1 - tokens) / rate
+        return self._update(take)
+
+    def penalize(self, pause_seconds, slow_down=True):
+        def pause(tokens, rate, updated, blocked_until, now):
+            if slow_down:
+                tokens, rate = 0, max(self.base_rate / 16, rate / 2)
+            return tokens, rate, now, max(blocked_until, now + pause_seconds), None
+        self._update(pause)
+
+    def reward(self):
+        def speed_up(tokens, rate, updated, blocked_until, now):
+            return tokens, min(self.base_rate, rate + self.base_rate / 20), updated, blocked_until, None
+        self._update(speed_up)
+
+    def set_rate_per_minute(self, rate_per_minute):
+        self.base_rate = rate_per_minute / 60.0
+
+        def cap(tokens, rate, updated, blocked_until, now):
+            return tokens, min(rate, self.base_rate), updated, blocked_until, None
+        self._update(cap)
+
+
+# --- 2. CIRCUIT BREAKER ---
+
+class CircuitBreaker:
+    """
+    Opens after BREAKER_THRESHOLD consecutive failures (5xx or connection
+    errors) and rejects calls for BREAKER_COOLDOWN seconds, then lets a single
+    probe through (half-open). 429s are not failures: the token buckets back
+    off for those.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def record_throttled(self):
+        """A 429: the service is up, so neither count it nor close the circuit; a probe may try again."""
+        with self.lock:
+            self.probing = False
+
+
+# --- 3. LIMITER ---
+
+def _parse_duration(value):
+    """
+    Parses OpenAI reset headers such as "1s", "6m0s", "20ms" (or plain seconds).
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, number = 0.0, ""
+    i = 0
+    while i < len(value):
+        ch = value[i]
+        if ch.isdigit() or ch == ".":
+            number += ch
+        elif value.startswith("ms", i):
+            total += float(number or 0) / 1000
+            number = ""
+            i += 1
+        elif ch in "hms":
+            total += float(number or 0) * {"h": 3600, "m": 60, "s": 1}[ch]
+            number = ""
+        i += 1
+    return total
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than the server's retry-after."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    return max(delay, retry_after or 0)
+
+
+class OpenAILimiter:
+    """
+    Process-wide gate in front of every OpenAI HTTP request.
+    Interactive (candidate-facing) and batch traffic have separate buckets and
+    breakers, so a 429 storm during a big screening run slows batch work first
+    and a batch run hitting 5xx does not lock candidates out of the interview.
+    """
+
+    def __init__(self, rpm=OPENAI_RPM, interactive_share=INTERACTIVE_SHARE, shared=SHARED_ACROSS_PROCESSES):
+        self.rpm = rpm
+        self.shares = {"interactive": interactive_share, "batch": 1 - interactive_share}
+        if shared:
+            self.buckets = {t: SqliteTokenBucket(f"openai_{t}", rpm * self.shares[t]) for t in TRAFFIC_CLASSES}
+        else:
+            self.buckets = {t: TokenBucket(rpm * self.shares[t]) for t in TRAFFIC_CLASSES}
+        self.breakers = {t: CircuitBreaker() for t in TRAFFIC_CLASSES}
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "rejected": 0}
+
+    def observe_headers(self, headers):
+        """
+        Adapts the buckets to OpenAI's x-ratelimit-* response headers.
+        """
+        limit = headers.get("x-ratelimit-limit-requests")
+        if limit:
+            try:
+                limit = float(limit)
+            except ValueError:
+                limit = None
+            if limit and abs(limit - self.rpm) > 1:
+                self.rpm = limit
+                for traffic, bucket in self.buckets.items():
+                    bucket.set_rate_per_minute(limit * self.shares[traffic])
+
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is not None and remaining.strip() == "0":
+            reset = _parse_duration(headers.get("x-ratelimit-reset-requests")) or 1.0
+            for bucket in self.buckets.values():
+                bucket.penalize(reset, slow_down=False)
+
+    def on_throttled(self, retry_after):
+        # The account is shared: everyone pauses, but only batch traffic backs
+        # off its rate, so candidate-facing calls recover first
+        self.stats["throttled"] += 1
+        self.buckets["interactive"].penalize(retry_after, slow_down=False)
+        self.buckets["batch"].penalize(retry_after * 2)
+
+    def call(self, send, traffic="batch", max_retries=MAX_RETRIES):
+        """
+        Runs send() -> (status_code, headers, response) under the limiter, with
+        jittered retries on 429/5xx/connection errors. Returns the last response.
+        """
+        if traffic not in self.buckets:
+            traffic = "batch"
+        bucket, breaker = self.buckets[traffic], self.breakers[traffic]
+        for attempt in range(max_retries + 1):
+            if not breaker.allow():
+                self.stats["rejected"] += 1
+                raise CircuitOpenError("OpenAI circuit breaker is open; try again shortly.")
+
+            bucket.acquire()
+            self.stats["requests"] += 1
+            last_attempt = attempt == max_retries
+            try:
+                status, headers, response = send()
+            except CircuitOpenError:
+                raise
+            except Exception:
+                breaker.record_failure()
+                if last_attempt:
+                    raise
+                self.stats["retries"] += 1
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            headers = {k.lower(): v for k, v in headers.items()}
+            self.observe_headers(headers)
+
+            if status not in RETRYABLE_STATUS:
+                breaker.record_success()
+                bucket.reward()
+                return response
+
+            retry_after = _parse_duration(headers.get("retry-after"))
+            if status == 429:
+                breaker.record_throttled()
+                self.on_throttled(retry_after or backoff_delay(attempt))
+            else:
+                breaker.record_failure()
+            if last_attempt:
+                return response
+
+            self.stats["retries"] += 1
+            if hasattr(response, "close"):
+                response.close()
+            time.sleep(backoff_delay(attempt, retry_after))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Returns the process-wide limiter (created on first use)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = OpenAILimiter()
+        return _limiter
@@ -0,0 +1,249 @@
+"""
+Deterministic requirement matching (no LLM, no network).
+
+A job's `requirements` text is parsed into must-have and nice-to-have skills:
+
+    Python, CrewAI, AWS
+    3+ years of Python experience. We need someone who knows AWS.
+    Nice to have: Kafka, Docker (optional), [Terraform]
+
+Only recognised skills (KNOWN_SKILLS and their synonyms) found inside an item
+count; the rest of the wording ("3+ years of", "strong communication") is
+ignored. Items after a "nice to have / preferred / bonus / optional:" label,
+marked "(optional)" or wrapped in [brackets] are nice-to-have; everything else
+is a must-have. Each skill is expanded with its synonyms (k8s -> kubernetes)
+and, for umbrella terms, its taxonomy children ("cloud" is met by aws/gcp/azure).
+
+The pre-score ranks candidates. Rejecting on missing must-haves without an
+LLM call is opt-in per job (decision policy `hard_reject`).
+
+All patterns are compiled into one Aho-Corasick automaton over resume tokens,
+so a resume is scanned once regardless of how many skills a job lists.
+"""
+import os
+import sys
+import json
+import re
+from collections import deque
+from functools import lru_cache
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from src.resume_corpus import tokenize
+
+# Configuration
+MUST_HAVE_COVERAGE = float(os.getenv("HIRE_OS_MUST_HAVE_COVERAGE", "0.5"))  # Below this share of must-haves: hard reject (if the job opts in)
+MUST_HAVE_WEIGHT = 0.8  # Pre-score = 100 * (0.8 * must-have coverage + 0.2 * nice-to-have coverage)
+
+SYNONYMS = {
+    "python": ["python3", "python 3"],
+    "javascript": ["js", "ecmascript", "es6"],
+    "node.js": ["nodejs", "node js"],
+    "react": ["react.js", "reactjs"],
+    "kubernetes": ["k8s"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "postgresql": ["postgres", "psql"],
+    "mongodb": ["mongo"],
+    "machine learning": [],
+    "deep learning": [],
+    "natural language processing": ["nlp"],
+    "large language models": ["llm", "llms", "large language model"],
+    "ci/cd": ["ci cd", "continuous integration", "continuous delivery"],
+    "golang": ["go lang"],
+    "c++": ["cpp"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "tensorflow": [],
+    "rest api": ["restful", "rest apis", "restful api"],
+    "crewai": ["crew ai"],
+    "langchain": ["lang chain"],
+}
+
+# Umbrella requirement -> skills that satisfy it
+TAXONOMY = {
+    "cloud": ["aws", "gcp", "azure"],
+    "sql": ["postgresql", "mysql", "sqlite", "sql server", "oracle"],
+    "nosql": ["mongodb", "redis", "cassandra", "dynamodb"],
+    "containers": ["docker", "kubernetes"],
+    "frontend": ["react", "angular", "vue", "javascript", "typescript"],
+    "agent frameworks": ["crewai", "langchain", "autogen", "llamaindex"],
+}
+
+# Skills that are not a SYNONYMS / TAXONOMY entry. Deliberately no one-letter or
+# common-word names or aliases ("c", "r", "go", "rest", "excel", "spring", "node"):
+# they match ordinary prose.
+EXTRA_SKILLS = """
+java c# ruby php scala kotlin swift rust matlab html css sass django flask fastapi rails
+angular vue next.js docker terraform ansible jenkins git linux bash kafka spark hadoop airflow dbt snowflake
+redis elasticsearch graphql grpc pandas numpy pytorch keras opencv tableau figma jira
+mysql sqlite oracle dynamodb cassandra microservices agile scrum typescript
+""".split() + ["power bi", "sql server", "spring boot", "express.js", "ms excel", "microsoft excel"]
+KNOWN_SKILLS = list(dict.fromkeys(
+    list(SYNONYMS) + list(TAXONOMY) + [s for children in TAXONOMY.values() for s in children] + EXTRA_SKILLS
+))
+
+NICE_LABEL_RE = re.compile(r"^\s*(nice to have|nice-to-have|preferred|bonus|optional|plus)\s*:\s*", re.I)
+MUST_LABEL_RE = re.compile(r"^\s*(must have|must-have|required|requirements)\s*:\s*", re.I)
+NICE_SUFFIX_RE = re.compile(r"\((optional|nice to have|bonus|preferred|plus)\)\s*$", re.I)
+SPLIT_RE = re.compile(r"[,;\n•|]+")
+
+
+# --- 1. PARSING ---
+
+def parse_requirements(requirements):
+    """
+    Returns (must_have, nice_to_have): ordered lists of canonical skill names.
+    """
+    must, nice = [], []
+    nice_section = False
+    for line in (requirements or "").splitlines():
+        if MUST_LABEL_RE.match(line):
+            nice_section = False
+            line = MUST_LABEL_RE.sub("", line)
+        elif NICE_LABEL_RE.match(line):
+            nice_section = True
+            line = NICE_LABEL_RE.sub("", line)
+
+        for item in SPLIT_RE.split(line):
+            item = item.strip(" .-*")
+            is_nice = nice_section
+            if NICE_SUFFIX_RE.search(item):
+                item, is_nice = NICE_SUFFIX_RE.sub("", item).strip(), True
+            if item.startswith("[") and item.endswith("]"):
+                item, is_nice = item[1:-1].strip(), True
+            for skill in skills_in(item):
+                if skill not in must and skill not in nice:
+                    (nice if is_nice else must).append(skill)
+    return must, nice
+
+
+_vocabulary = None
+
+
+def skills_in(text):
+    """Recognised skills mentioned in a piece of text, in order of appearance."""
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = RequirementMatcher(KNOWN_SKILLS, [], expand_taxonomy=False)
+    return list(_vocabulary.scan(tokenize(text)))
+
+
+_ALIASES = {" ".join(tokenize(alias)): canonical for canonical, aliases in SYNONYMS.items() for alias in aliases}
+
+
+def canonical_skill(text):
+    key = " ".join(tokenize(text))
+    return _ALIASES.get(key, key)
+
+
+def skill_patterns(skill, expand_taxonomy=True):
+    """All token sequences that count as evidence for a skill."""
+    names = [skill] + SYNONYMS.get(skill, [])
+    for child in (TAXONOMY.get(skill, []) if expand_taxonomy else []):
+        names += [child] + SYNONYMS.get(child, [])
+    return {tuple(tokenize(name)) for name in names if tokenize(name)}
+
+
+# --- 2. AUTOMATON ---
+
+class RequirementMatcher:
+    """
+    Aho-Corasick automaton whose alphabet is resume tokens. States are dicts
+    (token -> next state); each state lists the skills whose pattern ends there.
+    """
+
+    def __init__(self, must_have, nice_to_have, expand_taxonomy=True):
+        self.must_have = list(must_have)
+        self.nice_to_have = list(nice_to_have)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for skill in self.must_have + self.nice_to_have:
+            for pattern in skill_patterns(skill, expand_taxonomy):
+                state = 0
+                for token in pattern:
+                    nxt = self.goto[state].get(token)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto[state][token] = nxt
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.out.append([])
+                    state = nxt
+                self.out[state].append((skill, " ".join(pattern)))
+
+        # Breadth-first failure links (children of the root fail to the root)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(token, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, tokens):
+        """
+        Single pass over a token list. Returns {skill: [first matched alias, hits]}.
+        """
+        goto, fail, out = self.goto, self.fail, self.out
+        found = {}
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for skill, alias in out[state]:
+                if skill in found:
+                    found[skill][1] += 1
+                else:
+                    found[skill] = [alias, 1]
+        return found
+
+    def match(self, resume_text):
+        """
+        Returns dict(score, rejected, must_have, nice_to_have, missing, evidence).
+        `rejected` only says coverage is below MUST_HAVE_COVERAGE; whether that
+        rejects the candidate is the job's decision policy (hard_reject).
+        Without any recognised skill the score is None (nothing to rank on).
+        """
+        found = self.scan(tokenize(resume_text))
+        must_hits = [s for s in self.must_have if s in found]
+        nice_hits = [s for s in self.nice_to_have if s in found]
+        must_cov = len(must_hits) / len(self.must_have) if self.must_have else 1.0
+        nice_cov = len(nice_hits) / len(self.nice_to_have) if self.nice_to_have else 1.0
+        score = None
+        if self.must_have or self.nice_to_have:
+            score = round(100 * (MUST_HAVE_WEIGHT * must_cov + (1 - MUST_HAVE_WEIGHT) * nice_cov))
+        return {
+            "score": score,
+            "rejected": bool(self.must_have) and must_cov < MUST_HAVE_COVERAGE,
+            "must_have": must_hits,
+            "nice_to_have": nice_hits,
+            "missing": [s for s in self.must_have if s not in found],
+            "evidence": {skill: {"alias": alias, "hits": hits} for skill, (alias, hits) in found.items()},
+        }
+
+
+@lru_cache(maxsize=64)
+def compile_requirements(requirements):
+    """Matcher for a job's requirements text (compiled once per process)."""
+    return RequirementMatcher(*parse_requirements(requirements))
+
+
+# --- 3. PERSISTENCE ---
+
+def save_match(candidate_id, result):
+    """Stores the pre-score and the match evidence on the candidate row."""
+    conn = get_db_connection()
+    conn.execute(
+        "UPDATE candidates SET match_score=?, match_evidence=? WHERE id=?",
+        (result['score'], json.dumps(result), candidate_id)
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,611 @@
+"""
+Compact, pre-tokenized store of every unique resume.
+
+Each resume PDF is extracted once, normalized, tokenized and appended to a set
+of flat, memory-mapped files under data/corpus/:
+
+    texts.bin     normalized UTF-8 text of all documents, back to back
+    docs.bin      6 x int64 per document: text offset/length, token offset/count,
+                  section offset/count
+    tokens.bin    int32 token ids (sorted, unique per document)
+    tf.bin        uint16 term frequency for each entry of tokens.bin
+    sections.bin  2 x int32 per section: section code, start offset in the text
+    vocab.txt     one token per line; the line number is the token id
+
+Documents are deduplicated by the SHA-256 of the file, and the mapping from
+candidates to documents lives in the `resume_docs` / `candidate_resume_docs`
+tables. Ranking a job against the whole pool only touches the posting lists
+of the job's tokens, so it needs neither the PDFs nor the LLM.
+
+    python -m src.resume_corpus --sync          # ingest all candidates' resumes
+    python -m src.resume_corpus --rank "Python, AWS, Docker"
+"""
+import os
+import re
+import sys
+import math
+import mmap
+import array
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer assumption
+    fcntl = None
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from src.data_versions import cached, bump_version, ALL_JOBS
+from services import storage_service as storage
+
+CORPUS_DIR = "data/corpus"
+DOC_FIELDS = 6  # text_off, text_len, tok_off, tok_len, sec_off, sec_len
+
+TOKEN_RE = re.compile(r"[^\W_][\w+#]*(?:\.[^\W_]+)*")
+STOPWORDS = frozenset("""
+a an and are as at be been by for from has have in into is it its of on or our that the their this to was were
+will with we you your i my me he she they them his her not but if so than then there these those which who whom
+""".split())
+
+# Section headers recognised in resumes (code is stored in sections.bin)
+SECTIONS = ["header", "summary", "experience", "education", "skills", "projects", "certifications", "other"]
+SECTION_HEADERS = {
+    "summary": "summary", "profile": "summary", "objective": "summary", "about me": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment": "experience", "employment history": "experience", "work history": "experience",
+    "education": "education", "academics": "education", "qualifications": "education",
+    "skills": "skills", "technical skills": "skills", "core skills": "skills", "technologies": "skills",
+    "projects": "projects", "personal projects": "projects", "key projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "awards": "other",
+    "achievements": "other", "publications": "other", "interests": "other", "languages": "other",
+}
+
+BM25_K1 = 1.2
+
+
+# --- 1. TEXT PROCESSING ---
+
+def extract_pdf_text(file_path, max_pages=None):
+    """
+    Extracts the raw text of a PDF (pypdf is only imported when needed).
+    Runs inside the sandboxed workers of src/pdf_extraction.py; use
+    extract_resume() from there instead of calling this in-process.
+    """
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    n_pages = len(reader.pages) if max_pages is None else min(len(reader.pages), max_pages)
+    return "\n".join(reader.pages[i].extract_text() or "" for i in range(n_pages))
+
+
+def normalize_text(text):
+    """
+    Collapses whitespace inside lines and drops empty lines.
+    """
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def tokenize(text):
+    """
+    Lowercased skill/word tokens. Keeps tech spellings like c++, c#, node.js.
+    """
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def find_sections(text):
+    """
+    Returns [(section_name, start_offset)] for a normalized resume text.
+    Offsets are character offsets into the text.
+    """
+    sections = [("header", 0)]
+    offset = 0
+    for line in text.split("\n"):
+        key = line.strip().strip(":").lower()
+        if len(key) <= 30 and key in SECTION_HEADERS:
+            sections.append((SECTION_HEADERS[key], offset))
+        offset += len(line) + 1
+    return sections
+
+
+def hash_file(file_path):
+    """SHA-256 of a resume (store refs carry it in their key, no read needed)."""
+    stored = storage.content_hash(file_path)
+    if stored:
+        return stored
+    digest = hashlib.sha256()
+    with storage.open_file(file_path) as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- 2. CORPUS STORE ---
+
+class ResumeCorpus:
+    """
+    Memory-mapped reader/appender for the corpus files. Use get_corpus() to
+    share one instance (and its posting lists) per process.
+    """
+
+    def __init__(self, root=CORPUS_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.lock = threading.RLock()
+        self._maps = {}
+        self.vocab = []
+        self.token_ids = {}
+        self.postings = {}       # token id -> (array of doc ids, array of tfs)
+        self.doc_lengths = array.array("i")
+        self.indexed_docs = 0
+        self.refresh()
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _map(self, name, typecode):
+        """Maps a file read-only and returns a typed memoryview (empty if no data)."""
+        path = self._path(name)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return memoryview(array.array(typecode))
+        with open(path, "rb") as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[name] = m
+        view = memoryview(m)
+        if typecode == "B":
+            return view
+        itemsize = array.array(typecode).itemsize
+        return view[:len(view) - len(view) % itemsize].cast(typecode)  # Ignores a half-written tail
+
+    def refresh(self):
+        """
+        Re-maps the files if another process appended documents.
+        """
+        with self.lock:
+            docs_size = os.path.getsize(self._path("docs.bin")) if os.path.exists(self._path("docs.bin")) else 0
+            if docs_size // (8 * DOC_FIELDS) == getattr(self, "doc_count", -1):
+                return
+            self._release()
+            self.docs = self._map("docs.bin", "q")
+            self.text = self._map("texts.bin", "B")
+            self.tokens = self._map("tokens.bin", "i")
+            self.tfs = self._map("tf.bin", "H")
+            self.sections = self._map("sections.bin", "i")
+            self.doc_count = len(self.docs) // DOC_FIELDS
+            self._load_vocab()
+            self._index_new_docs()
+
+    def _release(self):
+        for name in ("docs", "text", "tokens", "tfs", "sections"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        for m in self._maps.values():
+            m.close()
+        self._maps = {}
+
+    def _load_vocab(self):
+        path = self._path("vocab.txt")
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            words = f.read().split("\n")[:-1]
+        for word in words[len(self.vocab):]:
+            self.token_ids[word] = len(self.vocab)
+            self.vocab.append(word)
+
+    def _index_new_docs(self):
+        """Extends the in-memory posting lists with documents not indexed yet."""
+        for doc_id in range(self.indexed_docs, self.doc_count):
+            base = doc_id * DOC_FIELDS
+            tok_off, tok_len = self.docs[base + 2], self.docs[base + 3]
+            length = 0
+            for i in range(tok_off, tok_off + tok_len):
+                token_id, tf = self.tokens[i], self.tfs[i]
+                entry = self.postings.get(token_id)
+                if entry is None:
+                    entry = self.postings[token_id] = (array.array("i"), array.array("H"))
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+                length += tf
+            self.doc_lengths.append(length)
+        self.indexed_docs = self.doc_count
+
+    # --- reads ---
+
+    # Reads hold the lock: refresh() in another thread releases the views they slice
+
+    def _ensure_mapped(self, doc_id):
+        """Re-maps if doc_id was appended by another process since the last refresh (lock held)."""
+        if doc_id >= self.doc_count:
+            self.refresh()
+
+    def get_text(self, doc_id):
+        base = doc_id * DOC_FIELDS
+        with self.lock:
+            self._ensure_mapped(doc_id)
+            off, length = self.docs[base], self.docs[base + 1]
+            return bytes(self.text[off:off + length]).decode("utf-8")
+
+    def get_tokens(self, doc_id):
+        """Returns {token: tf} for a document."""
+        base = doc_id * DOC_FIELDS
+        with self.lock:
+            self._ensure_mapped(doc_id)
+            off, n = self.docs[base + 2], self.docs[base + 3]
+            return {self.vocab[self.tokens[i]]: self.tfs[i] for i in range(off, off + n)}
+
+    def get_sections(self, doc_id):
+        """Returns {section_name: text} for a document."""
+        base = doc_id * DOC_FIELDS
+        with self.lock:
+            self._ensure_mapped(doc_id)
+            text_off, text_len = self.docs[base], self.docs[base + 1]
+            off, n = self.docs[base + 4], self.docs[base + 5]
+            raw = bytes(self.text[text_off:text_off + text_len])
+            starts = [(SECTIONS[self.sections[2 * i]], self.sections[2 * i + 1]) for i in range(off, off + n)]
+        result = {}
+        for idx, (name, start) in enumerate(starts):
+            end = starts[idx + 1][1] if idx + 1 < len(starts) else len(raw)
+            chunk = raw[start:end].decode("utf-8").strip()
+            if chunk:
+                result[name] = (result[name] + "\n" + chunk) if name in result else chunk
+        return result
+
+    def rank(self, query, top_k=20, doc_ids=None):
+        """
+        BM25-style ranking of documents against free text (e.g. a job's
+        requirements). Returns [(doc_id, score)] best first.
+        """
+        self.refresh()
+        allowed = set(doc_ids) if doc_ids is not None else None
+        scores = {}
+        with self.lock:  # Posting lists grow while another thread appends
+            if self.doc_count == 0:
+                return []
+            avg_len = (sum(self.doc_lengths) / self.doc_count) or 1.0
+            for token in set(tokenize(query)):
+                token_id = self.token_ids.get(token)
+                if token_id is None:
+                    continue
+                # A word can be in vocab.txt before any document using it is indexed here
+                docs, tfs = self.postings.get(token_id, ((), ()))
+                idf = math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in zip(docs, tfs):
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    norm = BM25_K1 * (0.25 + 0.75 * self.doc_lengths[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        return best[:top_k]
+
+    # --- writes ---
+
+    def append(self, text):
+        """
+        Appends one normalized document and returns its doc id.
+        Safe across processes (exclusive file lock while writing).
+        """
+        return self.append_many([text])[0]
+
+    def append_many(self, texts):
+        """
+        Appends several documents with one lock and one fsync per file (bulk
+        import). Returns their doc ids in order. The data files are synced
+        before the docs.bin records that point into them; whatever a crashed
+        append left after the last record is cut back first.
+        """
+        prepared = []
+        for text in texts:
+            text = normalize_text(text)
+            counts = {}
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+            prepared.append((text, counts, find_sections(text)))
+
+        with self.lock, open(self._path("corpus.lock"), "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._truncate_partial_writes()
+            self.refresh()
+
+            new_words = list(dict.fromkeys(w for _, counts, _ in prepared for w in counts if w not in self.token_ids))
+            if new_words:
+                with open(self._path("vocab.txt"), "a", encoding="utf-8") as f:
+                    f.write("".join(w + "\n" for w in new_words))
+                self._load_vocab()
+
+            sizes = {name: self._size(name) for name in ("texts.bin", "tokens.bin", "sections.bin")}
+            texts_out, token_ids, tfs = bytearray(), array.array("i"), array.array("H")
+            section_rows, records = array.array("i"), array.array("q")
+            for text, counts, sections in prepared:
+                entries = sorted((self.token_ids[w], min(c, 65535)) for w, c in counts.items())
+                encoded = text.encode("utf-8")
+                records.extend([
+                    sizes["texts.bin"] + len(texts_out), len(encoded),
+                    sizes["tokens.bin"] // 4 + len(token_ids), len(entries),
+                    sizes["sections.bin"] // 8 + len(section_rows) // 2, len(sections),
+                ])
+                texts_out += encoded
+                token_ids.extend(e[0] for e in entries)
+                tfs.extend(e[1] for e in entries)
+                # Offsets in the section table are byte offsets into the UTF-8 text
+                for name, start in sections:
+                    section_rows.extend([SECTIONS.index(name), len(text[:start].encode("utf-8"))])
+
+            for name, data in (("texts.bin", texts_out), ("tokens.bin", token_ids.tobytes()),
+                               ("tf.bin", tfs.tobytes()), ("sections.bin", section_rows.tobytes())):
+                with open(self._path(name), "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            # docs.bin is written last: a document only exists once its record does
+            with open(self._path("docs.bin"), "ab") as f:
+                f.write(records.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            last = os.path.getsize(self._path("docs.bin")) // (8 * DOC_FIELDS) - 1
+            self.refresh()
+            return list(range(last - len(prepared) + 1, last + 1))
+
+    def _truncate_partial_writes(self):
+        """
+        Cuts every file back to the end of the last complete docs.bin record
+        (file lock held). New offsets are taken from the file sizes, so an
+        append interrupted between two writes would otherwise shift, e.g.,
+        tf.bin against tokens.bin for every later document.
+        """
+        record_bytes = 8 * DOC_FIELDS
+        count = self._size("docs.bin") // record_bytes
+        ends = {"docs.bin": count * record_bytes, "texts.bin": 0, "tokens.bin": 0, "tf.bin": 0, "sections.bin": 0}
+        if count:
+            last = array.array("q")
+            with open(self._path("docs.bin"), "rb") as f:
+                f.seek((count - 1) * record_bytes)
+                last.frombytes(f.read(record_bytes))
+            text_off, text_len, tok_off, tok_len, sec_off, sec_len = last
+            ends.update({
+                "texts.bin": text_off + text_len,
+                "tokens.bin": 4 * (tok_off + tok_len),
+                "tf.bin": 2 * (tok_off + tok_len),
+                "sections.bin": 8 * (sec_off + sec_len),
+            })
+        # Words of an interrupted append are harmless, half a line is not
+        vocab_size = self._size("vocab.txt")
+        if vocab_size:
+            with open(self._path("vocab.txt"), "rb") as f:
+                f.seek(max(0, vocab_size - 4096))
+                tail = f.read()
+            cut = tail.rfind(b"\n")
+            if not tail.endswith(b"\n") and (cut >= 0 or len(tail) == vocab_size):
+                ends["vocab.txt"] = vocab_size - len(tail) + cut + 1
+
+        for name, end in ends.items():
+            size = self._size(name)
+            if size > end:
+                print(f"⚠️ Dropping {size - end} bytes left in {name} by an interrupted append")
+                os.truncate(self._path(name), end)
+
+    def _size(self, name):
+        path = self._path(name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    """Process-wide corpus instance (posting lists are built once per process)."""
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = ResumeCorpus()
+        return _corpus
+
+
+# --- 3. CANDIDATE MAPPING ---
+
+def add_resume(candidate_id, resume_path, text=None):
+    """
+    Adds a candidate's resume to the corpus (deduplicated by file hash) and
+    links the candidate to it. Returns the doc id.
+    `text` may be passed when the PDF was already extracted. Otherwise it is
+    extracted in the sandboxed pool (raises ExtractionError if quarantined).
+    """
+    content_hash = hash_file(resume_path)
+    conn = get_db_connection()
+    try:
+        known = "SELECT doc_id FROM resume_docs WHERE content_hash=?"
+        if text is None and conn.execute(known, (content_hash,)).fetchone() is None:
+            from src.pdf_extraction import extract_resume
+            text = extract_resume(resume_path, content_hash)  # No lock held while parsing
+
+        # Checked again under the write lock: another thread or process may
+        # have added the same file meanwhile, and a document is appended once
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(known, (content_hash,)).fetchone()
+        if row:
+            doc_id = row['doc_id']
+        else:
+            doc_id = get_corpus().append(text)
+            conn.execute(
+                "INSERT OR IGNORE INTO resume_docs (doc_id, content_hash, created_at) VALUES (?, ?, ?)",
+                (doc_id, content_hash, datetime.now())
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO candidate_resume_docs (candidate_id, doc_id) VALUES (?, ?)",
+            (candidate_id, doc_id)
+        )
+        bump_version(conn, ALL_JOBS)  # Invalidates the rank_candidates mapping
+        conn.commit()
+        return doc_id
+    finally:
+        conn.close()
+
+
+def add_resumes(rows):
+    """
+    Batch version of add_resume for already extracted files:
+    rows = [(candidate_id, content_hash, text)]. One corpus append and one
+    transaction for the whole batch. Returns {candidate_id: doc_id}.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")  # Lookup and append under one write lock (see add_resume)
+        hashes = list({content_hash for _, content_hash, _ in rows})
+        known = {}
+        for i in range(0, len(hashes), 500):
+            batch = hashes[i:i + 500]
+            known.update(
+                (r['content_hash'], r['doc_id']) for r in conn.execute(
+                    f"SELECT content_hash, doc_id FROM resume_docs WHERE content_hash IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+            )
+        new = {}
+        for _, content_hash, text in rows:
+            if content_hash not in known and content_hash not in new:
+                new[content_hash] = text
+        if new:
+            doc_ids = get_corpus().append_many(list(new.values()))
+            known.update(zip(new.keys(), doc_ids))
+            conn.executemany(
+                "INSERT OR IGNORE INTO resume_docs (doc_id, content_hash, created_at) VALUES (?, ?, ?)",
+                [(doc_id, content_hash, datetime.now()) for content_hash, doc_id in zip(new.keys(), doc_ids)]
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO candidate_resume_docs (candidate_id, doc_id) VALUES (?, ?)",
+            [(cand_id, known[content_hash]) for cand_id, content_hash, _ in rows]
+        )
+        bump_version(conn, ALL_JOBS)
+        conn.commit()
+        return {cand_id: known[content_hash] for cand_id, content_hash, _ in rows}
+    finally:
+        conn.close()
+
+
+def get_doc_id_by_hash(content_hash):
+    conn = get_db_connection()
+    row = conn.execute("SELECT doc_id FROM resume_docs WHERE content_hash=?", (content_hash,)).fetchone()
+    conn.close()
+    return row['doc_id'] if row else None
+
+
+def get_doc_id(candidate_id):
+    conn = get_db_connection()
+    row = conn.execute("SELECT doc_id FROM candidate_resume_docs WHERE candidate_id=?", (candidate_id,)).fetchone()
+    conn.close()
+    return row['doc_id'] if row else None
+
+
+def get_resume_text(candidate_id, resume_path=None):
+    """
+    Normalized resume text from the corpus; ingests the PDF on first use.
+    Returns None if there is no readable resume.
+    """
+    doc_id = get_doc_id(candidate_id)
+    if doc_id is None:
+        if not storage.exists(resume_path):
+            return None
+        doc_id = add_resume(candidate_id, resume_path)
+    return get_corpus().get_text(doc_id)
+
+
+def sync_corpus(verbose=True):
+    """
+    Ingests every candidate whose resume is not in the corpus yet.
+    Returns (added, skipped).
+    """
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT c.id, c.resume_path FROM candidates c
+        LEFT JOIN candidate_resume_docs d ON d.candidate_id = c.id
+        WHERE d.candidate_id IS NULL AND c.resume_path IS NOT NULL
+    """).fetchall()
+    conn.close()
+
+    added = skipped = 0
+    by_path = {}
+    for row in rows:
+        by_path.setdefault(row['resume_path'], []).append(row['id'])
+
+    # Identical files that are already in the corpus need no extraction
+    for path in list(by_path):
+        if storage.exists(path) and get_doc_id_by_hash(hash_file(path)) is not None:
+            for cand_id in by_path.pop(path):
+                add_resume(cand_id, path)
+                added += 1
+
+    # Extraction is pipelined across the sandboxed pool
+    from src.pdf_extraction import extract_many
+    for path, content_hash, text, error in extract_many(list(by_path)):
+        for cand_id in by_path[path]:
+            if error:
+                skipped += 1
+                if verbose:
+                    print(f"⚠️ Could not ingest {path}: {error}")
+                continue
+            add_resume(cand_id, path, text=text)
+            added += 1
+    if verbose:
+        print(f"📚 Corpus sync: {added} added, {skipped} skipped, {get_corpus().doc_count} unique resumes")
+    return added, skipped
+
+
+def _candidates_by_doc(job_id=None, exclude_job_id=None):
+    """
+    {doc_id: [candidate]} for rank_candidates, kept until a candidate or a
+    resume mapping changes (data version of all jobs).
+    """
+    def load():
+        conn = get_db_connection()
+        sql = """
+            SELECT d.doc_id, c.id AS candidate_id, c.name, c.email, c.job_id, c.status
+            FROM candidate_resume_docs d JOIN candidates c ON c.id = d.candidate_id
+        """
+        params = []
+        if job_id is not None:
+            sql += " WHERE c.job_id = ?"
+            params.append(job_id)
+        elif exclude_job_id is not None:
+            sql += " WHERE c.job_id != ?"
+            params.append(exclude_job_id)
+        by_doc = {}
+        for row in conn.execute(sql, params):
+            by_doc.setdefault(row['doc_id'], []).append(dict(row))
+        conn.close()
+        return by_doc
+    return cached(("corpus_candidates", job_id, exclude_job_id), load)
+
+
+def rank_candidates(query, top_k=20, job_id=None, exclude_job_id=None):
+    """
+    Ranks candidates (not documents) against free text. A resume shared by
+    several applications yields one row per candidate.
+    Returns [dict(candidate_id, name, email, job_id, status, doc_id, score)].
+    """
+    by_doc = _candidates_by_doc(job_id, exclude_job_id)
+    results = []
+    for doc_id, score in get_corpus().rank(query, top_k=top_k, doc_ids=by_doc.keys()):
+        for cand in by_doc[doc_id]:
+            results.append({**cand, "score": round(score, 3)})
+    return results[:top_k]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS resume corpus")
+    parser.add_argument("--sync", action="store_true", help="Ingest resumes of all candidates")
+    parser.add_argument("--rank", metavar="TEXT", help="Rank all past candidates against this text")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.sync:
+        sync_corpus()
+    if args.rank:
+        for r in rank_candidates(args.rank, top_k=args.top):
+            print(f"{r['score']:8.3f}  #{r['candidate_id']} {r['name']} <{r['email']}> job={r['job_id']} {r['status']}")
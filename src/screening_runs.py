@@ -0,0 +1,352 @@
+import os
+import sys
+import time
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+# Configuration
+LEASE_SECONDS = 300   # A worker that dies keeps its item for at most this long
+MAX_ATTEMPTS = 3      # After this many failed attempts an item is marked FAILED
+LEASE_BATCH = 5       # Items leased per write transaction
+EMAIL_SENDING_TIMEOUT = 600  # Seconds after which a send that never finished may be retried
+
+
+def worker_id():
+    """
+    Owner id for one screening/grading run: host and pid (useful when
+    debugging stuck runs) plus a random part, because Streamlit serves every
+    browser session from the same process and two admin tabs must not share
+    leases or claims.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# --- 1. RUNS ---
+
+def start_or_resume_run(job_id):
+    """
+    Returns the id of the RUNNING screening run for a job, creating one if needed.
+    Any APPLIED candidate not yet part of the run is added as a PENDING item.
+    Returns None when there is nothing to screen.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        run = conn.execute(
+            "SELECT id FROM screening_runs WHERE job_id=? AND status='RUNNING' ORDER BY id DESC LIMIT 1",
+            (job_id,)
+        ).fetchone()
+
+        if run:
+            run_id = run['id']
+        else:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM candidates WHERE job_id=? AND status='APPLIED'", (job_id,)
+            ).fetchone()[0]
+            if pending == 0:
+                conn.rollback()
+                return None
+            cur = conn.execute(
+                "INSERT INTO screening_runs (job_id, status, started_at) VALUES (?, 'RUNNING', ?)",
+                (job_id, datetime.now())
+            )
+            run_id = cur.lastrowid
+
+        conn.execute("""
+            INSERT OR IGNORE INTO screening_items (run_id, candidate_id)
+            SELECT ?, id FROM candidates WHERE job_id=? AND status='APPLIED'
+        """, (run_id, job_id))
+        conn.execute(
+            "UPDATE screening_runs SET total = (SELECT COUNT(*) FROM screening_items WHERE run_id=?) WHERE id=?",
+            (run_id, run_id)
+        )
+        conn.commit()
+        return run_id
+    finally:
+        conn.close()
+
+
+def finish_run_if_done(run_id):
+    """
+    Marks a run COMPLETED once no item is PENDING or LEASED. Returns True if finished.
+    """
+    conn = get_db_connection()
+    try:
+        open_items = conn.execute(
+            "SELECT COUNT(*) FROM screening_items WHERE run_id=? AND status IN ('PENDING', 'LEASED')",
+            (run_id,)
+        ).fetchone()[0]
+        if open_items:
+            return False
+        conn.execute(
+            "UPDATE screening_runs SET status='COMPLETED', finished_at=? WHERE id=? AND status='RUNNING'",
+            (datetime.now(), run_id)
+        )
+        conn.commit()
+        return True
+    finally:
+        conn.close()
+
+
+def get_run_progress(run_id):
+    """
+    Returns a dict with per-status item counts for a run.
+    """
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT status, COUNT(*) AS n FROM screening_items WHERE run_id=? GROUP BY status", (run_id,)
+    ).fetchall()
+    conn.close()
+    progress = {"PENDING": 0, "LEASED": 0, "DONE": 0, "FAILED": 0}
+    for row in rows:
+        progress[row['status']] = row['n']
+    return progress
+
+
+def get_run_log(run_id):
+    """
+    Returns the per-candidate result lines of a run (including items finished
+    before a crash/restart).
+    """
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT c.name, i.score, i.status, i.result, i.error
+        FROM screening_items i
+        JOIN candidates c ON c.id = i.candidate_id
+        WHERE i.run_id=?
+        ORDER BY i.id
+    """, (run_id,)).fetchall()
+    conn.close()
+
+    lines = []
+    for row in rows:
+        if row['status'] == 'DONE' and row['score'] is None:
+            lines.append(f"{row['name']}: {row['result']} ({row['error']})")
+        elif row['status'] == 'DONE':
+            lines.append(f"{row['name']}: {row['score']} ({row['result']})")
+        elif row['status'] == 'FAILED':
+            lines.append(f"{row['name']}: FAILED ({row['error']})")
+    return lines
+
+
+# --- 2. WORK ITEMS ---
+
+def get_unscored_resumes(run_id):
+    """
+    (candidate_id, resume_path) of the run's items that still need scoring,
+    in lease order (used to extract resumes ahead of the LLM stage).
+    """
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT c.id AS candidate_id, c.resume_path
+        FROM screening_items i
+        JOIN candidates c ON c.id = i.candidate_id
+        WHERE i.run_id=? AND i.score IS NULL AND i.status IN ('PENDING', 'LEASED')
+        ORDER BY i.id
+    """, (run_id,)).fetchall()
+    conn.close()
+    return rows
+
+
+def lease_items(run_id, owner, limit=LEASE_BATCH, lease_seconds=LEASE_SECONDS):
+    """
+    Atomically leases up to `limit` items of a run in one write transaction,
+    so parallel workers contend for the lock once per batch instead of once
+    per candidate. Items whose lease expired (the worker crashed) are picked
+    up again. Returns the items joined with their candidate rows (empty when
+    the run has no leasable work left).
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        ids = [row['id'] for row in conn.execute("""
+            SELECT id FROM screening_items
+            WHERE run_id=? AND attempts < ?
+              AND (status='PENDING' OR (status='LEASED' AND lease_expires < ?))
+            ORDER BY id LIMIT ?
+        """, (run_id, MAX_ATTEMPTS, now, limit))]
+
+        if not ids:
+            # Expired leases that ran out of attempts are given up on
+            conn.execute("""
+                UPDATE screening_items SET status='FAILED', error=COALESCE(error, 'Lease expired too often')
+                WHERE run_id=? AND status='LEASED' AND lease_expires < ? AND attempts >= ?
+            """, (run_id, now, MAX_ATTEMPTS))
+            conn.commit()
+            return []
+
+        placeholders = ','.join('?' * len(ids))
+        conn.execute(f"""
+            UPDATE screening_items
+            SET status='LEASED', lease_owner=?, lease_expires=?, attempts=attempts+1
+            WHERE id IN ({placeholders})
+        """, (owner, now + lease_seconds, *ids))
+        conn.commit()
+
+        return conn.execute(f"""
+            SELECT i.id AS item_id, i.score, i.summary, i.new_status, i.attempts,
+                   c.id AS candidate_id, c.name, c.email, c.resume_path
+            FROM screening_items i
+            JOIN candidates c ON c.id = i.candidate_id
+            WHERE i.id IN ({placeholders})
+            ORDER BY i.id
+        """, ids).fetchall()
+    finally:
+        conn.close()
+
+
+def renew_lease(item_id, owner, lease_seconds=LEASE_SECONDS):
+    """
+    Extends the lease on one item before it is worked on, so the last items of
+    a batch do not expire while the first ones are scored. Returns False if
+    the lease was lost (expired and taken by another worker): skip the item.
+    """
+    conn = get_db_connection()
+    cur = conn.execute(
+        "UPDATE screening_items SET lease_expires=? WHERE id=? AND lease_owner=? AND status='LEASED'",
+        (time.time() + lease_seconds, item_id, owner)
+    )
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
+
+
+def lease_next_item(run_id, owner, lease_seconds=LEASE_SECONDS):
+    """
+    Leases a single item (see lease_items). Returns None when the run has no
+    leasable work left.
+    """
+    items = lease_items(run_id, owner, limit=1, lease_seconds=lease_seconds)
+    return items[0] if items else None
+
+
+def checkpoint_score(item_id, candidate_id, score, summary, new_status, sub_scores=None, source="llm"):
+    """
+    Persists the LLM result for a candidate and its work item in one transaction.
+    After this point a restarted run never pays for this candidate's LLM call again.
+    The candidate only moves if it is still APPLIED (compare-and-set); otherwise
+    the item is checkpointed with new_status NULL and no email must be sent.
+    Returns True if this call decided the candidate.
+    """
+    from src.decision_policy import record_score
+    from src.candidate_status import transition
+
+    conn = get_db_connection()
+    try:
+        decided = transition(conn, candidate_id, "APPLIED", new_status, resume_score=score, resume_summary=summary)
+        if decided:
+            record_score(conn, candidate_id, "screen", score, sub_scores, source=source)
+        conn.execute(
+            "UPDATE screening_items SET score=?, summary=?, new_status=? WHERE id=?",
+            (score, summary, new_status if decided else None, item_id)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    if not decided:
+        print(f"⏭️ Candidate {candidate_id} was decided elsewhere; keeping that decision")
+        return False
+
+    # The new summary makes the candidate findable by talent rediscovery
+    try:
+        from src.talent_search import index_candidate
+        index_candidate(candidate_id)
+    except Exception as e:
+        print(f"⚠️ Could not re-index candidate {candidate_id}: {e}")
+    return True
+
+
+def complete_item(item_id, result):
+    conn = get_db_connection()
+    conn.execute(
+        "UPDATE screening_items SET status='DONE', result=?, lease_owner=NULL, lease_expires=NULL WHERE id=?",
+        (result, item_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+def fail_item(item_id, error):
+    """
+    Releases a lease after an error. The item is retried until MAX_ATTEMPTS.
+    """
+    conn = get_db_connection()
+    conn.execute("""
+        UPDATE screening_items
+        SET status = CASE WHEN attempts >= ? THEN 'FAILED' ELSE 'PENDING' END,
+            error=?, lease_owner=NULL, lease_expires=NULL
+        WHERE id=?
+    """, (MAX_ATTEMPTS, str(error), item_id))
+    conn.commit()
+    conn.close()
+
+
+def flag_item(item_id, candidate_id, reason):
+    """
+    Finishes an item whose resume cannot be read (quarantined, unparseable or
+    missing) without scoring it: retrying would fail the same way, and
+    rejecting over a broken file is the admin's call. The candidate stays
+    APPLIED with the reason in its summary, shown on the dashboard.
+    """
+    conn = get_db_connection()
+    conn.execute(
+        "UPDATE candidates SET resume_summary=? WHERE id=? AND status='APPLIED'",
+        (f"Needs review: resume could not be read ({reason})", candidate_id)
+    )
+    conn.execute(
+        "UPDATE screening_items SET status='DONE', result=?, error=?, lease_owner=NULL, lease_expires=NULL WHERE id=?",
+        ("Needs review - resume unreadable", str(reason), item_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+# --- 3. IDEMPOTENT EMAILS ---
+
+def send_email_once(candidate_id, stage, send_fn, *args):
+    """
+    Calls send_fn(*args) at most once per (candidate, stage).
+    Returns True if the email was sent now or earlier, False if sending failed.
+    A FAILED send may be retried. A send that is still SENDING is assumed to
+    be in flight or delivered, unless it started over EMAIL_SENDING_TIMEOUT
+    seconds ago: then the sender crashed before recording the outcome, and
+    the email is sent again.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT status, created_at < ? AS stale FROM email_log WHERE candidate_id=? AND stage=?",
+            (datetime.now() - timedelta(seconds=EMAIL_SENDING_TIMEOUT), candidate_id, stage)
+        ).fetchone()
+        if row and (row['status'] == 'SENT' or row['status'] == 'SENDING' and not row['stale']):
+            conn.commit()
+            return True
+        conn.execute("""
+            INSERT INTO email_log (candidate_id, stage, status, created_at) VALUES (?, ?, 'SENDING', ?)
+            ON CONFLICT(candidate_id, stage) DO UPDATE SET status='SENDING', created_at=excluded.created_at
+        """, (candidate_id, stage, datetime.now()))
+        conn.commit()
+    finally:
+        conn.close()
+
+    try:
+        ok = send_fn(*args) is not False
+    except Exception as e:
+        print(f"❌ Failed to send {stage} email: {e}")
+        ok = False
+
+    conn = get_db_connection()
+    conn.execute(
+        "UPDATE email_log SET status=? WHERE candidate_id=? AND stage=?",
+        ('SENT' if ok else 'FAILED', candidate_id, stage)
+    )
+    conn.commit()
+    conn.close()
+    return ok
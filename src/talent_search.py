@@ -0,0 +1,342 @@
+"""
+Talent rediscovery: finds past applicants that match a new job.
+
+Indexes are kept per candidate and updated incrementally when a candidate
+applies (add_candidate) and when screening writes a summary:
+
+    talent_postings  impact-ordered inverted index: for every term, the
+                     CHAMPIONS_PER_TERM candidates with the highest BM25 term
+                     weight (resume tokens + resume_summary, summary weighted higher)
+    talent_terms     document frequency per term (for idf) and list length
+    talent_docs      the candidate's indexed terms with their weights and a
+                     256-d hashed term vector (float32 BLOBs); the vector
+                     re-ranks the top hits by cosine, the weights refill a
+                     champion list when one of its entries is removed
+
+A query reads at most CHAMPIONS_PER_TERM rows per job term through the
+(term, weight) index, so its cost does not grow with the size of the pool.
+
+    python -m src.talent_search --rebuild
+    python -m src.talent_search --query "Python, AWS, Kafka"
+"""
+import os
+import sys
+import math
+import time
+import array
+import zlib
+import heapq
+import argparse
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from src.resume_corpus import tokenize, get_resume_text
+
+VECTOR_DIM = 256
+CHAMPIONS_PER_TERM = 2000    # Longest posting list kept per term
+MAX_QUERY_TERMS = 16         # Job terms used for the inverted-index pass
+CANDIDATE_POOL = 200         # Inverted-index hits re-ranked with vectors
+SUMMARY_WEIGHT = 2.0         # A summary token counts this many resume tokens
+VECTOR_WEIGHT = 0.3          # Share of the cosine similarity in the final score
+BM25_K1 = 1.2
+AVG_DOC_TOKENS = 400         # Fixed length normaliser, keeps stored weights stable
+DOC_COUNT_KEY = ""           # talent_terms row whose df is the number of indexed candidates
+
+
+# --- 1. VECTORS & WEIGHTS ---
+
+def hashed_vector(tokens):
+    """
+    Signed feature-hashing of log-scaled term counts into VECTOR_DIM floats,
+    L2-normalised. crc32 keeps it stable across processes (unlike hash()).
+    """
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    vec = [0.0] * VECTOR_DIM
+    for token, count in counts.items():
+        h = zlib.crc32(token.encode("utf-8"))
+        vec[h % VECTOR_DIM] += (1.0 if (h >> 16) & 1 else -1.0) * (1 + math.log(count))
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return array.array("f", (v / norm for v in vec))
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def term_weights(resume_tokens, summary_tokens):
+    """
+    BM25 term-frequency component per term (idf is applied at query time,
+    so stored weights never go stale as the pool grows).
+    """
+    tf = {}
+    for token in resume_tokens:
+        tf[token] = tf.get(token, 0) + 1
+    for token in summary_tokens:
+        tf[token] = tf.get(token, 0) + SUMMARY_WEIGHT
+    norm = BM25_K1 * (0.25 + 0.75 * (len(resume_tokens) + len(summary_tokens)) / AVG_DOC_TOKENS)
+    return {t: f * (BM25_K1 + 1) / (f + norm) for t, f in tf.items()}
+
+
+# --- 2. INDEXING ---
+
+def _unindex(conn, candidate_id):
+    """Removes one candidate. Returns the terms whose list lost an entry (see _backfill)."""
+    row = conn.execute("SELECT terms FROM talent_docs WHERE candidate_id=?", (candidate_id,)).fetchone()
+    if not row:
+        return []
+    shortened = []
+    for term in (row['terms'] or "").split():
+        listed = conn.execute(
+            "DELETE FROM talent_postings WHERE term=? AND candidate_id=?", (term, candidate_id)
+        ).rowcount
+        conn.execute(
+            "UPDATE talent_terms SET df = df - 1, listed = listed - ? WHERE term=?", (listed, term)
+        )
+        if listed:
+            shortened.append(term)
+    conn.execute("DELETE FROM talent_docs WHERE candidate_id=?", (candidate_id,))
+    conn.execute("UPDATE talent_terms SET df = df - 1 WHERE term=?", (DOC_COUNT_KEY,))
+    return shortened
+
+
+def _backfill(conn, terms):
+    """
+    Re-admits the best unlisted candidates into lists that are shorter than
+    CHAMPIONS_PER_TERM although more candidates contain the term, so removals
+    do not leave a list holding only the newer applicants. One talent_docs
+    scan for all the terms; docs indexed before weights were stored are
+    skipped (`--rebuild` covers them).
+    """
+    free = {}
+    for term in set(terms):
+        row = conn.execute("SELECT df, listed FROM talent_terms WHERE term=?", (term,)).fetchone()
+        if row and row['listed'] < CHAMPIONS_PER_TERM and row['df'] > row['listed']:
+            free[term] = CHAMPIONS_PER_TERM - row['listed']
+    if not free:
+        return
+
+    listed = {
+        term: {r['candidate_id'] for r in conn.execute("SELECT candidate_id FROM talent_postings WHERE term=?", (term,))}
+        for term in free
+    }
+    best = {term: [] for term in free}  # Min-heaps of (weight, candidate_id), at most free[term] long
+    for doc in conn.execute("SELECT candidate_id, terms, weights FROM talent_docs WHERE weights IS NOT NULL").fetchall():
+        for term, weight in zip(doc['terms'].split(), array.array("f", doc['weights'])):
+            if term not in best or doc['candidate_id'] in listed[term]:
+                continue
+            if len(best[term]) < free[term]:
+                heapq.heappush(best[term], (weight, doc['candidate_id']))
+            elif weight > best[term][0][0]:
+                heapq.heapreplace(best[term], (weight, doc['candidate_id']))
+
+    for term, entries in best.items():
+        conn.executemany(
+            "INSERT INTO talent_postings (term, candidate_id, weight) VALUES (?, ?, ?)",
+            [(term, cand_id, weight) for weight, cand_id in entries]
+        )
+        conn.execute("UPDATE talent_terms SET listed = listed + ? WHERE term=?", (len(entries), term))
+
+
+def index_tokens(conn, candidate_id, resume_tokens, summary_tokens):
+    """
+    Writes one candidate into the indexes (caller commits). A posting only
+    enters a full list if it beats the list's weakest entry.
+    """
+    shortened = _unindex(conn, candidate_id)
+    weights = term_weights(resume_tokens, summary_tokens)
+
+    for term, weight in weights.items():
+        row = conn.execute("SELECT listed FROM talent_terms WHERE term=?", (term,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO talent_terms (term, df, listed) VALUES (?, 1, 0)", (term,))
+            listed = 0
+        else:
+            conn.execute("UPDATE talent_terms SET df = df + 1 WHERE term=?", (term,))
+            listed = row['listed']
+
+        if listed >= CHAMPIONS_PER_TERM:
+            weakest = conn.execute(
+                "SELECT candidate_id, weight FROM talent_postings WHERE term=? ORDER BY weight LIMIT 1", (term,)
+            ).fetchone()
+            if weight <= weakest['weight']:
+                continue
+            conn.execute("DELETE FROM talent_postings WHERE term=? AND candidate_id=?", (term, weakest['candidate_id']))
+        else:
+            conn.execute("UPDATE talent_terms SET listed = listed + 1 WHERE term=?", (term,))
+        conn.execute(
+            "INSERT INTO talent_postings (term, candidate_id, weight) VALUES (?, ?, ?)", (term, candidate_id, weight)
+        )
+
+    vector = hashed_vector(resume_tokens + summary_tokens * int(SUMMARY_WEIGHT))
+    conn.execute(
+        "INSERT INTO talent_docs (candidate_id, terms, vec, weights) VALUES (?, ?, ?, ?)",
+        (candidate_id, " ".join(weights), vector.tobytes(), array.array("f", weights.values()).tobytes())
+    )
+    conn.execute("""
+        INSERT INTO talent_terms (term, df, listed) VALUES (?, 1, 0)
+        ON CONFLICT(term) DO UPDATE SET df = df + 1
+    """, (DOC_COUNT_KEY,))
+    _backfill(conn, shortened)  # Terms the candidate no longer has
+
+
+def index_candidate(candidate_id, resume_path=None):
+    """
+    (Re)indexes one candidate. Called from add_candidate and after screening
+    writes resume_summary; both are cheap because the resume text comes from
+    the pre-tokenized corpus.
+    """
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT resume_path, resume_summary FROM candidates WHERE id=?", (candidate_id,)
+    ).fetchone()
+    conn.close()
+    if not row:
+        return False
+
+    resume_text = get_resume_text(candidate_id, resume_path or row['resume_path']) or ""
+
+    conn = get_db_connection()
+    try:
+        index_tokens(conn, candidate_id, tokenize(resume_text), tokenize(row['resume_summary'] or ""))
+        conn.commit()
+    finally:
+        conn.close()
+    return True
+
+
+def remove_candidates(candidate_ids):
+    conn = get_db_connection()
+    shortened = []
+    for candidate_id in candidate_ids:
+        shortened += _unindex(conn, candidate_id)
+    _backfill(conn, shortened)
+    conn.commit()
+    conn.close()
+
+
+def rebuild_index():
+    conn = get_db_connection()
+    ids = [r['id'] for r in conn.execute("SELECT id FROM candidates")]
+    conn.execute("DELETE FROM talent_postings")
+    conn.execute("DELETE FROM talent_terms")
+    conn.execute("DELETE FROM talent_docs")
+    conn.commit()
+    conn.close()
+    indexed = sum(1 for cand_id in ids if _safe_index(cand_id))
+    print(f"🔁 Talent index rebuilt: {indexed}/{len(ids)} candidates")
+    return indexed
+
+
+def _safe_index(candidate_id):
+    try:
+        return index_candidate(candidate_id)
+    except Exception as e:
+        print(f"⚠️ Could not index candidate {candidate_id}: {e}")
+        return False
+
+
+# --- 3. SEARCH ---
+
+def search_past_applicants(query_text, top_k=10, exclude_job_id=None):
+    """
+    Returns the best-matching past applicants for free text (usually a job's
+    title + requirements + description), one row per email address:
+    [dict(candidate_id, name, email, job_id, job_title, status, resume_score, score)].
+    """
+    start = time.perf_counter()
+    query_tokens = tokenize(query_text)
+    terms = list(dict.fromkeys(query_tokens))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+
+    conn = get_db_connection()
+    try:
+        dfs = {
+            r['term']: r['df']
+            for r in conn.execute(
+                f"SELECT term, df FROM talent_terms WHERE term IN ({','.join('?' * (len(terms) + 1))})",
+                terms + [DOC_COUNT_KEY]
+            )
+        }
+        total = dfs.pop(DOC_COUNT_KEY, 0)
+
+        # 1. Inverted index: sum idf * weight over the champion lists
+        text_scores = {}
+        for term, df in dfs.items():
+            if df <= 0:
+                continue
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for cand_id, weight in conn.execute(
+                "SELECT candidate_id, weight FROM talent_postings WHERE term=? ORDER BY weight DESC LIMIT ?",
+                (term, CHAMPIONS_PER_TERM)
+            ):
+                text_scores[cand_id] = text_scores.get(cand_id, 0.0) + idf * weight
+        if not text_scores:
+            return []
+
+        pool = sorted(text_scores.items(), key=lambda kv: kv[1], reverse=True)[:CANDIDATE_POOL]
+        best = pool[0][1] or 1.0
+        ids = [cand_id for cand_id, _ in pool]
+        placeholders = ','.join('?' * len(ids))
+
+        # 2. Vector index: cosine re-rank of the pool
+        query_vec = hashed_vector(query_tokens)
+        vectors = {
+            r['candidate_id']: array.array("f", r['vec'])
+            for r in conn.execute(f"SELECT candidate_id, vec FROM talent_docs WHERE candidate_id IN ({placeholders})", ids)
+        }
+
+        sql = f"""
+            SELECT c.id, c.name, c.email, c.job_id, c.status, c.resume_score, j.title AS job_title
+            FROM candidates c LEFT JOIN jobs j ON j.id = c.job_id
+            WHERE c.id IN ({placeholders})
+        """
+        params = list(ids)
+        if exclude_job_id is not None:
+            sql += " AND c.job_id != ?"
+            params.append(exclude_job_id)
+        candidates = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    results = []
+    for cand in candidates:
+        cosine = _cosine(query_vec, vectors[cand['id']]) if cand['id'] in vectors else 0.0
+        score = (1 - VECTOR_WEIGHT) * text_scores[cand['id']] / best + VECTOR_WEIGHT * max(cosine, 0.0)
+        results.append({
+            "candidate_id": cand['id'], "name": cand['name'], "email": cand['email'],
+            "job_id": cand['job_id'], "job_title": cand['job_title'], "status": cand['status'],
+            "resume_score": cand['resume_score'], "score": round(score * 100, 1),
+        })
+    results.sort(key=lambda r: r['score'], reverse=True)
+
+    # One row per person (the same email may have applied to several jobs)
+    seen, unique = set(), []
+    for r in results:
+        key = (r['email'] or "").lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(r)
+        if len(unique) == top_k:
+            break
+
+    print(f"🔁 Talent search: {len(unique)} matches in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return unique
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HIRE_OS talent rediscovery")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every candidate")
+    parser.add_argument("--query", metavar="TEXT", help="Search past applicants")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_index()
+    if args.query:
+        for r in search_past_applicants(args.query, top_k=args.top):
+            print(f"{r['score']:6.1f}  #{r['candidate_id']} {r['name']} <{r['email']}> ({r['job_title']}, {r['status']})")
@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+
+# Priorities (higher runs first). Candidates are waiting on interview turns,
+# so they always jump ahead of batch screening/grading.
+PRIORITY_INTERACTIVE = 100
+PRIORITY_EVENT = 50   # Per-candidate follow-ups queued by src/event_bus.py: small, latency matters
+PRIORITY_BATCH = 10
+
+VISIBILITY_TIMEOUT = 120   # Seconds a claimed task stays hidden without a heartbeat
+WORKER_STALE_AFTER = 30    # Seconds without a heartbeat before a worker counts as gone
+
+
+# --- 1. PRODUCER SIDE ---
+
+def enqueue_task(kind, payload=None, priority=PRIORITY_BATCH, job_id=None, max_attempts=3, unique=False):
+    """
+    Adds a task to the queue and returns its id.
+    With unique=True an already QUEUED/RUNNING task of the same kind and job is
+    returned instead of adding a duplicate (e.g. two admins clicking "Run").
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if unique:
+            existing = conn.execute(
+                "SELECT id FROM tasks WHERE kind=? AND job_id IS ? AND status IN ('QUEUED', 'RUNNING')",
+                (kind, job_id)
+            ).fetchone()
+            if existing:
+                conn.commit()
+                return existing['id']
+
+        task_id = insert_task(conn, kind, payload, priority, job_id, max_attempts)
+        conn.commit()
+        return task_id
+    finally:
+        conn.close()
+
+
+def insert_task(conn, kind, payload=None, priority=PRIORITY_BATCH, job_id=None, max_attempts=3):
+    """Queues a task inside the caller's transaction (caller commits). Returns its id."""
+    now = datetime.now()
+    cur = conn.execute("""
+        INSERT INTO tasks (kind, job_id, payload, priority, max_attempts, visible_at, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+    """, (kind, job_id, json.dumps(payload or {}), priority, max_attempts, now, now))
+    return cur.lastrowid
+
+
+def get_task(task_id):
+    """
+    Cheap primary-key lookup the UI can poll on every rerun.
+    Returns a dict (payload/result decoded) or None.
+    """
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT id, kind, job_id, status, attempts, progress, progress_message, result, error FROM tasks WHERE id=?",
+        (task_id,)
+    ).fetchone()
+    conn.close()
+    if not row:
+        return None
+    task = dict(row)
+    task['result'] = json.loads(task['result']) if task['result'] else None
+    return task
+
+
+def get_active_task(kind, job_id):
+    """
+    Returns the QUEUED/RUNNING task of a kind for a job, or None.
+    """
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT id FROM tasks WHERE kind=? AND job_id=? AND status IN ('QUEUED', 'RUNNING') ORDER BY id DESC LIMIT 1",
+        (kind, job_id)
+    ).fetchone()
+    conn.close()
+    return get_task(row['id']) if row else None
+
+
+def workers_online():
+    """
+    Number of worker processes that sent a heartbeat recently.
+    The UI falls back to running work inline when this is 0.
+    """
+    conn = get_db_connection()
+    count = conn.execute(
+        "SELECT COUNT(*) FROM workers WHERE last_seen >= ?", (time.time() - WORKER_STALE_AFTER,)
+    ).fetchone()[0]
+    conn.close()
+    return count
+
+
+# --- 2. WORKER SIDE ---
+
+def register_worker(worker):
+    conn = get_db_connection()
+    conn.execute("""
+        INSERT INTO workers (id, started_at, last_seen) VALUES (?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET last_seen=excluded.last_seen
+    """, (worker, datetime.now(), time.time()))
+    conn.commit()
+    conn.close()
+
+
+def unregister_worker(worker):
+    conn = get_db_connection()
+    conn.execute("DELETE FROM workers WHERE id=?", (worker,))
+    conn.commit()
+    conn.close()
+
+
+def claim_task(worker, kinds=None, visibility_timeout=VISIBILITY_TIMEOUT):
+    """
+    Atomically claims the highest-priority visible task.
+    RUNNING tasks whose visibility timeout passed (worker died) are claimable again.
+    Returns the task dict with decoded payload, or None.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        now = time.time()
+
+        # Tasks that keep killing their worker are given up on
+        conn.execute("""
+            UPDATE tasks SET status='FAILED', error=COALESCE(error, 'Visibility timeout exceeded too often')
+            WHERE status='RUNNING' AND visible_at <= ? AND attempts >= max_attempts
+        """, (now,))
+
+        kind_filter = ""
+        params = [now]
+        if kinds:
+            kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        row = conn.execute(f"""
+            SELECT id FROM tasks
+            WHERE status IN ('QUEUED', 'RUNNING') AND visible_at <= ? {kind_filter}
+            ORDER BY priority DESC, id
+            LIMIT 1
+        """, params).fetchone()
+
+        if not row:
+            conn.commit()
+            return None
+
+        conn.execute("""
+            UPDATE tasks
+            SET status='RUNNING', worker=?, attempts=attempts+1, visible_at=?, updated_at=?
+            WHERE id=?
+        """, (worker, now + visibility_timeout, datetime.now(), row['id']))
+        conn.commit()
+
+        task = dict(conn.execute(
+            "SELECT id, kind, job_id, payload, attempts FROM tasks WHERE id=?", (row['id'],)
+        ).fetchone())
+        task['payload'] = json.loads(task['payload']) if task['payload'] else {}
+        return task
+    finally:
+        conn.close()
+
+
+def report_progress(task_id, worker, progress, message=None, visibility_timeout=VISIBILITY_TIMEOUT):
+    """
+    Records progress (0.0 - 1.0) and extends the task's visibility timeout (heartbeat)
+    if `worker` still owns the RUNNING task. Returns False when it does not.
+    """
+    conn = get_db_connection()
+    cur = conn.execute(
+        "UPDATE tasks SET progress=?, progress_message=?, visible_at=?, updated_at=? "
+        "WHERE id=? AND worker=? AND status='RUNNING'",
+        (progress, message, time.time() + visibility_timeout, datetime.now(), task_id, worker)
+    )
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
+
+
+def complete_task(task_id, worker, result=None):
+    """
+    Stores the result if `worker` still owns the RUNNING task. Returns False
+    when it does not (visibility timeout passed and another worker claimed it,
+    or it was cancelled): the result is dropped.
+    """
+    conn = get_db_connection()
+    cur = conn.execute(
+        "UPDATE tasks SET status='DONE', progress=1.0, result=?, updated_at=? WHERE id=? AND worker=? AND status='RUNNING'",
+        (json.dumps(result), datetime.now(), task_id, worker)
+    )
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
+
+
+def fail_task(task_id, worker, error, retry_delay=5):
+    """
+    Requeues a failed task (after retry_delay seconds) until max_attempts is
+    reached. Only the worker that owns the RUNNING task may do so; returns
+    False otherwise.
+    """
+    conn = get_db_connection()
+    cur = conn.execute("""
+        UPDATE tasks
+        SET status = CASE WHEN attempts >= max_attempts THEN 'FAILED' ELSE 'QUEUED' END,
+            visible_at=?, error=?, updated_at=?
+        WHERE id=? AND worker=? AND status='RUNNING'
+    """, (time.time() + retry_delay, str(error), datetime.now(), task_id, worker))
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
+
+
+def cancel_task(task_id, reason="Cancelled"):
+    """
+    Marks a QUEUED or RUNNING task FAILED so no worker starts it and a running
+    worker's result is dropped (complete_task returns False). Returns False
+    if the task had already finished.
+    """
+    conn = get_db_connection()
+    cur = conn.execute(
+        "UPDATE tasks SET status='FAILED', error=?, updated_at=? WHERE id=? AND status IN ('QUEUED', 'RUNNING')",
+        (reason, datetime.now(), task_id)
+    )
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
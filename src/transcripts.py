@@ -0,0 +1,150 @@
+"""
+Structured interview transcripts.
+
+Every chat turn is written to `interview_turns` as it happens (role, zlib
+compressed text, char/token counts, model latency, timestamp), so grading
+and analytics can load just what they need (e.g. candidate turns only or the
+last N turns) without parsing free text. When the interview ends the turns
+are also exported as gzipped JSONL into the file store (kind "transcripts").
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import zlib
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.database_manager import get_db_connection
+from services import storage_service as storage
+
+CHARS_PER_TOKEN = 4  # Same rough estimate the agents use for prompt budgets
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+# --- 1. WRITING ---
+
+def append_turn(candidate_id, role, text, latency_ms=None, model=None, created_at=None):
+    """
+    Appends one turn ("user" = candidate, "assistant" = interviewer). Returns its turn number.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        turn_no = conn.execute(
+            "SELECT COALESCE(MAX(turn_no), 0) + 1 FROM interview_turns WHERE candidate_id=?", (candidate_id,)
+        ).fetchone()[0]
+        conn.execute("""
+            INSERT INTO interview_turns (candidate_id, turn_no, role, body, chars, tokens, latency_ms, model, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            candidate_id, turn_no, role, zlib.compress(text.encode("utf-8")), len(text),
+            estimate_tokens(text), latency_ms, model, created_at or time.time()
+        ))
+        conn.commit()
+        return turn_no
+    finally:
+        conn.close()
+
+
+def clear_turns(candidate_ids):
+    conn = get_db_connection()
+    conn.executemany("DELETE FROM interview_turns WHERE candidate_id=?", [(cid,) for cid in candidate_ids])
+    conn.commit()
+    conn.close()
+
+
+# --- 2. SELECTIVE LOADING ---
+
+def load_turns(candidate_id, role=None, last_n=None):
+    """
+    Returns turns in order as dicts (turn_no, role, text, tokens, latency_ms, model, created_at).
+    role: only "user" or "assistant" turns. last_n: only the latest N matching turns.
+    """
+    sql = "SELECT turn_no, role, body, tokens, latency_ms, model, created_at FROM interview_turns WHERE candidate_id=?"
+    params = [candidate_id]
+    if role:
+        sql += " AND role=?"
+        params.append(role)
+    sql += " ORDER BY turn_no DESC"
+    if last_n:
+        sql += " LIMIT ?"
+        params.append(last_n)
+
+    conn = get_db_connection()
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+
+    turns = []
+    for row in reversed(rows):
+        turn = dict(row)
+        turn['text'] = zlib.decompress(turn.pop('body')).decode("utf-8")
+        turns.append(turn)
+    return turns
+
+
+def get_turn_stats(candidate_id):
+    """
+    Per-role aggregates straight from the columns (no text is decompressed):
+    {role: dict(turns, tokens, avg_latency_ms)}.
+    """
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT role, COUNT(*) AS turns, SUM(tokens) AS tokens, AVG(latency_ms) AS avg_latency_ms
+        FROM interview_turns WHERE candidate_id=? GROUP BY role
+    """, (candidate_id,)).fetchall()
+    conn.close()
+    return {row['role']: dict(row) for row in rows}
+
+
+def render_turns(turns):
+    """Plain-text view of turns (same layout as the old .txt transcripts)."""
+    return "".join(f"{t['role'].upper()}: {t['text']}\n\n" for t in turns)
+
+
+def render_within_budget(candidate_id, max_tokens):
+    """
+    Transcript text of at most ~max_tokens: the opening question plus as many
+    of the latest turns as fit (uses the stored token counts).
+    """
+    turns = load_turns(candidate_id)
+    if sum(t['tokens'] for t in turns) <= max_tokens:
+        return render_turns(turns)
+
+    head, tail = turns[:1], []
+    budget = max_tokens - sum(t['tokens'] for t in head)
+    for turn in reversed(turns[1:]):
+        if turn['tokens'] > budget:
+            break
+        tail.insert(0, turn)
+        budget -= turn['tokens']
+    return render_turns(head) + "[...]\n\n" + render_turns(tail)
+
+
+# --- 3. FILES ---
+
+def export_transcript(candidate_id):
+    """
+    Stores the turns as gzipped JSONL (one turn per line). Returns the store ref.
+    """
+    lines = "".join(json.dumps(turn, ensure_ascii=False) + "\n" for turn in load_turns(candidate_id))
+    return storage.put_bytes(gzip.compress(lines.encode("utf-8"), mtime=0), "transcripts", ".jsonl.gz")
+
+
+def save_transcript_text(text):
+    """Stores a plain-text transcript (interviews without recorded turns). Returns the store ref."""
+    return storage.put_bytes(text.encode("utf-8"), "transcripts", ".txt")
+
+
+def read_transcript_file(file_path):
+    """
+    Text of a transcript (store ref or legacy path; .jsonl.gz export or .txt).
+    """
+    if file_path.endswith(".jsonl.gz"):
+        with storage.open_file(file_path) as raw, gzip.open(raw, "rt", encoding="utf-8") as f:
+            return render_turns([json.loads(line) for line in f if line.strip()])
+    return storage.read_bytes(file_path).decode("utf-8")
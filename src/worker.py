@@ -0,0 +1,171 @@
+"""
+Background worker for HIRE_OS.
+
+Runs LLM-heavy work (screening, grading, interview turns) outside the
+Streamlit script threads. Start as many as you need, on one or more machines
+sharing the database:
+
+    python -m src.worker --processes 4
+"""
+import os
+import sys
+import signal
+import argparse
+import threading
+import traceback
+import multiprocessing
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.task_queue import (
+    claim_task,
+    complete_task,
+    fail_task,
+    report_progress,
+    register_worker,
+    unregister_worker
+)
+
+POLL_INTERVAL = 0.5       # Seconds to sleep when the queue is empty
+HEARTBEAT_INTERVAL = 10   # Seconds between worker/task heartbeats
+
+
+# --- 1. TASK HANDLERS ---
+
+def handle_screen_job(task, progress):
+    from src.agents import run_resume_screening
+    logs = run_resume_screening(task['job_id'], progress_cb=progress)
+    return {"logs": logs}
+
+
+def handle_evaluate_job(task, progress):
+    from src.agents import run_interview_evaluation
+    logs = run_interview_evaluation(task['job_id'], progress_cb=progress)
+    return {"logs": logs}
+
+
+def handle_grade_candidate(task, progress):
+    from src.agents import grade_candidate
+    result = grade_candidate(task['payload']['candidate_id'])
+    return {"logs": result or "Nothing to grade (already graded or claimed elsewhere)."}
+
+
+def handle_interview_turn(task, progress):
+    from src.interview_bot import predict_interview_turn
+    p = task['payload']
+    response = predict_interview_turn(
+        p['job_title'], p['job_requirements'], p['history'], p['input'], p.get('first_questions')
+    )
+    return {"response": response}
+
+
+HANDLERS = {
+    "screen_job": handle_screen_job,
+    "evaluate_job": handle_evaluate_job,
+    "grade_candidate": handle_grade_candidate,  # Queued by the interview.submitted event
+    "interview_turn": handle_interview_turn,
+}
+
+
+# --- 2. WORKER LOOP ---
+
+class _Heartbeat(threading.Thread):
+    """
+    Keeps the worker registered and extends the visibility timeout of the task
+    currently being processed, so long screening runs are not re-claimed.
+    """
+
+    def __init__(self, worker):
+        super().__init__(daemon=True)
+        self.worker = worker
+        self.task_id = None
+        self.progress = (0.0, None)
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(HEARTBEAT_INTERVAL):
+            try:
+                register_worker(self.worker)
+                if self.task_id is not None:
+                    report_progress(self.task_id, self.worker, *self.progress)
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed: {e}")
+
+
+def worker_loop(worker, kinds=None, stop_event=None):
+    stop_event = stop_event or threading.Event()
+    register_worker(worker)
+    heartbeat = _Heartbeat(worker)
+    heartbeat.start()
+    print(f"👷 Worker {worker} started (kinds: {kinds or 'all'})")
+
+    try:
+        while not stop_event.is_set():
+            task = claim_task(worker, kinds=kinds or list(HANDLERS))
+            if task is None:
+                stop_event.wait(POLL_INTERVAL)
+                continue
+
+            print(f"▶️ {worker}: task #{task['id']} ({task['kind']})")
+            heartbeat.task_id = task['id']
+            heartbeat.progress = (0.0, None)
+
+            def progress(done, total, task_id=task['id']):
+                message = f"{done}/{total}"
+                fraction = done / total if total else 1.0
+                heartbeat.progress = (fraction, message)
+                report_progress(task_id, worker, fraction, message)
+
+            try:
+                result = HANDLERS[task['kind']](task, progress)
+                if complete_task(task['id'], worker, result):
+                    print(f"✅ {worker}: task #{task['id']} done")
+                else:
+                    print(f"⏭️ {worker}: task #{task['id']} was cancelled or re-claimed; result dropped")
+            except Exception as e:
+                traceback.print_exc()
+                fail_task(task['id'], worker, e)
+            finally:
+                heartbeat.task_id = None
+    finally:
+        heartbeat.stop_event.set()
+        unregister_worker(worker)
+        print(f"👋 Worker {worker} stopped")
+
+
+def _process_main(index, kinds):
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    worker_loop(f"{os.uname().nodename}:{os.getpid()}:{index}", kinds, stop_event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HIRE_OS background worker")
+    parser.add_argument("--processes", "-n", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--kinds", nargs="*", choices=sorted(HANDLERS), help="Only run these task kinds")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _process_main(0, args.kinds)
+        return
+
+    procs = [
+        multiprocessing.Process(target=_process_main, args=(i, args.kinds), daemon=False)
+        for i in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+
+    def shutdown(*_):
+        for p in procs:
+            p.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,6 @@ import sys
 import os
 import time
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit.components.v1 as components 
 
 # 1. SETUP PATH
@@ -14,11 +12,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # 2. IMPORTS
 from src.database_manager import add_job, get_db_connection, delete_job_permanently
 from services.email_service import send_meeting_invite, send_offer_letter, send_rejection_email
-from src.agents import (
-    run_resume_screening, 
-    run_interview_evaluation, 
-    generate_viral_linkedin_post, 
-    generate_job_image
+from src.task_queue import enqueue_task, get_task, get_active_task, workers_online, PRIORITY_BATCH
+from src.talent_search import search_past_applicants
+from src.candidate_profiles import search_profiles
+from src.data_versions import cached, ALL_JOBS
+from src.candidate_status import set_status
+from src.pipeline_metrics import stage_latency, daily_throughput, PIPELINE_STAGES
+from src.screening_runs import send_email_once
+from src.app_cache import get_job
+from src.decision_policy import (
+    get_policy, load_scores, simulate, funnel, apply_policy, SCREEN_SUB_SCORES, GRADE_SUB_SCORES
 )
 
 
@@ -60,6 +63,144 @@ def logout():
     st.session_state.authenticated = False
     st.rerun()
 
+# ==========================================
+# 🐢 LAZY AGENTS (crewai/langchain/openai load on first use, not at page load)
+# ==========================================
+
+def run_resume_screening(job_id):
+    from src.agents import run_resume_screening as run
+    return run(job_id)
+
+def run_interview_evaluation(job_id):
+    from src.agents import run_interview_evaluation as run
+    return run(job_id)
+
+def generate_viral_linkedin_post(job_title, requirements, description):
+    from src.agents import generate_viral_linkedin_post as generate
+    return generate(job_title, requirements, description)
+
+def generate_job_image(job_title, requirements):
+    from src.agents import generate_job_image as generate
+    return generate(job_title, requirements)
+
+# ==========================================
+# 👷 BACKGROUND WORK
+# ==========================================
+
+def run_job_task(kind, job_id, inline_fn, spinner_text):
+    """
+    Hands heavy work to the background worker (`python -m src.worker`) when one
+    is running; otherwise runs it inside this script thread like before.
+    Returns True if the work was queued.
+    """
+    if workers_online():
+        task_id = enqueue_task(kind, job_id=job_id, priority=PRIORITY_BATCH, unique=True)
+        st.session_state[f"task_{kind}_{job_id}"] = task_id
+        st.info(f"📨 Queued for the background worker (task #{task_id}).")
+        return True
+
+    with st.spinner(spinner_text):
+        logs = inline_fn(job_id)
+        st.success("Done!")
+        st.text(logs)
+    return False
+
+def show_task_status(kind, job_id, label):
+    """
+    Shows progress of the running task (or logs of the last finished one) using
+    a single primary-key lookup, cheap enough for every rerun.
+    """
+    task = get_active_task(kind, job_id)
+    if task is None and f"task_{kind}_{job_id}" in st.session_state:
+        task = get_task(st.session_state[f"task_{kind}_{job_id}"])
+    if task is None:
+        return
+
+    if task['status'] in ('QUEUED', 'RUNNING'):
+        st.progress(task['progress'] or 0.0, text=f"{label}: {task['status']} {task['progress_message'] or ''}")
+    elif task['status'] == 'DONE':
+        st.success(f"{label}: finished (task #{task['id']})")
+        if task['result'] and task['result'].get('logs'):
+            st.text(task['result']['logs'])
+    else:
+        st.error(f"{label}: failed - {task['error']}")
+
+# ==========================================
+# 📡 LIVE DATA (cached per data version)
+# ==========================================
+
+LIVE_REFRESH_SECONDS = 1
+
+def read_sql_versioned(sql, params=(), job_id=ALL_JOBS):
+    """
+    pd.read_sql that is only re-run when the job's data version changed
+    (every write to jobs/candidates bumps it through a trigger).
+    """
+    def load():
+        conn = get_db_connection()
+        df = pd.read_sql(sql, conn, params=params)
+        conn.close()
+        return df
+    return cached(("sql", sql, tuple(params)), load, job_id)
+
+def read_sql_snapshot(sql, params=()):
+    """
+    pd.read_sql for heavy reads, run on the analytics snapshot so it never
+    holds the live DB (see src/analytics_snapshot.py). Returns (df, age_seconds).
+    """
+    from src.analytics_snapshot import read
+    df, status = read(("sql", sql, tuple(params)), lambda conn: pd.read_sql(sql, conn, params=params))
+    return df, status['age_seconds']
+
+def seconds_to_deadline(job_id):
+    """Seconds until the job's application deadline (<= 0 once passed), or None if the job is not OPEN."""
+    job = read_sql_versioned("SELECT status, deadline FROM jobs WHERE id = ?", (job_id,), job_id)
+    if job.empty or job.iloc[0]['status'] != 'OPEN':
+        return None
+    try:
+        deadline_dt = datetime.strptime(job.iloc[0]['deadline'], "%Y-%m-%d %H:%M:%S.%f")
+    except:
+        deadline_dt = datetime.now()
+    return int((deadline_dt - datetime.now()).total_seconds())
+
+def auto_screen_at_deadline(job_id):
+    """
+    Starts the screening run once per session when the deadline has passed.
+    Runs in the full script, never inside the live fragment (a fragment tick
+    must stay a cheap read).
+    """
+    auto_run_key = f"auto_run_complete_{job_id}"
+    total_seconds = seconds_to_deadline(job_id)
+    if auto_run_key in st.session_state or total_seconds is None or total_seconds > 0:
+        return
+    st.session_state[auto_run_key] = True
+    run_job_task("screen_job", job_id, run_resume_screening, "⏳ Timer finished! Automatically running AI Screener...")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_pipeline(job_id):
+    """Deadline countdown and candidates table, re-rendered every tick (reads only)."""
+    total_seconds = seconds_to_deadline(job_id)
+
+    # Only show timer if status is OPEN
+    if total_seconds is None:
+        st.info("ℹ️ This job is closed or archived.")
+    elif total_seconds <= 0:
+        if f"auto_run_complete_{job_id}" not in st.session_state:
+            st.error("🛑 DEADLINE REACHED. Processing Candidates...")
+            st.rerun(scope="app")  # auto_screen_at_deadline() starts the run from the full script
+        else:
+            st.info("✅ Auto-Screening has already run for this batch.")
+    else:
+        mins, secs = divmod(total_seconds, 60)
+        st.info(f"⏳ Applications Open. Time Remaining: **{mins}m {secs}s**")
+
+    # Candidates Table
+    candidates_df = read_sql_versioned(
+        "SELECT id, name, email, status, match_score, resume_score, resume_summary FROM candidates WHERE job_id = ?",
+        (job_id,), job_id
+    )
+    st.dataframe(candidates_df, use_container_width=True)
+
 # ==========================================
 # 🚀 MAIN APP LOGIC
 # ==========================================
@@ -89,6 +230,8 @@ else:
             st.session_state.latest_job_post = None
         if "latest_job_image_url" not in st.session_state:
             st.session_state.latest_job_image_url = None    
+        if "latest_rediscovery" not in st.session_state:
+            st.session_state.latest_rediscovery = None
 
         with st.form("job_form"):
             title = st.text_input("Job Title", placeholder="e.g. Senior Python Developer")
@@ -100,8 +243,17 @@ else:
             
             if submitted and title:
                 # 1. Save to Database
-                add_job(title, description, requirements, minutes_open=duration)
+                new_job_id = add_job(title, description, requirements, minutes_open=duration)
                 st.success(f"✅ Job '{title}' posted! Applications close in {duration} minutes.")
+
+                # 1b. Talent Rediscovery: past applicants who fit the new role
+                try:
+                    st.session_state.latest_rediscovery = search_past_applicants(
+                        f"{title}\n{requirements}\n{description}", top_k=10, exclude_job_id=new_job_id
+                    )
+                except Exception as e:
+                    st.session_state.latest_rediscovery = None
+                    st.warning(f"Talent rediscovery unavailable: {e}")
                 
                 # 2. GENERATE CONTENT & IMAGE (Takes longer now)
                 with st.spinner("🎨 AI Marketing Agent is writing the post AND generating a unique image... (approx 10s)"):
@@ -113,7 +265,53 @@ else:
                     ai_image_url = generate_job_image(title, requirements)
                     st.session_state.latest_job_image_url = ai_image_url
                     
-                    st.toast("Draft & Image Ready!", icon="✨")    
+                    st.toast("Draft & Image Ready!", icon="✨")
+
+        # --- BULK IMPORT ---
+        with st.expander("📦 Bulk Import (CSV + ZIP)"):
+            st.caption("CSV columns: name, email, resume (PDF file name inside the ZIP), optional job_id.")
+            import_jobs = read_sql_versioned("SELECT id, title FROM jobs")
+            if import_jobs.empty:
+                st.info("Post a job first.")
+            else:
+                import_options = {f"{row['title']} (ID: {row['id']})": row['id'] for _, row in import_jobs.iterrows()}
+                import_job = st.selectbox("Default job (rows without job_id)", list(import_options.keys()))
+                manifest_file = st.file_uploader("Applications CSV", type=["csv"])
+                archive_file = st.file_uploader("Resumes ZIP", type=["zip"])
+                if st.button("Import Applications", disabled=manifest_file is None or archive_file is None):
+                    import shutil
+                    import tempfile
+                    from src.bulk_import import import_applications
+
+                    # The importer streams from disk, so spool the uploads to temp files first
+                    with tempfile.TemporaryDirectory() as tmp:
+                        paths = {}
+                        for name, upload in (("applications.csv", manifest_file), ("resumes.zip", archive_file)):
+                            paths[name] = os.path.join(tmp, name)
+                            with open(paths[name], "wb") as f:
+                                shutil.copyfileobj(upload, f, 1024 * 1024)
+                        progress = st.empty()
+                        with st.spinner("Importing applications..."):
+                            stats = import_applications(
+                                paths["applications.csv"], paths["resumes.zip"], job_id=import_options[import_job],
+                                progress_cb=lambda s: progress.caption(f"{s['read']:,} rows read, {s['inserted']:,} inserted")
+                            )
+                    st.success(f"✅ Imported {stats['inserted']:,} of {stats['read']:,} rows ({stats['rows_per_second']:,.0f} rows/s)")
+                    st.json(stats)
+
+        # --- TALENT REDISCOVERY ---
+        if st.session_state.latest_rediscovery is not None:
+            st.markdown("---")
+            st.subheader("🔁 Talent Rediscovery: Past Applicants Matching This Job")
+            if st.session_state.latest_rediscovery:
+                st.dataframe(
+                    pd.DataFrame(st.session_state.latest_rediscovery)[
+                        ["score", "name", "email", "job_title", "status", "resume_score"]
+                    ],
+                    use_container_width=True
+                )
+            else:
+                st.info("No past applicants match this job yet.")
 
         # --- SOCIAL MEDIA & JOB BOARD ASSISTANT ---
         if st.session_state.latest_job_post:
@@ -193,8 +391,7 @@ else:
         if st.button("Refresh Data"):
             st.rerun()    
 
-        conn = get_db_connection()
-        jobs_df = pd.read_sql("SELECT id, title, status, deadline FROM jobs", conn) # Changed query to show ALL jobs, not just OPEN
+        jobs_df = read_sql_versioned("SELECT id, title, status, deadline FROM jobs") # Changed query to show ALL jobs, not just OPEN
         
         if not jobs_df.empty:
             job_options = {f"{row['title']} (ID: {row['id']}) - {row['status']}": row['id'] for index, row in jobs_df.iterrows()}
@@ -214,76 +411,140 @@ else:
                             st.rerun()
                         else:
                             st.error("Failed to delete.")
-            # -------------------------------    
+                with col_del2:
+                    if st.button("Archive Job", help="Move the job, its candidates and their files to data/archive/"):
+                        from src.archival import archive_job, compact
+                        with st.spinner("Archiving..."):
+                            report = archive_job(job_id)
+                            compact()
+                        st.success(f"Archived to {report.get('archive')} ({report['files']} files, {sum(report['rows'].values())} rows)")
+                        time.sleep(1)
+                        st.rerun()
+            # -------------------------------
+
+            # Countdown + candidates table refresh themselves (one version lookup per tick)
+            auto_screen_at_deadline(job_id)
+            live_pipeline(job_id)
+
+            # Profile filters: indexed SQL over the profiles extracted at application time
+            with st.expander("🔎 Filter by Profile"):
+                f1, f2, f3, f4 = st.columns(4)
+                skill_filter = f1.text_input("Skills (comma separated)", key=f"pf_skills_{job_id}")
+                years_filter = f2.number_input("Min. Years", min_value=0.0, step=1.0, key=f"pf_years_{job_id}")
+                edu_filter = f3.selectbox("Min. Education", ["Any", "Associate", "Bachelors", "Masters", "PhD"], key=f"pf_edu_{job_id}")
+                loc_filter = f4.text_input("Location", key=f"pf_loc_{job_id}")
+                all_jobs = st.checkbox("Search candidates of all jobs", key=f"pf_all_{job_id}")
+
+                if skill_filter or years_filter or edu_filter != "Any" or loc_filter:
+                    matches = search_profiles(
+                        skills=[s.strip() for s in skill_filter.split(",") if s.strip()],
+                        min_years=years_filter or None,
+                        min_education=None if edu_filter == "Any" else edu_filter,
+                        location=loc_filter or None,
+                        job_id=None if all_jobs else job_id
+                    )
+                    if matches:
+                        st.dataframe(pd.DataFrame(matches), use_container_width=True)
+                    else:
+                        st.info("No candidates match these filters.")
+
+            # What-if: re-decide statuses from stored scores (no LLM calls)
+            with st.expander("⚖️ Decision Policy (What-if)"):
+                policy = get_policy(job_id)
+                scores = cached(("scores", job_id), lambda: load_scores(job_id), job_id)
+                p1, p2 = st.columns(2)
+                screen_threshold = p1.slider("Shortlist threshold", 0, 100, int(policy['screen_threshold']), key=f"dp_screen_{job_id}")
+                use_grade = p2.checkbox("Override grader decision with a threshold", value=policy['grade_threshold'] is not None, key=f"dp_use_grade_{job_id}")
+                grade_threshold = p2.slider("Finalist threshold", 0, 100, int(policy['grade_threshold'] or 70), disabled=not use_grade, key=f"dp_grade_{job_id}")
+                hard_reject = p1.checkbox("Reject resumes missing most must-have skills without an AI review", value=policy['hard_reject'], key=f"dp_hard_{job_id}")
+
+                st.caption("Sub-score weights (all 0 = use the overall score)")
+                w_cols = st.columns(len(SCREEN_SUB_SCORES) + len(GRADE_SUB_SCORES))
+                screen_weights, grade_weights = {}, {}
+                for i, name in enumerate(SCREEN_SUB_SCORES):
+                    screen_weights[name] = w_cols[i].number_input(f"Resume: {name}", 0.0, 10.0, float(policy['screen_weights'].get(name, 0)), key=f"dp_sw_{name}_{job_id}")
+                for i, name in enumerate(GRADE_SUB_SCORES, len(SCREEN_SUB_SCORES)):
+                    grade_weights[name] = w_cols[i].number_input(f"Interview: {name}", 0.0, 10.0, float(policy['grade_weights'].get(name, 0)), key=f"dp_gw_{name}_{job_id}")
+
+                new_policy = {
+                    "screen_threshold": screen_threshold,
+                    "grade_threshold": grade_threshold if use_grade else None,
+                    "screen_weights": screen_weights,
+                    "grade_weights": grade_weights,
+                    "hard_reject": hard_reject,
+                }
+                preview = simulate(scores, new_policy)
+                before, after = funnel(preview, "status"), funnel(preview, "new_status")
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Shortlisted", after['SHORTLISTED'], after['SHORTLISTED'] - before['SHORTLISTED'])
+                m2.metric("Finalists", after['FINALIST'], after['FINALIST'] - before['FINALIST'])
+                m3.metric("Rejected", after['REJECTED'], after['REJECTED'] - before['REJECTED'])
+                m4.metric("Changed", int(preview['changed'].sum()))
+
+                if preview['changed'].any():
+                    st.dataframe(preview[preview['changed']][["id", "name", "status", "new_status", "screen_raw", "grade_raw"]], use_container_width=True)
+                st.caption("Applying re-decides statuses in one transaction; no emails are sent.")
+                if st.button("Apply Policy", key=f"dp_apply_{job_id}"):
+                    updated = apply_policy(job_id, new_policy)
+                    st.success(f"Policy saved. {updated} candidates re-decided.")
+                    time.sleep(1)
+                    st.rerun()
 
-            # Timer Logic
-            selected_job = jobs_df[jobs_df['id'] == job_id].iloc[0]
-            
-            # Only show timer if status is OPEN
-            if selected_job['status'] == 'OPEN':
-                deadline_str = selected_job['deadline']
-                try:
-                    deadline_dt = datetime.strptime(deadline_str, "%Y-%m-%d %H:%M:%S.%f")
-                except:
-                    deadline_dt = datetime.now()    
+            # Streams the pipeline to a temp file in chunks, then offers it for download
+            with st.expander("⬇️ Export Pipeline"):
+                from src.export import export_columns, export_candidates, FORMATS, CANDIDATE_STATUSES
+                from src.analytics_snapshot import snapshot_status
+                e1, e2 = st.columns(2)
+                export_fmt = e1.selectbox("Format", FORMATS, key=f"ex_fmt_{job_id}")
+                export_statuses = e2.multiselect(
+                    "Status", CANDIDATE_STATUSES, key=f"ex_status_{job_id}"
+                )
+                export_cols = st.multiselect("Columns (empty = all)", list(export_columns()), key=f"ex_cols_{job_id}")
+                export_dates = st.date_input("Applied between (optional)", value=(), key=f"ex_dates_{job_id}")
+                if st.button("Prepare Export", key=f"ex_run_{job_id}"):
+                    import tempfile
+                    since = until = None
+                    if len(export_dates) == 2:
+                        since, until = export_dates[0], export_dates[1] + pd.Timedelta(days=1)
+                    try:
+                        with tempfile.TemporaryFile() as tmp:
+                            rows = export_candidates(
+                                tmp, export_fmt, columns=export_cols or None, job_id=job_id,
+                                statuses=export_statuses or None, since=since, until=until, snapshot=True
+                            )
+                            tmp.seek(0)
+                            st.caption(f"📸 Exported from the analytics snapshot, up to {snapshot_status()['age_seconds']:.0f}s old")
+                            st.download_button(
+                                f"Download {rows:,} rows", tmp.read(),
+                                file_name=f"job_{job_id}_pipeline.{export_fmt}", key=f"ex_dl_{job_id}"
+                            )
+                    except RuntimeError as e:
+                        st.error(str(e))
 
-                time_left = deadline_dt - datetime.now()
-                total_seconds = int(time_left.total_seconds())
-                
-                auto_run_key = f"auto_run_complete_{job_id}"    
-
-                if total_seconds <= 0:
-                    st.error("🛑 DEADLINE REACHED. Processing Candidates...")
-                    if auto_run_key not in st.session_state:
-                        with st.spinner("⏳ Timer finished! Automatically running AI Screener..."):
-                            logs = run_resume_screening(job_id)
-                            st.session_state[auto_run_key] = True
-                            st.success("✅ Auto-Screening Complete!")
-                            st.text(logs)
-                    else:
-                        st.info("✅ Auto-Screening has already run for this batch.")
-                else:
-                    mins, secs = divmod(total_seconds, 60)
-                    st.info(f"⏳ Applications Open. Time Remaining: **{mins}m {secs}s**")
-            else:
-                st.info("ℹ️ This job is closed or archived.")    
-
-            # Candidates Table
-            candidates_df = pd.read_sql(
-                "SELECT id, name, email, status, resume_score FROM candidates WHERE job_id = ?", 
-                conn, params=(job_id,)
-            )
-            st.dataframe(candidates_df, use_container_width=True)
-            
             col1, col2 = st.columns(2)
             with col1:
                 st.caption("Manual Controls")
                 if st.button("Run AI Screener (Manual Force)"):
-                    with st.spinner("Forcing manual run..."):
-                        logs = run_resume_screening(job_id)
-                        st.success("Done!")
-                        st.text(logs)
+                    if not run_job_task("screen_job", job_id, run_resume_screening, "Forcing manual run..."):
                         st.rerun()
+                show_task_status("screen_job", job_id, "Screening")
             with col2:
-                st.caption("Interview Stage")
+                st.caption("Interview Stage (submitted interviews are graded automatically; this re-grades or catches up)")
                 if st.button("Process Interviews"):
-                    with st.spinner("Grading transcripts..."):
-                        logs = run_interview_evaluation(job_id) 
-                        st.success("Done!")
-                        st.text(logs)
+                    if not run_job_task("evaluate_job", job_id, run_interview_evaluation, "Grading transcripts..."):
                         st.rerun()
+                show_task_status("evaluate_job", job_id, "Grading")
         else:
             st.info("No jobs found.")
-        conn.close()    
 
     # --- TAB 3: HR ROUND & FINAL OFFERS ---
     with tab3:
         st.header("Step 3: Human Interview & Final Decision")
-        conn = get_db_connection()
+        # Each button is a compare-and-set: if another admin session acted first, nothing is sent twice
         
         # 1. Schedule HR Interview
         st.subheader("1. Schedule HR Interview")
-        ready_for_hr = pd.read_sql("SELECT id, name, email, job_id, interview_score FROM candidates WHERE status='FINALIST'", conn)
+        ready_for_hr = read_sql_versioned("SELECT id, name, email, job_id, interview_score FROM candidates WHERE status='FINALIST'")
         
         if not ready_for_hr.empty:
             for index, row in ready_for_hr.iterrows():
@@ -296,18 +557,20 @@ else:
                     
                     if st.button(f"Send Invite to {row['name']}", key=f"invite_{row['id']}"):
                         if meet_link and meet_time:
-                            job_title = conn.execute("SELECT title FROM jobs WHERE id=?", (row['job_id'],)).fetchone()['title']
-                            send_meeting_invite(row['email'], row['name'], job_title, meet_link, meet_time)
-                            conn.execute("UPDATE candidates SET status='HR_ROUND_SCHEDULED', meeting_link=?, meeting_time=? WHERE id=?", (meet_link, meet_time, row['id']))
-                            conn.commit()
-                            st.success("Invite sent!")
+                            job_title = get_job(row['job_id'])['title']
+                            if not set_status(row['id'], 'FINALIST', 'HR_ROUND_SCHEDULED', meeting_link=meet_link, meeting_time=meet_time):
+                                st.warning("Already handled in another session.")
+                            elif send_email_once(row['id'], 'HR_INVITE', send_meeting_invite, row['email'], row['name'], job_title, meet_link, meet_time):
+                                st.success("Invite sent!")
+                            else:
+                                st.error("Interview scheduled, but the invite email failed.")
                             st.rerun()    
 
         st.markdown("---")    
 
         # 2. Final Verdict
         st.subheader("2. Final Verdict")
-        scheduled_cands = pd.read_sql("SELECT id, name, email, job_id, meeting_time FROM candidates WHERE status='HR_ROUND_SCHEDULED'", conn)
+        scheduled_cands = read_sql_versioned("SELECT id, name, email, job_id, meeting_time FROM candidates WHERE status='HR_ROUND_SCHEDULED'")
         
         if not scheduled_cands.empty:
             for index, row in scheduled_cands.iterrows():
@@ -316,39 +579,35 @@ else:
                     st.write(f"**{row['name']}** (Interview: {row['meeting_time']})")
                 with col2:
                     if st.button("✅ HIRE", key=f"hire_{row['id']}"):
-                        job_title = conn.execute("SELECT title FROM jobs WHERE id=?", (row['job_id'],)).fetchone()['title']
-                        with st.spinner("Sending Offer Letter..."):
-                            send_offer_letter(row['email'], row['name'], job_title)
-                            conn.execute("UPDATE candidates SET status='HIRED' WHERE id=?", (row['id'],))
-                            conn.commit()
-                            st.balloons()
-                            time.sleep(1)
-                            st.rerun()
+                        job_title = get_job(row['job_id'])['title']
+                        if set_status(row['id'], 'HR_ROUND_SCHEDULED', 'HIRED'):
+                            with st.spinner("Sending Offer Letter..."):
+                                send_email_once(row['id'], 'OFFER', send_offer_letter, row['email'], row['name'], job_title)
+                                st.balloons()
+                                time.sleep(1)
+                        st.rerun()
                 with col3:
                     if st.button("❌ REJECT", key=f"reject_{row['id']}"):
                         # 1. Get Job Title
-                        job_title = conn.execute("SELECT title FROM jobs WHERE id=?", (row['job_id'],)).fetchone()['title']
-
-                        # 2. Send Rejection Email
-                        with st.spinner("Sending Rejection Email..."):
-                            send_rejection_email(row['email'], row['name'], job_title)
+                        job_title = get_job(row['job_id'])['title']
 
-                            # 3. Update Status
-                            conn.execute("UPDATE candidates SET status='REJECTED_FINAL' WHERE id=?", (row['id'],))
-                            conn.commit()
+                        # 2. Update Status (only the session that wins sends the email)
+                        if set_status(row['id'], 'HR_ROUND_SCHEDULED', 'REJECTED_FINAL'):
+                            # 3. Send Rejection Email
+                            with st.spinner("Sending Rejection Email..."):
+                                send_email_once(row['id'], 'FINAL_REJECTION', send_rejection_email, row['email'], row['name'], job_title)
 
-                            st.toast(f"Rejection sent to {row['name']}", icon="📉")
-                            time.sleep(1)
-                            st.rerun()
-        conn.close()    
+                                st.toast(f"Rejection sent to {row['name']}", icon="📉")
+                                time.sleep(1)
+                        st.rerun()
 
     # --- TAB 4: ANALYTICS (NEW!) ---
     with tab4:
         st.header("📊 Recruitment Analytics")
-        conn = get_db_connection()
-        
-        # Load all data
-        df = pd.read_sql("SELECT * FROM candidates", conn)
+        import plotly.express as px  # Only the analytics tab draws charts
+        # Load all data from the analytics snapshot (re-queried only when the snapshot changed)
+        df, snapshot_age = read_sql_snapshot("SELECT * FROM candidates")
+        st.caption(f"📸 Snapshot data, up to {snapshot_age:.0f}s old")
         
         if not df.empty:
             # 1. TOP METRICS ROW
@@ -372,7 +631,8 @@ else:
                 st.subheader("Recruitment Funnel")
                 # Logic: Calculate drop-offs
                 count_applied = total
-                count_shortlisted = len(df[df['resume_score'] >= 70])
+                thresholds = {jid: get_policy(jid)['screen_threshold'] for jid in df['job_id'].unique()}
+                count_shortlisted = len(df[df['resume_score'] >= df['job_id'].map(thresholds)])
                 count_finalist = len(df[df['status'].isin(['FINALIST', 'HR_ROUND_SCHEDULED', 'HIRED', 'REJECTED_FINAL'])])
                 count_hired = hired
                 
@@ -403,9 +663,32 @@ else:
                 else:
                     st.info("Not enough interview data for correlation chart.")    
 
+            # 4. PIPELINE LATENCY (incremental rollups of the status event log)
+            st.markdown("---")
+            st.subheader("⏱️ Pipeline Latency per Job")
+            latency = pd.DataFrame(stage_latency())
+            if not latency.empty:
+                latency['job'] = latency['job_id'].map(lambda jid: (get_job(jid) or {}).get('title', f"Job {jid}"))
+                latency = latency[latency['stage'].isin(PIPELINE_STAGES)]
+                fig_latency = px.bar(
+                    latency, x="stage", y="p50_hours", color="job", barmode="group",
+                    category_orders={"stage": PIPELINE_STAGES},
+                    hover_data=['candidates', 'p90_hours', 'mean_hours'],
+                    title="Median time in stage (hours)"
+                )
+                st.plotly_chart(fig_latency, use_container_width=True)
+                st.dataframe(latency[['job', 'stage', 'candidates', 'p50_hours', 'p90_hours', 'mean_hours']],
+                             use_container_width=True, hide_index=True)
+
+                throughput = pd.DataFrame(daily_throughput(days=30))
+                if not throughput.empty:
+                    fig_throughput = px.line(throughput, x="day", y="exited", color="stage", markers=True,
+                                             title="Candidates leaving each stage per day (last 30 days)")
+                    st.plotly_chart(fig_throughput, use_container_width=True)
+            else:
+                st.info("No stage changes recorded yet.")
+
         else:
             st.warning("No data available for analytics yet.")
-        
-        conn.close()
 
     
\ No newline at end of file
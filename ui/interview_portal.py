@@ -6,10 +6,19 @@ import time
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.database_manager import get_db_connection
-from src.interview_bot import get_interview_chain, save_transcript # <--- IMPORT THE SMART AGENT
+from src.interview_bot import (  # <--- IMPORT THE SMART AGENT
+    restore_interview_chain, interview_turn, save_transcript, prepare_opener, personalize_opener,
+    OPENING_INPUT, LLM_MODEL
+)
+from src.transcripts import append_turn, load_turns
+from src.task_queue import enqueue_task, get_task, cancel_task, workers_online, PRIORITY_INTERACTIVE
+from src.rate_limiter import is_circuit_open
 
 st.set_page_config(page_title="HIRE_OS Interview", layout="centered")
 
+TURN_POLL_SECONDS = 1      # How often a queued turn is checked (fragment tick)
+TURN_TIMEOUT_SECONDS = 90  # A queued turn no worker has answered by then is run in this session
+
 # --- SESSION STATE ---
 if "candidate_data" not in st.session_state:
     st.session_state.candidate_data = None
@@ -17,6 +26,8 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "interview_chain" not in st.session_state:
     st.session_state.interview_chain = None
+if "pending_turn" not in st.session_state:
+    st.session_state.pending_turn = None  # Turn queued for a background worker
 
 # ==========================================
 # 🔐 LOGIN SCREEN
@@ -35,7 +46,7 @@ def login_candidate():
             
             # 1. Fetch Candidate + Job Details
             query = """
-                SELECT c.id, c.name, c.email, c.status, j.title, j.requirements 
+                SELECT c.id, c.name, c.email, c.status, c.job_id, j.title, j.requirements 
                 FROM candidates c
                 JOIN jobs j ON c.job_id = j.id
                 WHERE LOWER(c.email) = ?
@@ -45,8 +56,14 @@ def login_candidate():
             
             if user:
                 # Check Status
-                if user['status'] in ['SHORTLISTED', 'INTERVIEW_PENDING']:
+                if user['status'] == 'SHORTLISTED':  # The only status save_transcript() can submit from
                     st.session_state.candidate_data = dict(user)
+                    # Resume an interrupted interview from the recorded turns
+                    st.session_state.chat_history = [
+                        {"role": t['role'], "content": t['text']} for t in load_turns(user['id'])
+                    ]
+                    st.session_state.interview_chain = None
+                    st.session_state.pending_turn = None
                     st.success(f"Welcome, {user['name']}!")
                     time.sleep(1)
                     st.rerun()
@@ -60,6 +77,105 @@ def login_candidate():
 # ==========================================
 # 💬 SMART INTERVIEW SCREEN
 # ==========================================
+def _turn_history(user_input):
+    history = st.session_state.chat_history
+    if user_input != OPENING_INPUT:
+        history = history[:-1]  # The new answer is already appended to the history
+    return history
+
+def queue_turn(cand, user_input):
+    """
+    Queues the interviewer's next message for a background worker at
+    interactive priority and returns at once; pending_turn_status() polls it.
+    """
+    task_id = enqueue_task(
+        "interview_turn",
+        {
+            "job_title": cand['title'], "job_requirements": cand['requirements'],
+            "history": _turn_history(user_input), "input": user_input,
+            "first_questions": get_opener(cand)['questions']
+        },
+        priority=PRIORITY_INTERACTIVE,
+        max_attempts=1
+    )
+    st.session_state.pending_turn = {
+        "task_id": task_id, "input": user_input, "started": time.time(),
+        "deadline": time.time() + TURN_TIMEOUT_SECONDS
+    }
+
+def ask_interviewer(cand, user_input):
+    """
+    Runs the interviewer's next message inside this session (no worker online,
+    or the queued turn was not answered). Returns None while the OpenAI
+    circuit breaker is open.
+    """
+    history = _turn_history(user_input)
+    first_questions = get_opener(cand)['questions']
+    if st.session_state.interview_chain is None:
+        st.session_state.interview_chain = restore_interview_chain(
+            cand['title'], cand['requirements'], history, first_questions
+        )
+    try:
+        return interview_turn(
+            st.session_state.interview_chain, cand['title'], cand['requirements'], history, user_input, first_questions
+        )
+    except Exception as e:
+        if is_circuit_open(e):
+            return None
+        raise
+
+@st.fragment(run_every=TURN_POLL_SECONDS)
+def pending_turn_status():
+    """
+    Checks the queued turn every tick (one primary-key read, no waiting in
+    the script). Once it is settled the full script takes over: it shows the
+    worker's answer, or runs the turn inline if the worker failed or timed out.
+    """
+    pending = st.session_state.pending_turn
+    if pending is None:  # Settled by the full script in the meantime
+        return
+    task = get_task(pending['task_id'])
+    if task and task['status'] not in ('DONE', 'FAILED') and time.time() >= pending['deadline']:
+        # Not answered in time: cancel it so a late worker does not spend a second call on it
+        if not cancel_task(pending['task_id'], "Answered inline"):
+            task = get_task(pending['task_id'])  # Finished just now
+        else:
+            task = None
+    if task and task['status'] == 'DONE':
+        pending['response'] = task['result']['response']
+    elif task is None or task['status'] == 'FAILED':
+        pending['inline'] = True
+    else:
+        with st.chat_message("assistant"):
+            st.caption("💬 The interviewer is typing...")
+        return
+    st.rerun(scope="app")
+
+def finish_turn(cand, user_input, ai_response, start):
+    """Records and shows the answer. None (OpenAI failing) drops the candidate's message so it can be resent."""
+    if ai_response is None:
+        st.session_state.chat_history.pop()
+        st.warning("⏳ The interviewer is temporarily unavailable. Please wait a moment and send your answer again.")
+        return
+    append_turn(cand['id'], "user", user_input)
+    append_turn(cand['id'], "assistant", ai_response, latency_ms=int((time.time() - start) * 1000), model=LLM_MODEL)
+
+    # Show AI Message
+    with st.chat_message("assistant"):
+        st.markdown(ai_response)
+    st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
+
+def get_opener(cand):
+    """
+    The job's cached greeting template + first questions (generated once per
+    job, normally when the shortlist is produced).
+    """
+    if "opener" not in st.session_state or st.session_state.opener_job != cand['job_id']:
+        # Cache hit unless the job changed; on a miss the candidate is waiting, so interactive quota
+        st.session_state.opener = prepare_opener(cand['job_id'], traffic="interactive")
+        st.session_state.opener_job = cand['job_id']
+    return st.session_state.opener
+
 def interview_screen():
     cand = st.session_state.candidate_data
     
@@ -67,13 +183,13 @@ def interview_screen():
     st.caption(f"Candidate: {cand['name']}")
     st.divider()
 
-    # 1. Initialize the SMART BRAIN (Only once)
-    if st.session_state.interview_chain is None:
-        st.session_state.interview_chain = get_interview_chain(cand['title'], cand['requirements'])
-        
-        # Trigger the first greeting automatically
+    # 1. Trigger the first greeting automatically (Only once)
+    if not st.session_state.chat_history:
         with st.spinner("Interviewer is connecting..."):
-            greeting = st.session_state.interview_chain.predict(input="Hello, I am ready.")
+            start = time.time()
+            # Template substitution only: no LLM call on the first screen
+            greeting = personalize_opener(get_opener(cand)['template'], cand['name'])
+            append_turn(cand['id'], "assistant", greeting, latency_ms=int((time.time() - start) * 1000), model="cached-opener")
             st.session_state.chat_history.append({"role": "assistant", "content": greeting})
 
     # 2. Display Chat History
@@ -81,30 +197,42 @@ def interview_screen():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
-    # 3. User Input
-    if user_input := st.chat_input("Type your answer here..."):
+    # 3. Answer of a queued turn (settled by pending_turn_status)
+    pending = st.session_state.pending_turn
+    if pending and ("response" in pending or pending.get("inline")):
+        st.session_state.pending_turn = None
+        if pending.get("inline"):
+            with st.spinner("Thinking..."):
+                ai_response = ask_interviewer(cand, pending['input'])
+        else:
+            ai_response = pending['response']
+        finish_turn(cand, pending['input'], ai_response, pending['started'])
+    elif pending:
+        pending_turn_status()
+
+    # 4. User Input
+    if user_input := st.chat_input("Type your answer here...", disabled=st.session_state.pending_turn is not None):
         # Show User Message
         with st.chat_message("user"):
             st.markdown(user_input)
         st.session_state.chat_history.append({"role": "user", "content": user_input})
 
-        # Get AI Response (SMART AGENT)
+        # Get AI Response (SMART AGENT): a background worker answers it when one is running
+        if workers_online():
+            queue_turn(cand, user_input)
+            st.rerun()
         with st.spinner("Thinking..."):
-            ai_response = st.session_state.interview_chain.predict(input=user_input)
-        
-        # Show AI Message
-        with st.chat_message("assistant"):
-            st.markdown(ai_response)
-        st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
+            start = time.time()
+            ai_response = ask_interviewer(cand, user_input)
+        finish_turn(cand, user_input, ai_response, start)
 
-    # 4. Finish Button
+    # 5. Finish Button
     if st.button("End Interview & Submit"):
-        # Save transcript string
-        transcript = ""
-        for msg in st.session_state.chat_history:
-            transcript += f"{msg['role'].upper()}: {msg['content']}\n\n"
-            
-        save_transcript(cand['id'], transcript)
+        if st.session_state.pending_turn:
+            cancel_task(st.session_state.pending_turn['task_id'], "Interview submitted")
+            st.session_state.pending_turn = None
+        # Turns were recorded as they happened; this exports them and closes the interview
+        save_transcript(cand['id'])
         st.success("✅ Interview Submitted! You may close this tab.")
         st.session_state.candidate_data = None # Logout
         time.sleep(3)